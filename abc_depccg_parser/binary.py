@@ -0,0 +1,638 @@
+"""
+A compact binary format of parsed trees.
+
+Trees are stored with their categories interned
+    and their structure flattened into arrays,
+    so that reading them needs neither parsing S-expressions
+    nor parsing categories.
+
+Layout
+------
+A file begins with `MAGIC` and the version (unsigned 16-bit)
+    followed by records, each of which is
+    a kind (1 byte), the length of the payload (unsigned 32-bit)
+    and the payload.
+All integers are little-endian.
+Arrays of integers are stored in the narrowest of 8, 16 and 32 bits
+    that fits them, preceded by the typecode of `array` (b"B", b"H" or b"I").
+Arrays of strings are arrays of their byte lengths
+    followed by the strings in UTF-8.
+
+b"C" (categories)
+    New entries of the category table, which is shared by the whole file:
+    the number of entries (unsigned 32-bit)
+    and the depccg categories (an array of strings).
+    Entries are numbered from 0 in the order of appearance
+        (see `category.CategoryTable`),
+        and precede the trees that use them.
+b"T" (tree)
+    A parsed tree:
+    the ID of the sentence (unsigned 32-bit),
+    the n-best rank from 0 (unsigned 16-bit),
+    the log probability (64-bit float),
+    the number of tokens (unsigned 32-bit),
+    the number of nodes (unsigned 32-bit),
+    the tokens (an array of strings),
+    the category IDs of the nodes in pre-order (an array)
+    and the numbers of children of the nodes (an array).
+    The leaves take the tokens in order.
+b"F" (failure)
+    A sentence given up on:
+    the ID of the sentence (unsigned 32-bit),
+    the byte length of the reason (unsigned 16-bit),
+    the number of tokens (unsigned 32-bit),
+    the reason in UTF-8 (e.g. "failed")
+    and the tokens (an array of strings).
+    How it is printed is chosen on conversion (see `parser.FALLBACKS`).
+
+Examples
+--------
+>>> import io
+>>> from abc_depccg_parser import cache
+>>> tree = cache.CachedTree(
+...     {
+...         "cat": "S[m]",
+...         "children": [
+...             {"cat": "NP", "word": "猫"},
+...             {"cat": "S[m]\\\\NP", "word": "寝る"},
+...         ]
+...     }
+... )
+>>> with io.BytesIO() as f:
+...     writer = Writer(f)
+...     writer.write_batch([[(tree, -0.5)], []], [None, [{"word": "ね"}]])
+...     print(to_ABCT(f.getvalue()), end = "")
+(TOP (COMMENT {probability=-0.5}) (Sm (NP 猫) (<NP\\Sm> 寝る)) (ID 1))
+(TOP (COMMENT {error=failed}) (FRAG (ERROR ね)) (ID 2))
+"""
+
+import typing
+import array
+import io
+import logging
+import struct
+import sys
+
+from . import category
+
+logger = logging.getLogger(__name__)
+
+"""
+The signature at the beginning of a file.
+"""
+MAGIC: bytes = b"ABCB"
+
+"""
+The version of the format.
+"""
+VERSION: int = 1
+
+_FILE_HEADER = struct.Struct("<4sH")
+_RECORD_HEADER = struct.Struct("<cI")
+_TREE_HEADER = struct.Struct("<IHdII")
+_FAILURE_HEADER = struct.Struct("<IHI")
+_COUNT = struct.Struct("<I")
+
+_KIND_CATS = b"C"
+_KIND_TREE = b"T"
+_KIND_FAILURE = b"F"
+
+_IS_BIG_ENDIAN = sys.byteorder == "big"
+
+"""
+The typecodes of arrays and their maximum values.
+"""
+_TYPECODES: typing.Tuple[typing.Tuple[str, int], ...] = (
+    ("B", 0xFF),
+    ("H", 0xFFFF),
+    ("I", 0xFFFFFFFF),
+)
+
+class FormatError(ValueError):
+    """
+    Raised when a file is not in the binary format.
+    """
+# === END CLASS ===
+
+# ======
+# Arrays
+# ======
+def _pack_array(values: typing.Sequence[int]) -> bytes:
+    top = max(values, default = 0)
+
+    for typecode, limit in _TYPECODES:
+        if top <= limit:
+            break
+        # === END IF ===
+    else:
+        raise OverflowError(f"too large to store: {top}")
+    # === END FOR ===
+
+    arr = array.array(typecode, values)
+    if _IS_BIG_ENDIAN:
+        arr.byteswap()
+    # === END IF ===
+
+    return typecode.encode("ascii") + arr.tobytes()
+# === END ===
+
+def _unpack_array(
+    buf: bytes,
+    offset: int,
+    n: int
+) -> typing.Tuple[array.array, int]:
+    typecode = chr(buf[offset])
+    if typecode not in "BHI":
+        raise FormatError(f"unknown typecode: {typecode!r}")
+    # === END IF ===
+
+    arr = array.array(typecode)
+    offset += 1
+    end = offset + n * arr.itemsize
+    arr.frombytes(buf[offset:end])
+
+    if _IS_BIG_ENDIAN:
+        arr.byteswap()
+    # === END IF ===
+
+    return arr, end
+# === END ===
+
+def _pack_strings(strings: typing.Sequence[str]) -> bytes:
+    encoded = [s.encode("utf-8") for s in strings]
+
+    return _pack_array([len(s) for s in encoded]) + b"".join(encoded)
+# === END ===
+
+def _unpack_strings(
+    buf: bytes,
+    offset: int,
+    n: int
+) -> typing.Tuple[typing.List[str], int]:
+    lengths, offset = _unpack_array(buf, offset, n)
+
+    res: typing.List[str] = []
+    for length in lengths:
+        res.append(buf[offset:offset + length].decode("utf-8"))
+        offset += length
+    # === END FOR ===
+
+    return res, offset
+# === END ===
+
+# ======
+# Records
+# ======
+class ParsedTree:
+    """
+    A parsed tree read from a binary file.
+
+    Attributes
+    ----------
+    ID : int
+        The ID of the sentence.
+    rank : int
+        The n-best rank of the tree, from 0.
+    prob : float
+        The log probability.
+    words : list of str
+        The tokens of the sentence.
+    cat_ids : array.array of int
+        The category IDs of the nodes in pre-order
+            (see `Reader.table`).
+    arities : array.array of int
+        The numbers of children of the nodes in pre-order.
+    """
+    __slots__ = ("ID", "rank", "prob", "words", "cat_ids", "arities")
+
+    def __init__(
+        self,
+        ID: int,
+        rank: int,
+        prob: float,
+        words: typing.List[str],
+        cat_ids: array.array,
+        arities: array.array,
+    ):
+        self.ID = ID
+        self.rank = rank
+        self.prob = prob
+        self.words = words
+        self.cat_ids = cat_ids
+        self.arities = arities
+    # === END ===
+
+    def print_ABCT(self, lookup: typing.Sequence[str]) -> str:
+        """
+        Print the tree in the ABC Treebank format,
+            the same as the ABCT output of `parser.dump_parsed_ABCT`.
+
+        Parameters
+        ----------
+        lookup : sequence of str
+            The translations of the categories indexed by their IDs
+                (`Reader.table.lookup`).
+        """
+        parts: typing.List[str] = [
+            f"(TOP (COMMENT {{probability={self.prob}}}) "
+        ]
+        append = parts.append
+        words = self.words
+        leaf_index = 0
+
+        # The numbers of the children yet to be printed of the open nodes
+        remaining: typing.List[int] = []
+
+        for cat_id, arity in zip(self.cat_ids, self.arities):
+            # Every node but the root is preceded by a space.
+            if remaining:
+                append(" ")
+            # === END IF ===
+
+            if arity:
+                append(f"({lookup[cat_id]}")
+                remaining.append(arity)
+                continue
+            # === END IF ===
+
+            append(f"({lookup[cat_id]} {words[leaf_index]})")
+            leaf_index += 1
+
+            # Close the nodes all of whose children are done.
+            while remaining:
+                remaining[-1] -= 1
+                if remaining[-1]:
+                    break
+                # === END IF ===
+                remaining.pop()
+                append(")")
+            # === END WHILE ===
+        # === END FOR ===
+
+        append(f" (ID {self.ID}))\n")
+        return "".join(parts)
+    # === END ===
+# === END CLASS ===
+
+class Failure:
+    """
+    A sentence given up on, read from a binary file.
+
+    Attributes
+    ----------
+    ID : int
+        The ID of the sentence.
+    reason : str
+        Why the sentence is given up on (e.g. "failed").
+    words : list of str
+        The tokens of the sentence.
+    """
+    __slots__ = ("ID", "reason", "words")
+
+    def __init__(self, ID: int, reason: str, words: typing.List[str]):
+        self.ID = ID
+        self.reason = reason
+        self.words = words
+    # === END ===
+
+    def print_ABCT(
+        self,
+        lookup: typing.Sequence[str] = (),
+        fallback: typing.Optional[str] = "FRAG",
+    ) -> str:
+        """
+        Print the sentence in the ABC Treebank format
+            (see `parser.print_fallback_ABCT`).
+        """
+        from . import parser
+
+        return parser.print_fallback_ABCT(
+            self.words, self.ID, self.reason, fallback
+        )
+    # === END ===
+# === END CLASS ===
+
+# ======
+# Writer
+# ======
+class Writer:
+    """
+    A writer of parsed trees in the binary format.
+
+    Parameters
+    ----------
+    stream : binary stream
+        The output stream.
+        The header is written on construction.
+    table : category.CategoryTable, optional
+        The category table.
+        Categories already in it are written before the first tree.
+
+    Attributes
+    ----------
+    table : category.CategoryTable
+        The category table of the file.
+    """
+
+    def __init__(
+        self,
+        stream: typing.BinaryIO,
+        table: typing.Optional[category.CategoryTable] = None,
+    ):
+        self.stream = stream
+        self.table = table if table is not None else category.CategoryTable()
+        # The number of the categories in the table already written
+        self._n_cats_written = 0
+
+        stream.write(_FILE_HEADER.pack(MAGIC, VERSION))
+    # === END ===
+
+    def _write_record(self, kind: bytes, payload: bytes) -> None:
+        self.stream.write(_RECORD_HEADER.pack(kind, len(payload)))
+        self.stream.write(payload)
+    # === END ===
+
+    def _write_new_cats(self) -> None:
+        cats = self.table.cats
+        if len(cats) == self._n_cats_written:
+            return
+        # === END IF ===
+
+        new_cats = cats[self._n_cats_written:]
+        self._write_record(
+            _KIND_CATS,
+            _COUNT.pack(len(new_cats)) + _pack_strings(new_cats)
+        )
+        self._n_cats_written = len(cats)
+    # === END ===
+
+    def write_tree(
+        self,
+        tree: "depccg.tree.Tree",
+        prob: float,
+        tokens,
+        ID: int,
+        rank: int = 0,
+    ) -> None:
+        """
+        Write a parsed tree.
+
+        Parameters
+        ----------
+        tree : depccg.tree.Tree
+            A parsed tree.
+        prob : float
+            The log probability of the tree.
+        tokens : list of depccg.tokens.Token, optional
+            The tokens of the sentence, in the order of the leaves.
+            If not given, the words of the leaves are taken.
+        ID : int
+            The ID of the sentence.
+        rank : int
+            The n-best rank of the tree.
+
+        Raises
+        ------
+        category.CategoryParseError
+            If a category of the tree is invalid.
+        """
+        from .parser import _get_token_word
+
+        intern = self.table.intern
+        cat_ids: typing.List[int] = []
+        arities: typing.List[int] = []
+        words: typing.List[str] = []
+
+        # Pre-order
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            cat_ids.append(intern(str(node.cat)))
+
+            if node.is_leaf:
+                arities.append(0)
+                if tokens is None:
+                    words.append(node.word)
+                else:
+                    words.append(_get_token_word(tokens[len(words)]))
+                # === END IF ===
+            else:
+                arities.append(len(node.children))
+                stack.extend(reversed(node.children))
+            # === END IF ===
+        # === END WHILE ===
+
+        self._write_new_cats()
+        self._write_record(
+            _KIND_TREE,
+            _TREE_HEADER.pack(ID, rank, prob, len(words), len(cat_ids))
+            + _pack_strings(words)
+            + _pack_array(cat_ids)
+            + _pack_array(arities)
+        )
+    # === END ===
+
+    def write_failure(
+        self,
+        words: typing.Sequence[str],
+        ID: int,
+        reason: str = "failed",
+    ) -> None:
+        """
+        Write a sentence given up on.
+        """
+        reason_encoded = reason.encode("utf-8")
+
+        self._write_record(
+            _KIND_FAILURE,
+            _FAILURE_HEADER.pack(ID, len(reason_encoded), len(words))
+            + reason_encoded
+            + _pack_strings(words)
+        )
+    # === END ===
+
+    def write_parsed(self, parsed, tokens, ID: int) -> None:
+        """
+        Write the n-best trees of a sentence,
+            or a failure if no tree is found.
+        """
+        if not parsed:
+            from .parser import _get_token_word
+
+            logger.warning("sentence %s: no parse found", ID)
+            self.write_failure(
+                [_get_token_word(token) for token in tokens], ID, "failed"
+            )
+            return
+        # === END IF ===
+
+        for rank, (tree, prob) in enumerate(parsed):
+            self.write_tree(tree, prob, tokens, ID, rank)
+        # === END FOR ===
+    # === END ===
+
+    def write_batch(
+        self,
+        parsed_trees,
+        tokens_of_trees,
+        start_ID: int = 1,
+    ) -> None:
+        """
+        Write parsed trees of consecutive sentences
+            (cf. `parser.print_batch_parsed_ABCT`).
+        """
+        for ID, (parsed, tokens) in enumerate(
+            zip(parsed_trees, tokens_of_trees),
+            start_ID
+        ):
+            self.write_parsed(parsed, tokens, ID)
+        # === END FOR ===
+    # === END ===
+# === END CLASS ===
+
+# ======
+# Reader
+# ======
+Record = typing.Union[ParsedTree, Failure]
+
+class Reader:
+    """
+    A streaming reader of the binary format.
+
+    Iterating over a reader yields its trees and failures in order,
+        reading one record at a time.
+    The category table grows as records are read.
+
+    Parameters
+    ----------
+    stream : binary stream
+        The input stream.
+        The header is read on construction.
+
+    Attributes
+    ----------
+    table : category.CategoryTable
+        The categories read so far.
+        `table.lookup` gives their translations in the ABC Treebank format,
+            and `category.parse(table.cats[i])` the categories themselves.
+
+    Raises
+    ------
+    FormatError
+        If the stream is not in the binary format.
+    """
+
+    def __init__(self, stream: typing.BinaryIO):
+        self.stream = stream
+        self.table = category.CategoryTable()
+
+        header = stream.read(_FILE_HEADER.size)
+        if len(header) < _FILE_HEADER.size:
+            raise FormatError("truncated header")
+        # === END IF ===
+
+        magic, version = _FILE_HEADER.unpack(header)
+        if magic != MAGIC:
+            raise FormatError("not a binary parse file")
+        elif version != VERSION:
+            raise FormatError(f"unsupported version: {version}")
+        # === END IF ===
+    # === END ===
+
+    def __iter__(self) -> typing.Iterator[Record]:
+        read = self.stream.read
+
+        while True:
+            header = read(_RECORD_HEADER.size)
+            if not header:
+                return
+            elif len(header) < _RECORD_HEADER.size:
+                raise FormatError("truncated record")
+            # === END IF ===
+
+            kind, length = _RECORD_HEADER.unpack(header)
+            payload = read(length)
+            if len(payload) < length:
+                raise FormatError("truncated record")
+            # === END IF ===
+
+            if kind == _KIND_TREE:
+                yield _decode_tree(payload)
+            elif kind == _KIND_CATS:
+                self._decode_cats(payload)
+            elif kind == _KIND_FAILURE:
+                yield _decode_failure(payload)
+            else:
+                raise FormatError(f"unknown record kind: {kind!r}")
+            # === END IF ===
+        # === END WHILE ===
+    # === END ===
+
+    def _decode_cats(self, payload: bytes) -> None:
+        n, = _COUNT.unpack_from(payload)
+        cats, _ = _unpack_strings(payload, _COUNT.size, n)
+        self.table.intern_all(cats)
+    # === END ===
+# === END CLASS ===
+
+def _decode_tree(payload: bytes) -> ParsedTree:
+    ID, rank, prob, n_words, n_nodes = _TREE_HEADER.unpack_from(payload)
+    words, offset = _unpack_strings(payload, _TREE_HEADER.size, n_words)
+    cat_ids, offset = _unpack_array(payload, offset, n_nodes)
+    arities, _ = _unpack_array(payload, offset, n_nodes)
+
+    return ParsedTree(ID, rank, prob, words, cat_ids, arities)
+# === END ===
+
+def _decode_failure(payload: bytes) -> Failure:
+    ID, reason_length, n_words = _FAILURE_HEADER.unpack_from(payload)
+    offset = _FAILURE_HEADER.size
+    reason = payload[offset:offset + reason_length].decode("utf-8")
+    words, _ = _unpack_strings(payload, offset + reason_length, n_words)
+
+    return Failure(ID, reason, words)
+# === END ===
+
+def iter_ABCT(
+    stream: typing.BinaryIO,
+    fallback: typing.Optional[str] = "FRAG",
+) -> typing.Iterator[str]:
+    """
+    Convert a binary file into the ABC Treebank format, line by line.
+
+    Parameters
+    ----------
+    stream : binary stream
+        The input.
+    fallback : str, optional
+        How to print sentences given up on (see `parser.FALLBACKS`).
+
+    Yields
+    ------
+    line : str
+        A tree in the ABC Treebank format, ending with a newline.
+        Nothing is yielded for failures if `fallback` is "none".
+    """
+    reader = Reader(stream)
+    lookup = reader.table.lookup
+
+    for record in reader:
+        if isinstance(record, ParsedTree):
+            yield record.print_ABCT(lookup)
+        else:
+            line = record.print_ABCT(lookup, fallback)
+            if line:
+                yield line
+            # === END IF ===
+        # === END IF ===
+    # === END FOR ===
+# === END ===
+
+def to_ABCT(data: bytes, fallback: typing.Optional[str] = "FRAG") -> str:
+    """
+    Convert the content of a binary file into the ABC Treebank format.
+    """
+    with io.BytesIO(data) as f:
+        return "".join(iter_ABCT(f, fallback))
+    # === END WITH f ===
+# === END ===
@@ -0,0 +1,439 @@
+"""
+A persistent cache of parse results.
+
+Parse results are stored in an SQLite database in a local directory,
+    keyed by the identity of the parser (see `parser.get_parser_identity`),
+    whether the sentence is tokenized by janome
+    (and if so, the version of janome and the ABC user dictionary,
+    see `tokenizer.get_user_dic_cache_key`),
+    and the tokenized sentence.
+Each entry holds the n-best trees, in the JSON format of depccg,
+    with their probabilities.
+The least recently used entries are evicted
+    when the database grows beyond a size limit.
+
+Cached trees are restored as `CachedTree`,
+    which can be printed in the ABC Treebank format or in JSON
+    just like the trees of depccg.
+"""
+
+import typing
+import json
+import hashlib
+import pathlib
+import sqlite3
+import threading
+import time
+import zlib
+
+from . import stats
+
+"""
+The default size limit of a cache.
+"""
+DEFAULT_MAX_BYTES: int = 1 << 30
+
+class CachedTree:
+    """
+    A parsed tree restored from the cache.
+
+    It provides the part of the interface of `depccg.tree.Tree`
+        which this package uses:
+        `cat`, `is_leaf`, `children`, `word` and `json`.
+    """
+    __slots__ = ("_json", "cat", "children", "word")
+
+    def __init__(self, tree_json: dict):
+        self._json = tree_json
+        self.cat: str = tree_json["cat"]
+        self.children: typing.List["CachedTree"] = [
+            CachedTree(child) for child in tree_json.get("children", ())
+        ]
+        self.word: str = tree_json.get("surf", tree_json.get("word", "ERROR"))
+    # === END ===
+
+    @property
+    def is_leaf(self) -> bool:
+        return not self.children
+    # === END ===
+
+    def json(self, tokens = None) -> dict:
+        """
+        Return the tree in the JSON format.
+        The tokens are ignored since they are already in the tree.
+        """
+        return self._json
+    # === END ===
+# === END CLASS ===
+
+class ParseCache:
+    """
+    A persistent cache of parse results.
+
+    Parameters
+    ----------
+    cache_dir : str or pathlib.Path
+        The directory of the cache database.
+    identity : str
+        The identity of the parser (see `parser.get_parser_identity`).
+        Entries of other parsers are never returned.
+    max_bytes : int
+        The size limit of the cached results in bytes.
+
+    Attributes
+    ----------
+    hits : int
+        The number of sentences found in the cache.
+    misses : int
+        The number of sentences not found in the cache.
+
+    Notes
+    -----
+    A cache can be passed to worker processes;
+        each process opens its own connection to the database.
+    Within a process, the connection is shared by threads
+        (e.g. the stages of `pipeline.iter_pipeline`) under a lock.
+    A cache is a context manager which closes the connection on exit.
+    """
+
+    def __init__(
+        self,
+        cache_dir: typing.Union[str, pathlib.Path],
+        identity: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.identity = identity
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._conn: typing.Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._tokenizer_key: typing.Optional[str] = None
+    # === END ===
+
+    def __getstate__(self) -> dict:
+        return {
+            "cache_dir": self.cache_dir,
+            "identity": self.identity,
+            "max_bytes": self.max_bytes,
+        }
+    # === END ===
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+    # === END ===
+
+    def __enter__(self) -> "ParseCache":
+        return self
+    # === END ===
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    # === END ===
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """
+        The connection to the database, opened on first access.
+        It must be used while holding `_lock`.
+        """
+        if self._conn is None:
+            self.cache_dir.mkdir(parents = True, exist_ok = True)
+            conn = sqlite3.connect(
+                str(self.cache_dir / "parses.sqlite3"),
+                timeout = 60,
+                # Threads are serialized by the lock.
+                check_same_thread = False,
+            )
+            # Allow concurrent readers while a worker writes.
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            with conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS entries (
+                        key BLOB PRIMARY KEY,
+                        value BLOB NOT NULL,
+                        size INTEGER NOT NULL,
+                        last_used REAL NOT NULL
+                    )
+                    """
+                )
+                conn.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS entries_last_used
+                    ON entries (last_used)
+                    """
+                )
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS meta (
+                        name TEXT PRIMARY KEY,
+                        value INTEGER NOT NULL
+                    )
+                    """
+                )
+                conn.execute(
+                    "INSERT OR IGNORE INTO meta VALUES ('total_size', 0)"
+                )
+            # === END WITH conn ===
+            self._conn = conn
+        # === END IF ===
+
+        return self._conn
+    # === END ===
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            # === END IF ===
+        # === END WITH ===
+    # === END ===
+
+    def make_key(
+        self,
+        sentence: typing.Union[str, typing.Sequence[str]],
+        is_to_tokenize: bool,
+    ) -> bytes:
+        """
+        Make the key of a tokenized sentence.
+
+        Parameters
+        ----------
+        sentence : str or sequence of str
+            A sentence whose words are separated by spaces,
+                or a sequence of words.
+        is_to_tokenize : bool
+            Whether the sentence is tokenized by janome,
+                which determines its tags
+                together with the version of janome and the user dictionary.
+        """
+        if not isinstance(sentence, str):
+            sentence = "\x1f".join(sentence)
+        # === END IF ===
+
+        if is_to_tokenize:
+            if self._tokenizer_key is None:
+                from . import tokenizer
+                self._tokenizer_key = tokenizer.get_user_dic_cache_key()
+            # === END IF ===
+            kind = "T" + self._tokenizer_key
+        else:
+            kind = "W"
+        # === END IF ===
+
+        return hashlib.blake2b(
+            "\x00".join((self.identity, kind, sentence)).encode("utf-8"),
+            digest_size = 16,
+        ).digest()
+    # === END ===
+
+    def get_many(
+        self,
+        keys: typing.Sequence[bytes]
+    ) -> typing.Dict[bytes, typing.List[typing.Tuple[CachedTree, float]]]:
+        """
+        Look up parse results.
+
+        Returns
+        -------
+        found : dict of bytes to list of (CachedTree, float)
+            The n-best trees and their probabilities of the keys found.
+        """
+        found: typing.Dict[bytes, typing.List[typing.Tuple[CachedTree, float]]] = {}
+        keys = list(set(keys))
+
+        with self._lock:
+            # SQLite limits the number of parameters of a statement.
+            for i in range(0, len(keys), 500):
+                keys_part = keys[i:i + 500]
+                placeholders = ",".join("?" * len(keys_part))
+                for key, value in self.conn.execute(
+                    f"SELECT key, value FROM entries WHERE key IN ({placeholders})",
+                    keys_part
+                ):
+                    found[key] = [
+                        (CachedTree(tree_json), prob)
+                        for tree_json, prob in json.loads(zlib.decompress(value))
+                    ]
+                # === END FOR ===
+            # === END FOR i ===
+
+            if found:
+                with self.conn:
+                    self.conn.executemany(
+                        "UPDATE entries SET last_used = ? WHERE key = ?",
+                        ((time.time(), key) for key in found)
+                    )
+                # === END WITH ===
+            # === END IF ===
+        # === END WITH ===
+
+        return found
+    # === END ===
+
+    def put_many(
+        self,
+        items: typing.Iterable[typing.Tuple[bytes, typing.List[typing.Tuple[dict, float]]]]
+    ) -> None:
+        """
+        Store parse results.
+
+        Parameters
+        ----------
+        items : iterable of (bytes, list of (dict, float))
+            Pairs of a key and the n-best trees in the JSON format
+                with their probabilities.
+        """
+        now = time.time()
+        added_size = 0
+
+        with self._lock:
+            with self.conn:
+                for key, parsed in items:
+                    value = zlib.compress(
+                        json.dumps(parsed, ensure_ascii = False).encode("utf-8")
+                    )
+                    cur = self.conn.execute(
+                        "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)",
+                        (key, value, len(value), now)
+                    )
+                    if cur.rowcount > 0:
+                        added_size += len(value)
+                    # === END IF ===
+                # === END FOR ===
+
+                self.conn.execute(
+                    "UPDATE meta SET value = value + ? WHERE name = 'total_size'",
+                    (added_size, )
+                )
+            # === END WITH ===
+
+            self._evict()
+        # === END WITH ===
+    # === END ===
+
+    def _get_total_size(self) -> int:
+        (total_size, ) = self.conn.execute(
+            "SELECT value FROM meta WHERE name = 'total_size'"
+        ).fetchone()
+        return total_size
+    # === END ===
+
+    def _evict(self) -> None:
+        if self._get_total_size() <= self.max_bytes:
+            return
+        # === END IF ===
+
+        # Other processes sharing the database may be evicting too.
+        # The victims are chosen, deleted and accounted for 
+        #   in a single transaction that holds the write lock from the start,
+        #   so that no entry is evicted or subtracted twice.
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+
+            total_size = self._get_total_size()
+            if total_size <= self.max_bytes:
+                return
+            # === END IF ===
+
+            # Evict down to 90% of the limit so as not to evict on every write.
+            target = self.max_bytes * 0.9
+            evicted_size = 0
+            evicted_keys = []
+
+            for key, size in self.conn.execute(
+                "SELECT key, size FROM entries ORDER BY last_used"
+            ):
+                if total_size - evicted_size <= target:
+                    break
+                # === END IF ===
+                evicted_keys.append((key, ))
+                evicted_size += size
+            # === END FOR ===
+
+            self.conn.executemany(
+                "DELETE FROM entries WHERE key = ?", evicted_keys
+            )
+            # Recounted rather than subtracted, 
+            #   which also corrects any drift of the total.
+            self.conn.execute(
+                """
+                UPDATE meta SET value = (SELECT COALESCE(SUM(size), 0) FROM entries)
+                WHERE name = 'total_size'
+                """
+            )
+        # === END WITH ===
+    # === END ===
+
+    def parse_doc(
+        self,
+        doc_tokenized: typing.Sequence[typing.Any],
+        doc_tagged: typing.Sequence[typing.Any],
+        is_to_tokenize: bool,
+        parse: typing.Callable[[typing.List[typing.Any]], typing.List[typing.Any]],
+    ) -> typing.List[typing.Any]:
+        """
+        Parse sentences,
+            handing only those not in the cache to `parse`.
+
+        Parameters
+        ----------
+        doc_tokenized : sequence
+            The tokenized sentences, as given to the parser of depccg.
+        doc_tagged : sequence
+            The tokens of the sentences.
+        is_to_tokenize : bool
+            Whether the sentences are tokenized by janome.
+        parse : callable
+            The parser, which takes a list of tokenized sentences
+                and returns the list of their n-best trees.
+
+        Returns
+        -------
+        parsed_trees : list
+            The n-best trees of the sentences.
+            The trees found in the cache are `CachedTree`.
+        """
+        with stats.timed("cache_lookup"):
+            keys = [self.make_key(sent, is_to_tokenize) for sent in doc_tokenized]
+            found = self.get_many(keys)
+        # === END WITH ===
+
+        missed_indices = [i for i, key in enumerate(keys) if key not in found]
+        self.hits += len(keys) - len(missed_indices)
+        self.misses += len(missed_indices)
+        stats.add("cache_hits", len(keys) - len(missed_indices))
+        stats.add("cache_misses", len(missed_indices))
+
+        parsed_trees: typing.List[typing.Any] = [found.get(key) for key in keys]
+
+        if missed_indices:
+            parsed_missed = parse(
+                [doc_tokenized[i] for i in missed_indices]
+            )
+
+            for i, parsed in zip(missed_indices, parsed_missed):
+                parsed_trees[i] = parsed
+            # === END FOR ===
+
+            with stats.timed("cache_store"):
+                self.put_many(
+                    (
+                        keys[i],
+                        [
+                            (tree.json(tokens = doc_tagged[i]), prob)
+                            for tree, prob in parsed
+                        ]
+                    )
+                    for i, parsed in zip(missed_indices, parsed_missed)
+                )
+            # === END WITH ===
+        # === END IF ===
+
+        return parsed_trees
+    # === END ===
+# === END CLASS ===
@@ -0,0 +1,591 @@
+r"""
+A hand-written parser of depccg categories.
+
+This is the parser used in the hot path of the ABCT output.
+It splits a category string into tokens with a single regular expression
+    and builds the category with an operator-precedence (shunting-yard) parser,
+    which runs in linear time with no recursion.
+
+The structure of categories is the same as that of the parsy reference
+    implementation in `category_parsy` (`category_parsy.pCAT`):
+    "/" binds tighter than "\", both associate to the left,
+    and the arguments are the antecedents.
+
+Categories are immutable and hash-consed (see `Cat`),
+    which keeps the memory of millions of categories
+    down to that of the distinct ones.
+`CatView` presents them as the dicts of `parser.parse_cat`.
+
+Examples
+--------
+>>> print(translate_TLG(parse("(S[m]/S[m])/(S[p]\\PP[s]\\PP[o])")))
+<<Sm/Sm>/<PPo\<PPs\Sp>>>
+"""
+
+import typing
+import abc
+import re
+import array
+import collections
+import collections.abc
+import functools
+import threading
+import weakref
+
+class CategoryParseError(ValueError):
+    """
+    Raised when a string is not a valid depccg category.
+    """
+# === END CLASS ===
+
+class Cat(abc.ABC):
+    """
+    The abstract base of categories.
+
+    Categories are immutable and hash-consed:
+        structurally equal categories are the same object,
+        which is shared by all the categories containing it.
+    Hence equality is identity and hashing takes constant time,
+        however large the categories are.
+
+    The interning tables hold categories weakly,
+        so that a long-running process (e.g. `serve`) does not leak them.
+    The `RECENT_CATS_SIZE` categories made last are kept alive,
+        together with the translations stored in them (see `translate_TLG`).
+    """
+    __slots__ = ("_translation", "__weakref__")
+
+    type: str
+
+    def __setattr__(self, name: str, value: typing.Any) -> typing.NoReturn:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    # === END ===
+
+    def __delattr__(self, name: str) -> typing.NoReturn:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    # === END ===
+
+    def __copy__(self) -> "Cat":
+        return self
+    # === END ===
+
+    def __deepcopy__(self, memo: dict) -> "Cat":
+        return self
+    # === END ===
+
+    @abc.abstractmethod
+    def to_dict(self) -> dict:
+        """
+        Convert the category to the dict representation of `parser.parse_cat`.
+        """
+    # === END ===
+# === END CLASS ===
+
+"""
+The number of the categories made last which are kept alive
+    while no other object refers to them.
+"""
+RECENT_CATS_SIZE: int = 1 << 16
+
+"""
+The interning tables of categories, holding weak references to them.
+Entries are removed when their categories are collected.
+"""
+_BASE_CATS: typing.Dict[str, "weakref.ref[BaseCat]"] = {}
+_FUNCTOR_CATS: typing.Dict[
+    typing.Tuple[str, Cat, Cat], "weakref.ref[FunctorCat]"
+] = {}
+
+"""
+The categories made last, kept alive (see `Cat`).
+"""
+_RECENT_CATS: typing.Deque[Cat] = collections.deque(maxlen = RECENT_CATS_SIZE)
+
+"""
+The lock of the interning tables, taken only to add or remove entries,
+    so that threads never intern two copies.
+It is reentrant as categories may be collected while it is held.
+"""
+_INTERN_LOCK: threading.RLock = threading.RLock()
+
+def _discard(table: dict, key: typing.Any, ref: weakref.ref) -> None:
+    with _INTERN_LOCK:
+        # The entry may have been replaced by a new category.
+        if table.get(key) is ref:
+            del table[key]
+        # === END IF ===
+    # === END WITH ===
+# === END ===
+
+def _intern(table: dict, key: typing.Any, cat: Cat) -> Cat:
+    """
+    Add a new category to an interning table,
+        or get the equal one added by another thread in the meantime.
+    """
+    with _INTERN_LOCK:
+        ref = table.get(key)
+        other = ref() if ref is not None else None
+        if other is not None:
+            return other
+        # === END IF ===
+
+        table[key] = weakref.ref(cat, functools.partial(_discard, table, key))
+        _RECENT_CATS.append(cat)
+    # === END WITH ===
+
+    return cat
+# === END ===
+
+class BaseCat(Cat):
+    """
+    An atomic category.
+
+    Attributes
+    ----------
+    lit : str
+        The name of the category in the ABC Treebank format (e.g. "Sm").
+
+    Examples
+    --------
+    >>> BaseCat("Sm") is BaseCat("Sm")
+    True
+    """
+    __slots__ = ("lit", )
+
+    type = "BASE"
+
+    def __new__(cls, lit: str) -> "BaseCat":
+        ref = _BASE_CATS.get(lit)
+        if ref is not None:
+            self = ref()
+            if self is not None:
+                return self
+            # === END IF ===
+        # === END IF ===
+
+        self = object.__new__(cls)
+        object.__setattr__(self, "lit", lit)
+        object.__setattr__(self, "_translation", None)
+        return _intern(_BASE_CATS, lit, self)
+    # === END ===
+
+    def __reduce__(self) -> tuple:
+        # Unpickled categories are interned again.
+        return (BaseCat, (self.lit, ))
+    # === END ===
+
+    def to_dict(self) -> dict:
+        return {
+            "type": "BASE",
+            "lit": self.lit,
+        }
+    # === END ===
+
+    def __repr__(self) -> str:
+        return f"BaseCat({self.lit!r})"
+    # === END ===
+# === END CLASS ===
+
+class FunctorCat(Cat):
+    r"""
+    A functor category.
+
+    Attributes
+    ----------
+    type : str
+        "L" for left functors (antecedent\consequence)
+            and "R" for right functors (consequence/antecedent).
+    antecedent : Cat
+        The argument.
+    consequence : Cat
+        The result.
+
+    Examples
+    --------
+    >>> FunctorCat("R", BaseCat("Sm"), BaseCat("Sm")) is parse("S[m]/S[m]")
+    True
+    """
+    __slots__ = ("type", "antecedent", "consequence")
+
+    def __new__(
+        cls,
+        type: str,
+        antecedent: Cat,
+        consequence: Cat
+    ) -> "FunctorCat":
+        # The children are interned,
+        #   so the key is hashed and compared in constant time.
+        key = (type, antecedent, consequence)
+        ref = _FUNCTOR_CATS.get(key)
+        if ref is not None:
+            self = ref()
+            if self is not None:
+                return self
+            # === END IF ===
+        # === END IF ===
+
+        self = object.__new__(cls)
+        object.__setattr__(self, "type", type)
+        object.__setattr__(self, "antecedent", antecedent)
+        object.__setattr__(self, "consequence", consequence)
+        object.__setattr__(self, "_translation", None)
+        return _intern(_FUNCTOR_CATS, key, self)
+    # === END ===
+
+    def __reduce__(self) -> tuple:
+        return (FunctorCat, (self.type, self.antecedent, self.consequence))
+    # === END ===
+
+    def to_dict(self) -> dict:
+        return {
+            "type": self.type,
+            "antecedent": self.antecedent.to_dict(),
+            "consequence": self.consequence.to_dict(),
+        }
+    # === END ===
+
+    def __repr__(self) -> str:
+        return (
+            f"FunctorCat({self.type!r}, "
+            f"{self.antecedent!r}, {self.consequence!r})"
+        )
+    # === END ===
+# === END CLASS ===
+
+class CatView(collections.abc.Mapping):
+    """
+    A read-only view of a category
+        as the dict representation of `parser.parse_cat`,
+        e.g. `{"type": "BASE", "lit": "Sm"}`.
+
+    Views of the antecedent and the consequence are made on access,
+        so no dicts are built.
+    Views compare equal to the dicts of the same categories.
+
+    Attributes
+    ----------
+    cat : Cat
+        The category.
+
+    Examples
+    --------
+    >>> view = CatView(parse("S[m]/NP"))
+    >>> view["antecedent"]["lit"]
+    'NP'
+    >>> view == {
+    ...     "type": "R",
+    ...     "antecedent": {"type": "BASE", "lit": "NP"},
+    ...     "consequence": {"type": "BASE", "lit": "Sm"},
+    ... }
+    True
+    """
+    __slots__ = ("cat", )
+
+    def __init__(self, cat: Cat):
+        self.cat = cat
+    # === END ===
+
+    def __getitem__(self, key: str) -> typing.Union[str, "CatView"]:
+        cat = self.cat
+
+        if key == "type":
+            return cat.type
+        elif cat.type == "BASE":
+            if key == "lit":
+                return cat.lit
+            # === END IF ===
+        elif key == "antecedent":
+            return CatView(cat.antecedent)
+        elif key == "consequence":
+            return CatView(cat.consequence)
+        # === END IF ===
+
+        raise KeyError(key)
+    # === END ===
+
+    def __iter__(self) -> typing.Iterator[str]:
+        if self.cat.type == "BASE":
+            return iter(("type", "lit"))
+        else:
+            return iter(("type", "antecedent", "consequence"))
+        # === END IF ===
+    # === END ===
+
+    def __len__(self) -> int:
+        return 2 if self.cat.type == "BASE" else 3
+    # === END ===
+
+    def __eq__(self, other: typing.Any) -> bool:
+        if isinstance(other, CatView):
+            return self.cat is other.cat
+        # === END IF ===
+
+        return super().__eq__(other)
+    # === END ===
+
+    def __hash__(self) -> int:
+        return hash(self.cat)
+    # === END ===
+
+    def __repr__(self) -> str:
+        return repr(self.cat.to_dict())
+    # === END ===
+# === END CLASS ===
+
+r"""
+The tokenizer of depccg categories.
+Atomic categories are any maximal runs of characters other than "()\/",
+    as in `category_parsy.pCAT_BASE`.
+"""
+_pTOKEN: typing.Pattern = re.compile(r"[()\\/]|[^()\\/]+")
+
+"""
+See `parser.pCAT_BASE_trans_table`.
+"""
+_BASE_trans_table: typing.Dict[int, str] = str.maketrans(
+    {
+        "[": "",
+        "]": ""
+    }
+)
+
+"""
+Operators, their precedences, and the types of the functors they make.
+"""
+_OPERATORS: typing.Dict[str, typing.Tuple[int, str]] = {
+    "\\": (1, "L"),
+    "/": (2, "R"),
+}
+
+def _reduce(operands: typing.List[Cat], op: str) -> None:
+    antecedent = operands.pop()
+    consequence = operands.pop()
+    operands.append(
+        FunctorCat(_OPERATORS[op][1], antecedent, consequence)
+    )
+# === END ===
+
+def parse(text: str) -> Cat:
+    """
+    Parse a depccg category.
+
+    Parameters
+    ----------
+    text : str
+        A string representation of a depccg category.
+
+    Returns
+    -------
+    res : Cat
+        The parsed category.
+
+    Raises
+    ------
+    CategoryParseError
+        If the input is not a valid category.
+    """
+    operands: typing.List[Cat] = []
+    ops: typing.List[str] = []
+    expects_operand = True
+
+    for token in _pTOKEN.findall(text):
+        if expects_operand:
+            if token == "(":
+                ops.append(token)
+            elif token in _OPERATORS or token == ")":
+                raise CategoryParseError(
+                    f"unexpected {token!r} in category {text!r}"
+                )
+            else:
+                operands.append(BaseCat(token.translate(_BASE_trans_table)))
+                expects_operand = False
+            # === END IF ===
+        elif token == ")":
+            while ops and ops[-1] != "(":
+                _reduce(operands, ops.pop())
+            # === END WHILE ===
+
+            if not ops:
+                raise CategoryParseError(
+                    f"unbalanced ')' in category {text!r}"
+                )
+            # === END IF ===
+            ops.pop()
+        elif token in _OPERATORS:
+            prec = _OPERATORS[token][0]
+            while ops and ops[-1] != "(" and _OPERATORS[ops[-1]][0] >= prec:
+                _reduce(operands, ops.pop())
+            # === END WHILE ===
+
+            ops.append(token)
+            expects_operand = True
+        else:
+            # Two atomic categories in a row are only possible after ")".
+            raise CategoryParseError(
+                f"unexpected {token!r} in category {text!r}"
+            )
+        # === END IF ===
+    # === END FOR token ===
+
+    if expects_operand:
+        raise CategoryParseError(f"incomplete category {text!r}")
+    # === END IF ===
+
+    while ops:
+        op = ops.pop()
+        if op == "(":
+            raise CategoryParseError(f"unbalanced '(' in category {text!r}")
+        # === END IF ===
+        _reduce(operands, op)
+    # === END WHILE ===
+
+    return operands[0]
+# === END ===
+
+def translate_TLG(cat: Cat) -> str:
+    """
+    Print a category in the ABC Treebank format.
+
+    Parameters
+    ----------
+    cat : Cat
+        A category.
+
+    Returns
+    -------
+    res : str
+        A string representation in the ABC Treebank format.
+
+    Notes
+    -----
+    The translation is stored in the category,
+        and thus shared by all the categories containing it.
+    """
+    res = cat._translation
+
+    if res is None:
+        if cat.type == "L":
+            res = f"<{translate_TLG(cat.antecedent)}\\{translate_TLG(cat.consequence)}>"
+        elif cat.type == "R":
+            res = f"<{translate_TLG(cat.consequence)}/{translate_TLG(cat.antecedent)}>"
+        else:
+            res = cat.lit
+        # === END IF ===
+        object.__setattr__(cat, "_translation", res)
+    # === END IF ===
+
+    return res
+# === END ===
+
+class _Interned(dict):
+    """
+    A dict from depccg categories to their IDs in a `CategoryTable`,
+        which interns categories missing from it,
+        so that lookups of known categories stay in C.
+    """
+    __slots__ = ("table", )
+
+    def __missing__(self, text: str) -> int:
+        return self.table.intern(text)
+    # === END ===
+# === END CLASS ===
+
+class _Translated(dict):
+    """
+    A dict from depccg categories to their translations,
+        which interns categories missing from it (see `_Interned`).
+    """
+    __slots__ = ("table", )
+
+    def __missing__(self, text: str) -> str:
+        return self.table.lookup[self.table.intern(text)]
+    # === END ===
+# === END CLASS ===
+
+class CategoryTable:
+    """
+    A table interning depccg categories.
+
+    Each distinct category is parsed and translated only once,
+        when it is first interned,
+        and is given an integer ID, the index in the lookup array.
+    IDs are stable for the lifetime of a table,
+        so that a table can be shared by batches.
+
+    Attributes
+    ----------
+    cats : list of str
+        The depccg categories, indexed by their IDs.
+    lookup : list of str
+        The translations in the ABC Treebank format, indexed by the IDs.
+    translate : callable
+        Get the translation of a category, interning it if new.
+        It is the bound lookup method of a dict,
+            which is cheaper per call than a method or an LRU cache
+            (see `parser.print_tree_ABCT`).
+
+    Examples
+    --------
+    >>> table = CategoryTable()
+    >>> table.intern_all(["NP[case=nc]", "S[m]/S[m]", "NP[case=nc]"]).tolist()
+    [0, 1, 0]
+    >>> table.lookup
+    ['NPcase=nc', '<Sm/Sm>']
+    >>> table.translate("S[m]/S[m]")
+    '<Sm/Sm>'
+    """
+    __slots__ = ("cats", "lookup", "translate", "_ids", "_translations")
+
+    def __init__(self):
+        self.cats: typing.List[str] = []
+        self.lookup: typing.List[str] = []
+        self._ids = _Interned()
+        self._ids.table = self
+        self._translations = _Translated()
+        self._translations.table = self
+        self.translate: typing.Callable[[str], str] = (
+            self._translations.__getitem__
+        )
+    # === END ===
+
+    def __len__(self) -> int:
+        return len(self.cats)
+    # === END ===
+
+    def intern(self, text: str) -> int:
+        """
+        Get the ID of a category, adding it to the table if new.
+
+        Raises
+        ------
+        CategoryParseError
+            If the category is new and invalid.
+            The table is left unchanged.
+        """
+        ID = self._ids.get(text)
+
+        if ID is None:
+            translation = translate_TLG(parse(text))
+            ID = len(self.cats)
+            self.cats.append(text)
+            self.lookup.append(translation)
+            self._ids[text] = ID
+            self._translations[text] = translation
+        # === END IF ===
+
+        return ID
+    # === END ===
+
+    def intern_all(self, texts: typing.Iterable[str]) -> "array.array":
+        """
+        Get the IDs of categories, adding new ones to the table.
+
+        Returns
+        -------
+        ids : array.array of int
+            The IDs, in the order of `texts`.
+        """
+        # Only new categories leave C for `intern`.
+        return array.array("i", map(self._ids.__getitem__, texts))
+    # === END ===
+# === END CLASS ===
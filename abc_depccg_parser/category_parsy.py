@@ -0,0 +1,142 @@
+"""
+The parsy reference implementation of the category parser.
+
+`category` is used in practice.
+This module is kept as the specification that it is checked against
+    (see `parser.parse_cat_parsy`).
+The parsers are also accessible as attributes of `parser` (e.g. `parser.pCAT`).
+"""
+
+import typing
+import parsy
+
+from .parser import pCAT_BASE_trans_table
+
+@parsy.generate
+def pCAT_BASE():
+    """
+    A parsy parser and translator of atomic depccg categories 
+        into abstract representations of CG categories.
+
+    Examples
+    --------
+    "S[m]" -> {"type": "BASE", "lit": "Sm"}
+    """
+
+    cat = yield parsy.regex(r"[^()\\/]+")
+
+    return {
+        "type": "BASE",
+        "lit": cat.translate(pCAT_BASE_trans_table)
+    }
+# === END ===
+
+@parsy.generate
+def pCAT_COMP_LEFT():
+    """
+    A parsy parser and translator of left-functor depccg categories 
+        into abstract representations of CG categories.
+
+    Examples
+    --------
+    "S[m]\\PP[s]\\PP[o]" -> 
+    {
+        "type": "L", 
+        "antecedent": {
+                "type": "Base",
+                "lit": "PPo",
+            }, 
+        "consequence": {
+            "type": "L":
+            "antecedent": {
+                "type": "Base",
+                "lit": "PPs",
+            }, 
+            "consequence": {
+                "type": "Base",
+                "lit": "Sm",
+            }, 
+        }
+    """
+
+    cat1 = yield pCAT_COMP_RIGHT 
+    cat_others = yield (
+        parsy.match_item("\\") 
+        >> (
+             pCAT_COMP_RIGHT
+        )
+    ).many()
+
+    res = cat1
+    for cat_next in cat_others:
+        res = {
+            "type": "L",
+            "antecedent": cat_next,
+            "consequence": res,
+        }
+    return res
+# === END ===
+
+@parsy.generate
+def pCAT_COMP_RIGHT():
+    """
+    A parsy parser and translator of right-functor depccg categories 
+        into abstract representations of CG categories.
+
+    Examples
+    --------
+    "S[m]/PP[s]/PP[o]" -> 
+    {
+        "type": "R", 
+        "antecedent": {
+                "type": "Base",
+                "lit": "PPo",
+            }, 
+        "consequence": {
+            "type": "R":
+            "antecedent": {
+                "type": "Base",
+                "lit": "PPs",
+            }, 
+            "consequence": {
+                "type": "Base",
+                "lit": "Sm",
+            }, 
+        }
+    """
+
+    cat1 = yield pCAT_BASE | pCAT_PAR
+    cat_others = yield (
+        parsy.match_item("/") 
+        >> (pCAT_BASE | pCAT_PAR)
+    ).many()
+
+    res = cat1
+    for cat_next in cat_others:
+        res = {
+            "type": "R",
+            "antecedent": cat_next,
+            "consequence": res,
+        }
+    return res
+# === END ===
+
+@parsy.generate
+def pCAT_PAR():
+    """
+    A parsy parser and translator of parenthesized depccg categories 
+        into abstract representations of CG categories.
+    """
+
+    yield parsy.match_item("(")
+    cat = yield pCAT
+    yield parsy.match_item(")")
+
+    return cat
+# === END ===
+
+"""
+The root paraser and translator of any depccg categories 
+    into abstract representations of CG categories.
+"""
+pCAT = pCAT_COMP_LEFT
@@ -0,0 +1,294 @@
+"""
+Checkpoints of long parse runs, which can be resumed.
+
+While `parse --output FILE` runs, its progress is recorded
+    in a checkpoint file (FILE.ckpt by default):
+    the last sentence ID whose trees are all written,
+    the size of the output up to it,
+    a digest of the input sentences up to it
+    and the identity of the parser.
+With `--resume`, the output is cut back to the checkpoint,
+    dropping whatever an interrupted run wrote after it,
+    the sentences up to the checkpoint are skipped
+    and parsing continues from the next sentence ID,
+    so that the output is the same as that of an uninterrupted run.
+
+A checkpoint is saved only after the output up to it is flushed to the disk,
+    and is replaced atomically (written to a temporary file and renamed),
+    so that it never refers to output which is not there.
+"""
+
+import typing
+import collections
+import hashlib
+import itertools
+import json
+import os
+import pathlib
+import re
+import time
+
+from . import parser
+
+"""
+The minimum interval in seconds between saving checkpoints.
+"""
+DEFAULT_INTERVAL: float = 5.0
+
+"""
+The sentence ID at the end of the output of a chunk in the ABC Treebank format.
+"""
+_pLAST_ID: typing.Pattern = re.compile(r"\(ID (\d+)\)\)\n?\Z")
+
+class CheckpointError(ValueError):
+    """
+    Raised when a run cannot be resumed from a checkpoint.
+    """
+# === END CLASS ===
+
+class Checkpoint(typing.NamedTuple):
+    """
+    The progress of a parse run.
+
+    Attributes
+    ----------
+    last_ID : int
+        The last sentence ID whose trees are all written (0 if none).
+    offset : int
+        The byte size of the output up to `last_ID`.
+    input_digest : str
+        The SHA-1 digest of the input sentences up to `last_ID`.
+    settings : dict
+        The settings of the run that affect the output
+            (e.g. the parser identity).
+    """
+    last_ID: int
+    offset: int
+    input_digest: str
+    settings: dict
+# === END CLASS ===
+
+def load(path: typing.Union[str, pathlib.Path]) -> typing.Optional[Checkpoint]:
+    """
+    Load a checkpoint.
+
+    Returns
+    -------
+    checkpoint : Checkpoint, optional
+        `None` if there is no checkpoint.
+
+    Raises
+    ------
+    CheckpointError
+        If the checkpoint file is broken.
+    """
+    try:
+        with open(path, encoding = "utf-8") as f:
+            return Checkpoint(**json.load(f))
+        # === END WITH f ===
+    except FileNotFoundError:
+        return None
+    except (ValueError, TypeError) as e:
+        # including json.JSONDecodeError
+        raise CheckpointError(f"broken checkpoint {str(path)!r}: {e}")
+    # === END TRY ===
+# === END ===
+
+def save(checkpoint: Checkpoint, path: typing.Union[str, pathlib.Path]) -> None:
+    """
+    Save a checkpoint atomically.
+    """
+    path = pathlib.Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    with open(tmp_path, "w", encoding = "utf-8") as f:
+        json.dump(checkpoint._asdict(), f)
+        f.flush()
+        os.fsync(f.fileno())
+    # === END WITH f ===
+
+    os.replace(tmp_path, path)
+# === END ===
+
+def get_last_ID(abct: str) -> typing.Optional[int]:
+    """
+    Get the ID of the last sentence in the output of a chunk
+        in the ABC Treebank format,
+        or `None` if there is no tree (e.g. with `--fallback none`).
+    """
+    match = _pLAST_ID.search(abct)
+    return int(match.group(1)) if match else None
+# === END ===
+
+class InputTracker:
+    """
+    The input of a run,
+        which keeps the sentences read until they are committed
+        and a digest of the committed sentences.
+
+    Iterating over it yields the sentences stripped (see `parser._strip_doc`),
+        the n-th of which has the sentence ID n.
+    It can be iterated over on another thread than that committing.
+
+    Attributes
+    ----------
+    last_ID : int
+        The ID of the last sentence committed.
+    """
+
+    def __init__(self, doc: typing.Iterable[str]):
+        self._sents = parser._strip_doc(doc)
+        self._pending: typing.Deque[str] = collections.deque()
+        self._hash = hashlib.sha1()
+        self.last_ID = 0
+    # === END ===
+
+    def __iter__(self) -> typing.Iterator[str]:
+        for sent in self._sents:
+            self._pending.append(sent)
+            yield sent
+        # === END FOR sent ===
+    # === END ===
+
+    def _update(self, sent: str) -> None:
+        self._hash.update(sent.encode("utf-8"))
+        self._hash.update(b"\n")
+        self.last_ID += 1
+    # === END ===
+
+    def skip(self, checkpoint: Checkpoint) -> None:
+        """
+        Skip the sentences up to a checkpoint,
+            which must be done before iterating.
+
+        Raises
+        ------
+        CheckpointError
+            If the input does not match the checkpoint.
+        """
+        for sent in self._sents:
+            if self.last_ID >= checkpoint.last_ID:
+                # Put it back.
+                self._sents = itertools.chain((sent, ), self._sents)
+                break
+            # === END IF ===
+            self._update(sent)
+        # === END FOR sent ===
+
+        if (
+            self.last_ID < checkpoint.last_ID
+            or self.digest != checkpoint.input_digest
+        ):
+            raise CheckpointError(
+                "the input does not match the checkpoint: "
+                f"it differs within the first {checkpoint.last_ID} sentences"
+            )
+        # === END IF ===
+    # === END ===
+
+    def commit(self, last_ID: int) -> None:
+        """
+        Commit the sentences up to `last_ID`, which must have been read.
+        """
+        while self.last_ID < last_ID:
+            self._update(self._pending.popleft())
+        # === END WHILE ===
+    # === END ===
+
+    def commit_all(self) -> None:
+        """
+        Commit all the sentences read.
+        """
+        while self._pending:
+            self._update(self._pending.popleft())
+        # === END WHILE ===
+    # === END ===
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()
+    # === END ===
+# === END CLASS ===
+
+class Checkpointer:
+    """
+    A recorder of the progress of a run.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The checkpoint file.
+    tracker : InputTracker
+        The input of the run.
+    output : binary stream
+        The output file.
+    settings : dict
+        The settings of the run that affect the output,
+            which must be the same when resuming.
+    interval : float
+        The minimum interval in seconds between saving checkpoints.
+    """
+
+    def __init__(
+        self,
+        path: typing.Union[str, pathlib.Path],
+        tracker: InputTracker,
+        output: typing.BinaryIO,
+        settings: dict,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        self.path = path
+        self.tracker = tracker
+        self.output = output
+        self.settings = settings
+        self.interval = interval
+        self._last_saved = time.monotonic()
+    # === END ===
+
+    def _save(self, offset: int) -> None:
+        self.output.flush()
+        os.fsync(self.output.fileno())
+
+        save(
+            Checkpoint(
+                last_ID = self.tracker.last_ID,
+                offset = offset,
+                input_digest = self.tracker.digest,
+                settings = self.settings,
+            ),
+            self.path,
+        )
+        self._last_saved = time.monotonic()
+    # === END ===
+
+    def update(self, abct: str, offset: int) -> None:
+        """
+        Record the output of a chunk, which has been written.
+
+        Parameters
+        ----------
+        abct : str
+            The output of the chunk in the ABC Treebank format.
+        offset : int
+            The size of the output after the chunk.
+        """
+        last_ID = get_last_ID(abct)
+        if last_ID is None:
+            return
+        # === END IF ===
+
+        self.tracker.commit(last_ID)
+
+        if time.monotonic() - self._last_saved >= self.interval:
+            self._save(offset)
+        # === END IF ===
+    # === END ===
+
+    def finish(self, offset: int) -> None:
+        """
+        Record the end of the run, where all the sentences read are done.
+        """
+        self.tracker.commit_all()
+        self._save(offset)
+    # === END ===
+# === END CLASS ===
@@ -1,4 +1,5 @@
 import typing
+import contextlib
 import itertools
 import sys
 import io
@@ -8,6 +9,7 @@ import click
 
 from . import parser
 from . import dic
+from . import stats
 
 # ======
 # Commandline commands
@@ -24,6 +26,136 @@ def cmd_main():
     """
 # === END ===
 
+def _make_parser_options(
+    config_file: typing.Optional[str],
+    **overrides: typing.Any
+) -> typing.Dict[str, typing.Any]:
+    """
+    Make the options of the parser from a configuration file
+        and the command line, the latter taking precedence.
+    """
+    try:
+        config = (
+            parser.load_parser_config(config_file) if config_file 
+            else {}
+        )
+    except ValueError as e:
+        # including json.JSONDecodeError
+        raise click.BadParameter(str(e), param_hint = "--parser-config")
+    # === END TRY ===
+
+    config.update(
+        (key, value) for key, value in overrides.items() 
+        if value is not None
+    )
+
+    try:
+        return parser.make_parser_options(config)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    # === END TRY ===
+# === END ===
+
+"""
+The options of the parser shared by the commands which load it
+    (see `_make_parser_options`).
+"""
+_PARSER_OPTION_DECORATORS: typing.Tuple[typing.Callable, ...] = (
+    click.option(
+        "--parser-config", "parser_config_file",
+        type = click.Path(exists = True, file_okay = True, dir_okay = False),
+        default = None,
+        metavar = "<json_file>",
+        help = (
+            "a JSON file of parser options "
+            "(unary_penalty, nbest, max_length, max_steps, possible_root_cats, "
+            "binary_rules, use_seen_rules, use_category_dict, gpu), "
+            "overridden by the options below"
+        )
+    ),
+    click.option(
+        "--unary-penalty", "unary_penalty",
+        type = click.FloatRange(min = 0),
+        default = None,
+        metavar = "<penalty>",
+        help = "the penalty on unary rules (default: 0.1)"
+    ),
+    click.option(
+        "--nbest", "nbest",
+        type = click.IntRange(min = 1),
+        default = None,
+        metavar = "<n>",
+        help = "the number of trees printed per sentence"
+    ),
+    click.option(
+        "--max-length", "max_length",
+        type = click.IntRange(min = 1),
+        default = None,
+        metavar = "<n_words>",
+        help = "give up on sentences longer than this (default: 250)"
+    ),
+    click.option(
+        "--max-steps", "max_steps",
+        type = click.IntRange(min = 1),
+        default = None,
+        metavar = "<n_steps>",
+        help = "give up on sentences taking more steps of the A* search than this (default: 10000000)"
+    ),
+    click.option(
+        "--root-cats", "root_cats",
+        default = None,
+        metavar = "<cat>,...",
+        help = "the categories allowed at the roots, separated by commas"
+    ),
+    click.option(
+        "--binary-rules", "binary_rules",
+        default = None,
+        metavar = "<rule>,...",
+        help = (
+            "the binary rules used, separated by commas, "
+            "e.g. \">,<,>B,<B1,<B2\" to drop <B3 and <B4 "
+            "(default: all of >, <, >B, <B1, <B2, <B3, <B4)"
+        )
+    ),
+)
+
+def _with_parser_options(command: typing.Callable) -> typing.Callable:
+    """
+    Add the options of the parser (`_PARSER_OPTION_DECORATORS`) to a command,
+        whose values are turned into those of `parser.make_parser_options`
+        by `_get_parser_options`.
+    """
+    for option in reversed(_PARSER_OPTION_DECORATORS):
+        command = option(command)
+    # === END FOR ===
+
+    return command
+# === END ===
+
+def _get_parser_options(
+    parser_config_file: typing.Optional[str],
+    unary_penalty: typing.Optional[float],
+    nbest: typing.Optional[int],
+    max_length: typing.Optional[int],
+    max_steps: typing.Optional[int],
+    root_cats: typing.Optional[str],
+    binary_rules: typing.Optional[str],
+) -> typing.Dict[str, typing.Any]:
+    """
+    Make the options of the parser from those of a command 
+        (see `_with_parser_options`).
+    """
+    return _make_parser_options(
+        parser_config_file,
+        unary_penalty = unary_penalty,
+        nbest = nbest,
+        max_length = max_length,
+        max_steps = max_steps,
+        possible_root_cats = root_cats and root_cats.split(","),
+        binary_rules = binary_rules and binary_rules.split(","),
+    )
+# === END ===
+
 @cmd_main.command(
     name = "parse",
     short_help = "parse sentences",
@@ -45,11 +177,176 @@ def cmd_main():
     default = 32,
     metavar = "<batch_size>",
 )
+@_with_parser_options
+@click.option(
+    "--max-tokens-per-batch", "max_tokens_per_batch",
+    type = click.IntRange(min = 1),
+    default = None,
+    help = (
+        "fill each batch of the supertagger up to this number of words "
+        "(counting the padding to the longest sentence) "
+        "instead of --batchsize sentences "
+        "(a sentence longer than this makes a batch of its own)"
+    )
+)
+@click.option(
+    "--sort-by-length/--no-sort-by-length", "is_to_sort_by_length",
+    default = False,
+    help = (
+        "whether to batch sentences of similar lengths together for the supertagger "
+        "(sentences are sorted within each chunk; see --max-in-flight)"
+    )
+)
+@click.option(
+    "--max-in-flight", "max_in_flight",
+    type = click.IntRange(min = 1, max = None),
+    default = None,
+    metavar = "<n_sentences>",
+    help = (
+        "the maximum number of sentences read from STDIN and kept in memory at once "
+        "(default: the batch size, or 8 batches with --sort-by-length)"
+    )
+)
+@click.option(
+    "--workers", "-j", "workers",
+    type = click.IntRange(min = 1, max = None),
+    default = 1,
+    metavar = "<n_workers>",
+    help = (
+        "the number of parser processes, each of which loads its own model "
+        "(only for the ABCT format)"
+    )
+)
+@click.option(
+    "--sentence-timeout", "sentence_timeout",
+    type = click.FloatRange(min = 0, min_open = True),
+    default = None,
+    metavar = "<seconds>",
+    help = (
+        "give up on sentences taking longer than this to parse "
+        "(parsing is moved to worker processes, which are restarted on timeouts; "
+        "only for the ABCT format)"
+    )
+)
+@click.option(
+    "--fallback", "fallback",
+    type = click.Choice(["FRAG", "ERROR", "none"], case_sensitive = False),
+    default = "FRAG",
+    help = (
+        "how to print sentences that are given up on: "
+        "a flat FRAG tree, a single ERROR node, or nothing "
+        "(only for the ABCT format)"
+    )
+)
 @click.option(
     "--tokenize/--no-tokenize", "-t/-nt", "is_to_tokenize",
     default = False,
     help = "whether to tokenize sentences before parsing"
 )
+@click.option(
+    "--tokenize-workers", "tokenize_workers",
+    type = click.IntRange(min = 1, max = None),
+    default = 1,
+    metavar = "<n_workers>",
+    help = (
+        "the number of tokenizer processes which work ahead of the parser "
+        "(only with --tokenize and a single parser process)"
+    )
+)
+@click.option(
+    "--pipeline/--no-pipeline", "is_pipelined",
+    default = False,
+    help = (
+        "whether to read, tokenize, parse and print sentences "
+        "concurrently on separate threads"
+    )
+)
+@click.option(
+    "--cache/--no-cache", "is_to_cache",
+    default = None,
+    help = (
+        "whether to reuse parse results of identical sentences across runs "
+        "(default: only if --cache-dir is given; only for the ABCT format)"
+    )
+)
+@click.option(
+    "--cache-dir", "cache_dir",
+    type = click.Path(file_okay = False, dir_okay = True),
+    default = None,
+    metavar = "<dir>",
+    help = "the directory of the parse cache (default: parses/ in the cache directory of this package)"
+)
+@click.option(
+    "--cache-max-mb", "cache_max_mb",
+    type = click.IntRange(min = 1, max = None),
+    default = 1024,
+    metavar = "<megabytes>",
+    help = "the size limit of the parse cache"
+)
+@click.option(
+    "--known-categories", "known_cats_file",
+    type = click.File("r", encoding = "utf-8"),
+    default = None,
+    metavar = "<file>",
+    help = "a file of depccg categories, one per line, to be translated to ABCT in advance"
+)
+@click.option(
+    "--index", "index_file",
+    type = click.Path(file_okay = True, dir_okay = False, writable = True),
+    default = None,
+    metavar = "<file>",
+    help = (
+        "write an index of the byte offsets of the trees by sentence ID "
+        "to this file, e.g. the output file with \".idx\" appended "
+        "(see the reader module; only for the ABCT format)"
+    )
+)
+@click.option(
+    "--output", "-o", "output_file",
+    type = click.Path(file_okay = True, dir_okay = False, writable = True),
+    default = None,
+    metavar = "<file>",
+    help = (
+        "write the output to this file instead of STDOUT, "
+        "keeping a checkpoint of the progress to resume from "
+        "(only for the ABCT format)"
+    )
+)
+@click.option(
+    "--checkpoint", "checkpoint_file",
+    type = click.Path(file_okay = True, dir_okay = False, writable = True),
+    default = None,
+    metavar = "<file>",
+    help = "the checkpoint file (default: the output file with \".ckpt\" appended)"
+)
+@click.option(
+    "--resume", "is_to_resume",
+    is_flag = True,
+    default = False,
+    help = (
+        "resume an interrupted run with the same input and settings "
+        "from its checkpoint, skipping the sentences already parsed "
+        "and appending to the output (requires --output; "
+        "starts afresh if there is no checkpoint)"
+    )
+)
+@click.option(
+    "--stats", "--profile", "is_to_report_stats",
+    is_flag = True,
+    default = False,
+    help = (
+        "report statistics in JSON on STDERR: the time of each stage, "
+        "sentences and words per second, a histogram of parse latency "
+        "per sentence amortized over batches, and cache hit rates"
+    )
+)
+@click.option(
+    "--stats-file", "stats_file",
+    type = click.Path(file_okay = True, dir_okay = False, writable = True),
+    default = None,
+    metavar = "<file>",
+    help = "write the statistics to this file instead of STDERR (implies --stats)"
+)
 @click.option(
     "--output-format", "--format", "-f", "output_format",
     type = click.Choice(
@@ -63,45 +360,508 @@ def cmd_main():
             'prolog', 
             'jigg_xml', 
             'ptb', 
-            'json'
+            'json',
+            'binary',
         ],
         case_sensitive = False
     ),
     default = "ABCT",
     metavar = "<output_format>",
-    help = "the printing format of parsed sentences"
+    help = (
+        "the printing format of parsed sentences "
+        "(binary: the compact format of the binary module, "
+        "which the to-abct command converts into ABCT)"
+    )
 )
 def cmd_parse(
     model: str,
     batch_size: int,
+    parser_config_file: typing.Optional[str],
+    unary_penalty: typing.Optional[float],
+    nbest: typing.Optional[int],
+    max_length: typing.Optional[int],
+    max_steps: typing.Optional[int],
+    root_cats: typing.Optional[str],
+    binary_rules: typing.Optional[str],
+    max_tokens_per_batch: typing.Optional[int],
+    is_to_sort_by_length: bool,
+    max_in_flight: typing.Optional[int],
+    workers: int,
+    sentence_timeout: typing.Optional[float],
+    fallback: str,
     is_to_tokenize: bool,
+    tokenize_workers: int,
+    is_pipelined: bool,
+    is_to_cache: typing.Optional[bool],
+    cache_dir: typing.Optional[str],
+    cache_max_mb: int,
+    known_cats_file: typing.Optional[typing.TextIO],
+    index_file: typing.Optional[str],
+    output_file: typing.Optional[str],
+    checkpoint_file: typing.Optional[str],
+    is_to_resume: bool,
+    is_to_report_stats: bool,
+    stats_file: typing.Optional[str],
     output_format: str
 ):
     """
     Parse sentences in STDIN each of which is separated by a newline.
+
+    Sentences are read, parsed and printed chunk by chunk,
+    so that the output begins before the whole input is consumed.
     """
-    parsed_trees, doc_tagged = parser.parse_doc(
-        doc = sys.stdin, 
-        model_path = model,
-        is_to_tokenize = is_to_tokenize,
-        batchsize = batch_size
+    if is_to_report_stats or stats_file:
+        stats.enable()
+    # === END IF ===
+
+    parser_options = _get_parser_options(
+        parser_config_file, unary_penalty, nbest, max_length, max_steps,
+        root_cats, binary_rules,
+    )
+
+    if is_to_cache is None:
+        is_to_cache = cache_dir is not None
+    # === END IF ===
+
+    uses_workers = bool(
+        workers > 1 or sentence_timeout
+        or (is_to_tokenize and tokenize_workers > 1)
     )
 
+    if (checkpoint_file or is_to_resume) and not output_file:
+        raise click.UsageError("checkpoints require --output")
+    # === END IF ===
+
+    if output_format.lower() != "abct":
+        if index_file:
+            raise click.BadParameter(
+                "indices are only available for the ABCT format",
+                param_hint = "--index",
+            )
+        # === END IF ===
+
+        if output_file:
+            raise click.BadParameter(
+                "output files are only available for the ABCT format",
+                param_hint = "--output",
+            )
+        # === END IF ===
+
+        if workers > 1:
+            raise click.BadParameter(
+                "multiple workers are only available for the ABCT format",
+                param_hint = "--workers",
+            )
+        # === END IF ===
+
+        if sentence_timeout:
+            raise click.BadParameter(
+                "timeouts are only available for the ABCT format",
+                param_hint = "--sentence-timeout",
+            )
+        # === END IF ===
+    # === END IF ===
+
+    parse_cache = None
+    if is_to_cache:
+        if output_format.lower() not in ("abct", "binary"):
+            raise click.BadParameter(
+                "the parse cache is only available for the ABCT and binary formats",
+                param_hint = "--cache",
+            )
+        # === END IF ===
+
+        from . import cache
+        from . import tokenizer
+
+        # Entered as with a `with` statement 
+        #   and closed when the command ends, even on errors.
+        parse_cache = click.get_current_context().with_resource(
+            cache.ParseCache(
+                cache_dir or tokenizer.get_cache_dir() / "parses",
+                identity = parser.get_parser_identity(model, parser_options),
+                max_bytes = cache_max_mb << 20,
+            )
+        )
+    # === END IF ===
+
     if output_format.lower() == "abct":
-        for i, (parsed, tokens) in enumerate(zip(parsed_trees, doc_tagged), 1):
-            parser.dump_parsed_ABCT(parsed, tokens, i)
-        # === END FOR ===
+        doc = sys.stdin
+        start_ID = 1
+        # The binary stream to write to in UTF-8,
+        #   if the output is encoded here to count its bytes
+        #   (which `reader.IndexedTreebank` reads back as UTF-8)
+        out = None
+        offset = 0
+        checkpointer = None
+
+        with contextlib.ExitStack() as stack:
+            if output_file:
+                out, offset, doc, checkpointer = _open_output_with_checkpoint(
+                    output_file,
+                    checkpoint_file or output_file + ".ckpt",
+                    is_to_resume = is_to_resume,
+                    settings = {
+                        "parser": parser.get_parser_identity(model, parser_options),
+                        "tokenize": is_to_tokenize,
+                        "fallback": fallback.lower(),
+                    },
+                )
+                stack.enter_context(out)
+                start_ID = doc.last_ID + 1
+            elif index_file:
+                from . import index
+
+                out = sys.stdout.buffer
+                sys.stdout.flush()
+                offset = index.get_start_offset(out)
+            # === END IF ===
+
+            index_writer = None
+            if index_file:
+                from . import index
+
+                index_writer = index.IndexWriter(
+                    stack.enter_context(open(index_file, "wb"))
+                )
+                # Write the ID table and the trailer even if the run fails,
+                #   so that the index covers the trees written so far.
+                stack.callback(index_writer.close)
+
+                if output_file and offset:
+                    # Index the output of the run resumed.
+                    with open(output_file, "rb") as f:
+                        index.add_output(index_writer, f, end = offset)
+                    # === END WITH f ===
+                # === END IF ===
+            # === END IF ===
+
+            results = parser.iter_parse_doc_ABCT(
+                doc = doc, 
+                model_path = model,
+                is_to_tokenize = is_to_tokenize,
+                batchsize = batch_size,
+                max_in_flight = max_in_flight,
+                workers = workers,
+                cache = parse_cache,
+                sentence_timeout = sentence_timeout,
+                fallback = {"frag": "FRAG", "error": "ERROR"}.get(fallback.lower()),
+                sort_by_length = is_to_sort_by_length,
+                max_tokens_per_batch = max_tokens_per_batch,
+                tokenize_workers = tokenize_workers,
+                pipelined = is_pipelined,
+                parser_options = parser_options,
+                start_ID = start_ID,
+                # Read here, to be sent to the workers if any.
+                known_cats = known_cats_file and known_cats_file.readlines(),
+            )
+
+            for abct in _iter_reporting_worker_errors(uses_workers, results):
+                with stats.timed("write"):
+                    if out is None:
+                        sys.stdout.write(abct)
+                        sys.stdout.flush()
+                    else:
+                        data = abct.encode("utf-8")
+                        if index_writer is not None:
+                            index_writer.add_lines(data, offset)
+                        # === END IF ===
+                        out.write(data)
+                        out.flush()
+                        offset += len(data)
+
+                        if checkpointer is not None:
+                            checkpointer.update(abct, offset)
+                        # === END IF ===
+                    # === END IF ===
+                # === END WITH ===
+            # === END FOR abct ===
+
+            if checkpointer is not None:
+                checkpointer.finish(offset)
+            # === END IF ===
+        # === END WITH stack ===
+    elif output_format.lower() == "binary":
+        from . import binary
+
+        out = sys.stdout.buffer
+        writer = binary.Writer(out)
+        ID = 1
+
+        results = parser.iter_parse_doc(
+            doc = sys.stdin, 
+            model_path = model,
+            is_to_tokenize = is_to_tokenize,
+            batchsize = batch_size,
+            max_in_flight = max_in_flight,
+            cache = parse_cache,
+            sort_by_length = is_to_sort_by_length,
+            max_tokens_per_batch = max_tokens_per_batch,
+            tokenize_workers = tokenize_workers,
+            pipelined = is_pipelined,
+            parser_options = parser_options,
+        )
+
+        for parsed_trees, doc_tagged in _iter_reporting_worker_errors(
+            uses_workers, results
+        ):
+            with stats.timed("print"):
+                writer.write_batch(parsed_trees, doc_tagged, ID)
+            # === END WITH ===
+            with stats.timed("write"):
+                out.flush()
+            # === END WITH ===
+
+            ID += len(parsed_trees)
+        # === END FOR chunk ===
     else:
-        parser.dump_batch_parsed_others(
-            parsed_trees,
-            doc_tagged,
-            output_format = output_format,
-            lang = "ja",
-            stream = sys.stdout,
+        output_format = output_format.lower()
+        is_streamable = output_format in parser.STREAMABLE_FORMATS
+
+        if not is_streamable:
+            parser.logger.warning(
+                "the %s format encloses the whole document; "
+                "all the sentences are kept in memory until the end of the input",
+                output_format
+            )
+        # === END IF ===
+
+        # Sentences to be printed together (see `is_streamable`)
+        parsed_trees_all = []
+        doc_tagged_all = []
+        ID = 1
+
+        results = parser.iter_parse_doc(
+            doc = sys.stdin, 
+            model_path = model,
+            is_to_tokenize = is_to_tokenize,
+            batchsize = batch_size,
+            max_in_flight = max_in_flight,
+            sort_by_length = is_to_sort_by_length,
+            max_tokens_per_batch = max_tokens_per_batch,
+            tokenize_workers = tokenize_workers,
+            pipelined = is_pipelined,
+            parser_options = parser_options,
         )
+
+        for parsed_trees, doc_tagged in _iter_reporting_worker_errors(
+            uses_workers, results
+        ):
+            if is_streamable:
+                with stats.timed("print"):
+                    parser.dump_batch_parsed_others(
+                        parsed_trees,
+                        doc_tagged,
+                        output_format = output_format,
+                        lang = "ja",
+                        stream = sys.stdout,
+                        start_ID = ID,
+                    )
+                # === END WITH ===
+                with stats.timed("write"):
+                    sys.stdout.flush()
+                # === END WITH ===
+
+                ID += len(parsed_trees)
+            else:
+                parsed_trees_all.extend(parsed_trees)
+                doc_tagged_all.extend(doc_tagged)
+            # === END IF ===
+        # === END FOR chunk ===
+
+        if not is_streamable:
+            with stats.timed("print"):
+                parser.dump_batch_parsed_others(
+                    parsed_trees_all,
+                    doc_tagged_all,
+                    output_format = output_format,
+                    lang = "ja",
+                    stream = sys.stdout,
+                )
+            # === END WITH ===
+        # === END IF ===
+    # === END IF ===
+
+    if stats.collector:
+        _dump_stats(stats.collector.report(), stats_file)
+    # === END IF ===
+# === END ===
+
+def _iter_reporting_worker_errors(
+    uses_workers: bool,
+    results: typing.Iterator[typing.Any],
+) -> typing.Iterator[typing.Any]:
+    """
+    Iterate over the results of parsing,
+        reporting the failure of worker processes to start
+        (see `workers.WorkerError`) as an error of the command.
+    """
+    if not uses_workers:
+        # Spare importing the workers module.
+        yield from results
+        return
+    # === END IF ===
+
+    from . import workers
+
+    try:
+        yield from results
+    except workers.WorkerError as e:
+        raise click.ClickException(str(e))
+    # === END TRY ===
+# === END ===
+
+def _open_output_with_checkpoint(
+    output_file: str,
+    checkpoint_file: str,
+    is_to_resume: bool,
+    settings: dict,
+) -> typing.Tuple[typing.BinaryIO, int, "checkpoint.InputTracker", "checkpoint.Checkpointer"]:
+    """
+    Open the output file, resuming from the checkpoint if asked.
+
+    Returns
+    -------
+    out : binary stream
+        The output file, positioned at the end of the output kept.
+    offset : int
+        The size of the output kept.
+    doc : checkpoint.InputTracker
+        The input from STDIN, with the sentences already parsed skipped.
+    checkpointer : checkpoint.Checkpointer
+        The recorder of the progress.
+    """
+    from . import checkpoint
+
+    doc = checkpoint.InputTracker(sys.stdin)
+
+    try:
+        last = checkpoint.load(checkpoint_file) if is_to_resume else None
+    except checkpoint.CheckpointError as e:
+        raise click.ClickException(str(e))
+    # === END TRY ===
+
+    if last is None:
+        out = open(output_file, "wb")
+        offset = 0
+    else:
+        if last.settings != settings:
+            raise click.UsageError(
+                "cannot resume: the model or the settings of the parser "
+                "differ from those of the checkpoint"
+            )
+        # === END IF ===
+
+        try:
+            doc.skip(last)
+        except checkpoint.CheckpointError as e:
+            raise click.UsageError(f"cannot resume: {e}")
+        # === END TRY ===
+
+        try:
+            out = open(output_file, "r+b")
+        except FileNotFoundError:
+            raise click.UsageError(
+                f"cannot resume: the output file {output_file!r} is missing"
+            )
+        # === END TRY ===
+
+        # Drop the output after the checkpoint.
+        if out.seek(0, io.SEEK_END) < last.offset:
+            out.close()
+            raise click.UsageError(
+                f"cannot resume: the output file {output_file!r} "
+                "is shorter than in the checkpoint"
+            )
+        # === END IF ===
+        out.truncate(last.offset)
+        out.seek(last.offset)
+        offset = last.offset
+    # === END IF ===
+
+    return (
+        out, offset, doc, 
+        checkpoint.Checkpointer(checkpoint_file, doc, out, settings)
+    )
+# === END ===
+
+def _dump_stats(report: dict, path: typing.Optional[str]) -> None:
+    import json
+
+    if path:
+        with open(path, "w", encoding = "utf-8") as f:
+            json.dump(report, f, indent = 2)
+            f.write("\n")
+        # === END WITH f ===
+    else:
+        json.dump(report, sys.stderr, indent = 2)
+        sys.stderr.write("\n")
     # === END IF ===
 # === END ===
 
+@cmd_main.command(
+    name = "to-abct",
+    short_help = "convert the binary output into ABCT"
+)
+@click.option(
+    "--fallback", "fallback",
+    type = click.Choice(["FRAG", "ERROR", "none"], case_sensitive = False),
+    default = "FRAG",
+    help = "how to print sentences that are given up on (see the parse command)"
+)
+def cmd_to_abct(fallback: str):
+    """
+    Convert parsed sentences in STDIN, 
+        which is the binary output of the parse command,
+        into the ABC Treebank format.
+    """
+    from . import binary
+
+    try:
+        for line in binary.iter_ABCT(
+            sys.stdin.buffer,
+            fallback = {"frag": "FRAG", "error": "ERROR"}.get(fallback.lower()),
+        ):
+            sys.stdout.write(line)
+        # === END FOR line ===
+    except binary.FormatError as e:
+        raise click.ClickException(str(e))
+    # === END TRY ===
+# === END ===
+
+@cmd_main.command(
+    name = "index",
+    short_help = "index parsed output in ABCT"
+)
+@click.argument(
+    "output_file",
+    type = click.Path(exists = True, dir_okay = False),
+)
+@click.option(
+    "--output", "-o", "index_file",
+    type = click.Path(file_okay = True, dir_okay = False, writable = True),
+    default = None,
+    metavar = "<file>",
+    help = "the index file (default: the output file with \".idx\" appended)"
+)
+def cmd_index(output_file: str, index_file: typing.Optional[str]):
+    """
+    Build the index of an output of the parse command in the ABC Treebank format
+        (see the --index option of the parse command).
+    """
+    from . import index
+
+    with open(output_file, "rb") as output, open(
+        index_file or output_file + ".idx", "wb"
+    ) as f:
+        try:
+            index.build_index(output, f)
+        except index.BrokenIndexError as e:
+            raise click.ClickException(str(e))
+        # === END TRY ===
+    # === END WITH ===
+# === END ===
+
 @cmd_main.command(
     name = "dic",
     short_help = "list special lexical entries"
@@ -111,4 +871,196 @@ def cmd_dic():
     List the lexical entries specially added for this parser.
     """
     dic.dump_dic_as_csv(stream = sys.stdout)
-# === END ===
\ No newline at end of file
+# === END ===
+
+@cmd_main.command(
+    name = "serve",
+    short_help = "serve a parser over HTTP",
+)
+@click.option(
+    "--model", "-m",
+    type = click.Path(
+        exists = True,
+        file_okay = False,
+        dir_okay = True,
+    ),
+    metavar = "<user_model>",
+    help = "path to a user model"
+)
+@click.option(
+    "--batchsize", "-b", "batch_size",
+    type = click.IntRange(min = 1, max = None),
+    default = 32,
+    metavar = "<batch_size>",
+)
+@_with_parser_options
+@click.option(
+    "--tokenize/--no-tokenize", "-t/-nt", "is_to_tokenize",
+    default = False,
+    help = "whether to tokenize sentences by default"
+)
+@click.option(
+    "--host",
+    default = "127.0.0.1",
+    metavar = "<host>",
+)
+@click.option(
+    "--port", "-p",
+    type = click.IntRange(min = 0, max = 65535),
+    default = 8765,
+    metavar = "<port>",
+)
+@click.option(
+    "--socket", "socket_path",
+    type = click.Path(dir_okay = False),
+    default = None,
+    metavar = "<socket_path>",
+    help = "listen on a Unix domain socket instead of a TCP port"
+)
+@click.option(
+    "--max-batch-sentences", "max_batch_sentences",
+    type = click.IntRange(min = 1, max = None),
+    default = 256,
+    metavar = "<n_sentences>",
+    help = "the maximum number of sentences of concurrent requests parsed together"
+)
+@click.option(
+    "--max-wait-ms", "max_wait_ms",
+    type = click.FloatRange(min = 0, max = None),
+    default = 10,
+    metavar = "<milliseconds>",
+    help = "how long to wait for concurrent requests before parsing"
+)
+def cmd_serve(
+    model: str,
+    batch_size: int,
+    parser_config_file: typing.Optional[str],
+    unary_penalty: typing.Optional[float],
+    nbest: typing.Optional[int],
+    max_length: typing.Optional[int],
+    max_steps: typing.Optional[int],
+    root_cats: typing.Optional[str],
+    binary_rules: typing.Optional[str],
+    is_to_tokenize: bool,
+    host: str,
+    port: int,
+    socket_path: typing.Optional[str],
+    max_batch_sentences: int,
+    max_wait_ms: float,
+):
+    """
+    Load the parser once and parse sentences sent over HTTP.
+    """
+    from . import server
+
+    parser_options = _get_parser_options(
+        parser_config_file, unary_penalty, nbest, max_length, max_steps,
+        root_cats, binary_rules,
+    )
+
+    try:
+        server.serve(
+            model_path = model,
+            parser_options = parser_options,
+            host = host,
+            port = port,
+            socket_path = socket_path,
+            is_to_tokenize = is_to_tokenize,
+            batchsize = batch_size,
+            max_batch_sentences = max_batch_sentences,
+            max_wait = max_wait_ms / 1000,
+        )
+    except KeyboardInterrupt:
+        pass
+    # === END TRY ===
+# === END ===
+
+@cmd_main.command(
+    name = "client",
+    short_help = "parse sentences with a parse server",
+)
+@click.option(
+    "--batchsize", "-b", "batch_size",
+    type = click.IntRange(min = 1, max = None),
+    default = 32,
+    metavar = "<batch_size>",
+    help = "the number of sentences sent per request"
+)
+@click.option(
+    "--tokenize/--no-tokenize", "-t/-nt", "is_to_tokenize",
+    default = None,
+    help = "whether to tokenize sentences before parsing (default: the server setting)"
+)
+@click.option(
+    "--output-format", "--format", "-f", "output_format",
+    type = click.Choice(["ABCT", "json"], case_sensitive = False),
+    default = "ABCT",
+    metavar = "<output_format>",
+    help = "the printing format of parsed sentences (json: one result per line)"
+)
+@click.option(
+    "--host",
+    default = "127.0.0.1",
+    metavar = "<host>",
+)
+@click.option(
+    "--port", "-p",
+    type = click.IntRange(min = 0, max = 65535),
+    default = 8765,
+    metavar = "<port>",
+)
+@click.option(
+    "--socket", "socket_path",
+    type = click.Path(dir_okay = False),
+    default = None,
+    metavar = "<socket_path>",
+    help = "connect to a Unix domain socket instead of a TCP port"
+)
+def cmd_client(
+    batch_size: int,
+    is_to_tokenize: typing.Optional[bool],
+    output_format: str,
+    host: str,
+    port: int,
+    socket_path: typing.Optional[str],
+):
+    """
+    Parse sentences in STDIN each of which is separated by a newline
+        with a running parse server (see the serve command).
+    """
+    import json
+    from . import server
+
+    output_format = "json" if output_format.lower() == "json" else "ABCT"
+
+    with server.Client(host, port, socket_path) as client:
+        ID = 1
+        for chunk in parser.iter_chunks(
+            filter(None, (sent.strip() for sent in sys.stdin)),
+            batch_size
+        ):
+            try:
+                res = client.parse(
+                    chunk,
+                    output_format = output_format,
+                    is_to_tokenize = is_to_tokenize,
+                    start_ID = ID,
+                )
+            except (RuntimeError, OSError) as e:
+                raise click.ClickException(str(e))
+            # === END TRY ===
+
+            if output_format == "json":
+                for result in res:
+                    sys.stdout.write(json.dumps(result, ensure_ascii = False))
+                    sys.stdout.write("\n")
+                # === END FOR result ===
+            else:
+                sys.stdout.write(res)
+            # === END IF ===
+            sys.stdout.flush()
+
+            ID += len(chunk)
+        # === END FOR chunk ===
+    # === END WITH client ===
+# === END ===
@@ -65,7 +65,9 @@ def generate_abc_dic(
     Notes
     -----
     The authors choose a set, rather than a generator, for the returning result
-        since this subroutine is intended to be externally cached (not implemented yet).
+        since this subroutine is intended to be externally cached.
+    `tokenizer.generate_tokenizer` caches the compiled dictionary on disk,
+        keyed by a hash of this module.
 
     Examples
     --------
@@ -79,7 +81,7 @@ def generate_abc_dic(
     """
 
     if sysdic:
-        return _gen_abc_dic(sysdic)
+        return set(_gen_abc_dic(sysdic))
     else:
         import janome.dic
         from janome.sysdic import (
@@ -126,92 +128,9 @@ def _gen_abc_dic(
     # ------
     # collecting atomic morphemes
     # ------
-
-    # Note: Lists of found morphemes should be fixed as tuples
-    #       rather than iterators so that they can be made use of
-    #       (possibly) multiple times.
-
-    morphemes: typing.Dict[str, typing.Tuple[JanomeLexEntry]] = {
-        # -- はず（名詞，非自立）
-        "hazu": tuple(
-            JanomeLexEntry(*e)
-            for e in sysdic
-            if re.match(r"^(はず|ハズ|筈)$", e[7]) and re.match(r"名詞,非自立", e[4])
-        ),
-        # -- か（終助詞）
-        "ka": tuple(
-            JanomeLexEntry(*e)
-            for e in sysdic
-            if re.match(r"^か$", e[7])
-        ),
-        # -- ない（形容詞）
-        "nai_adj": tuple(
-            JanomeLexEntry(*e) 
-            for e in sysdic
-            if re.match(r"^(ない|無い)$", e[7]) and re.match(r"形容詞", e[4])
-        ),
-        # -- ない（助動詞）
-        # -- ん（助動詞）
-        # -- ぬ（否定助動詞）
-        "nai_aux": tuple(
-            JanomeLexEntry(*e)
-            for e in sysdic
-            if (
-                re.match(r"^ん$", e[7]) 
-                or (re.match(r"^ない$", e[7]) and re.match(r"助動詞", e[4]))
-                or (re.match(r"^ぬ$", e[7]) and re.match(r"特殊・ヌ", e[5]))
-            )
-        ),
-        # -- ます（助動詞）
-        "masu": tuple(
-            JanomeLexEntry(*e)
-            for e in sysdic
-            if re.match(r"^ます", e[7]) and re.match(r"助動詞", e[4])
-        ),
-        # -- ある（自立動詞）
-        "aru": tuple(
-            JanomeLexEntry(*e)
-            for e in sysdic
-            if re.match(r"^(ある|有る)$", e[7]) and re.match(r"動詞,自立", e[4])
-        ),
-        # -- なる（補助動詞）
-        "naru": tuple(
-            JanomeLexEntry(*e)
-            for e in sysdic
-            if re.match(r"^(なる|成る)$", e[7]) and re.match(r"動詞,非自立", e[4])
-        ),
-        # -- いく（補助動詞）
-        "iku": tuple(
-            JanomeLexEntry(*e)
-            for e in sysdic
-            if re.match(r"^(いく|行く)$", e[7]) and re.match(r"動詞,非自立", e[4])
-        ),
-        # -- いける（補助動詞）
-        "ikeru": tuple(
-            JanomeLexEntry(*e)
-            for e in sysdic
-            if re.match(r"^(いける|行ける)$", e[7]) and re.match(r"動詞,非自立", e[4])
-        ),
-        # -- て・で（接続助詞）
-        "te": tuple(
-            JanomeLexEntry(*e)
-            for e in sysdic
-            if re.match(r"^(て|で)$", e[7]) and re.match(r"助詞,接続助詞", e[4])
-        ),
-        # -- う（助動詞）
-        "u": tuple(
-            JanomeLexEntry(*e)
-            for e in sysdic
-            if re.match(r"^う$", e[7]) and re.match(r"助動詞", e[4])
-        ),
-        # -- だろ
-        # -- でしょ
-        "daro": tuple(
-            JanomeLexEntry(*e)
-            for e in sysdic
-            if re.match(r"^(だ|です)$", e[7]) and re.match(r"未然形", e[6])
-        )
-    }
+    morphemes: typing.Dict[str, typing.Tuple[JanomeLexEntry]] = (
+        _collect_morphemes(sysdic)
+    )
 
     # ------
     # generating intermediate morphemes
@@ -523,6 +442,142 @@ def _gen_abc_dic(
     )
 # === END ===
 
+# ------
+# Rules of atomic morphemes
+# ------
+_pPOS_NOUN_DEP = re.compile(r"名詞,非自立")
+_pPOS_ADJ = re.compile(r"形容詞")
+_pPOS_AUX = re.compile(r"助動詞")
+_pPOS_VERB_INDEP = re.compile(r"動詞,自立")
+_pPOS_VERB_DEP = re.compile(r"動詞,非自立")
+_pPOS_CONJ_PARTICLE = re.compile(r"助詞,接続助詞")
+_pINFL_TYPE_NU = re.compile(r"特殊・ヌ")
+_pINFL_FORM_IRREALIS = re.compile(r"未然形")
+
+"""
+Rules of the atomic morphemes collected from the system dictionary,
+    indexed by base forms.
+
+Each rule is a triple of the name of the morpheme,
+    the index of the field of an entry to be further checked,
+    and the pattern that the field should match.
+The index and the pattern are None if there is no further condition.
+"""
+_MORPHEME_RULES_BY_BASE_FORM: typing.Dict[
+    str,
+    typing.Tuple[
+        typing.Tuple[str, typing.Optional[int], typing.Optional[typing.Pattern]],
+        ...
+    ]
+] = {
+    # -- はず（名詞，非自立）
+    "はず": (("hazu", 4, _pPOS_NOUN_DEP), ),
+    "ハズ": (("hazu", 4, _pPOS_NOUN_DEP), ),
+    "筈": (("hazu", 4, _pPOS_NOUN_DEP), ),
+    # -- か（終助詞）
+    "か": (("ka", None, None), ),
+    # -- ない（形容詞）
+    # -- ない（助動詞）
+    "ない": (
+        ("nai_adj", 4, _pPOS_ADJ),
+        ("nai_aux", 4, _pPOS_AUX),
+    ),
+    "無い": (("nai_adj", 4, _pPOS_ADJ), ),
+    # -- ん（助動詞）
+    "ん": (("nai_aux", None, None), ),
+    # -- ぬ（否定助動詞）
+    "ぬ": (("nai_aux", 5, _pINFL_TYPE_NU), ),
+    # -- ある（自立動詞）
+    "ある": (("aru", 4, _pPOS_VERB_INDEP), ),
+    "有る": (("aru", 4, _pPOS_VERB_INDEP), ),
+    # -- なる（補助動詞）
+    "なる": (("naru", 4, _pPOS_VERB_DEP), ),
+    "成る": (("naru", 4, _pPOS_VERB_DEP), ),
+    # -- いく（補助動詞）
+    "いく": (("iku", 4, _pPOS_VERB_DEP), ),
+    "行く": (("iku", 4, _pPOS_VERB_DEP), ),
+    # -- いける（補助動詞）
+    "いける": (("ikeru", 4, _pPOS_VERB_DEP), ),
+    "行ける": (("ikeru", 4, _pPOS_VERB_DEP), ),
+    # -- て・で（接続助詞）
+    "て": (("te", 4, _pPOS_CONJ_PARTICLE), ),
+    "で": (("te", 4, _pPOS_CONJ_PARTICLE), ),
+    # -- う（助動詞）
+    "う": (("u", 4, _pPOS_AUX), ),
+    # -- だろ
+    # -- でしょ
+    "だ": (("daro", 6, _pINFL_FORM_IRREALIS), ),
+    "です": (("daro", 6, _pINFL_FORM_IRREALIS), ),
+}
+
+"""
+Rules of the atomic morphemes indexed by prefixes of base forms.
+"""
+_MORPHEME_RULES_BY_BASE_FORM_PREFIX: typing.Tuple[
+    typing.Tuple[
+        str,
+        typing.Tuple[str, typing.Optional[int], typing.Optional[typing.Pattern]]
+    ],
+    ...
+] = (
+    # -- ます（助動詞）
+    ("ます", ("masu", 4, _pPOS_AUX)),
+)
+
+_MORPHEME_NAMES: typing.Tuple[str, ...] = (
+    "hazu", "ka", "nai_adj", "nai_aux", "masu", "aru",
+    "naru", "iku", "ikeru", "te", "u", "daro",
+)
+
+def _collect_morphemes(
+    sysdic: typing.Iterable[typing.Iterable[typing.Any]]
+) -> typing.Dict[str, typing.Tuple[JanomeLexEntry]]:
+    """
+    Collect the atomic morphemes that our custom entries are made of
+        in a single pass over the system dictionary.
+
+    Parameters
+    ----------
+    sysdic : internal list of lexical entries in janome.dic.SystemDictionary
+
+    Returns
+    -------
+    morphemes : dict of str to tuple of JanomeLexEntry
+        The entries of each morpheme, in the order of the system dictionary.
+    """
+
+    # Note: Lists of found morphemes should be fixed as tuples
+    #       rather than iterators so that they can be made use of
+    #       (possibly) multiple times.
+
+    found: typing.Dict[str, typing.List[JanomeLexEntry]] = {
+        name: [] for name in _MORPHEME_NAMES
+    }
+    rules_by_base_form = _MORPHEME_RULES_BY_BASE_FORM
+    rules_by_prefix = _MORPHEME_RULES_BY_BASE_FORM_PREFIX
+
+    for e in sysdic:
+        base_form = e[7]
+        rules = rules_by_base_form.get(base_form, ())
+
+        for prefix, rule in rules_by_prefix:
+            if base_form.startswith(prefix):
+                rules = rules + (rule, )
+            # === END IF ===
+        # === END FOR ===
+
+        for name, field, pattern in rules:
+            if pattern is None or pattern.match(e[field]):
+                found[name].append(JanomeLexEntry(*e))
+            # === END IF ===
+        # === END FOR ===
+    # === END FOR e ===
+
+    return {
+        name: tuple(entries) for name, entries in found.items()
+    }
+# === END ===
+
 def _iter_nai_cond(nai_entry: JanomeLexEntry) -> typing.Iterator[JanomeLexEntry]:
     """
     Iterate the forms with conditional particles 
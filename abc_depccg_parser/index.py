@@ -0,0 +1,393 @@
+"""
+Offset indices of parsed output in the ABC Treebank format.
+
+An index maps sentence IDs to the byte offsets and lengths of their trees
+    (one line per tree, see `parser.dump_parsed_ABCT`),
+    so that a tree can be fetched without scanning the output
+    (see `reader.IndexedTreebank`).
+It is written alongside the output by `parse --index`,
+    or built afterwards from an existing file by `build_index`.
+
+Layout
+------
+All integers are little-endian.
+
+Header
+    `MAGIC` and the version (unsigned 16-bit).
+Entries
+    One per tree, in the order of the output:
+    the byte offset (unsigned 64-bit), the byte length without the newline
+    (unsigned 32-bit), the sentence ID (unsigned 32-bit)
+    and the n-best rank from 0 (unsigned 16-bit).
+ID table
+    For each sentence ID from the first to the last,
+        the number of the entries before those of the sentence
+        (unsigned 32-bit), followed by the total number of entries,
+        so that the entries of a sentence are found in constant time.
+    Sentences with no trees (e.g. with `--fallback none`) have no entries.
+Trailer
+    The first sentence ID (unsigned 32-bit), the number of sentence IDs
+    (unsigned 32-bit), the number of entries (unsigned 64-bit),
+    the offset of the ID table (unsigned 64-bit) and `MAGIC`.
+
+The ID table and the trailer are written when the index is closed,
+    which `parse --index` does even if the run fails,
+    so that the index covers the trees written so far;
+    an index without them (e.g. of a killed run)
+    can be rebuilt from the output with `build_index`.
+
+Examples
+--------
+>>> import io
+>>> f = io.BytesIO()
+>>> writer = IndexWriter(f)
+>>> writer.add_lines(
+...     b"(TOP (A a) (ID 1))\\n(TOP (B b) (ID 1))\\n(TOP (C c) (ID 2))\\n", 0
+... )
+>>> writer.close()
+>>> index = Index(f.getvalue())
+>>> index.get_entries(1)
+[Entry(offset=0, length=18, ID=1, rank=0), Entry(offset=19, length=18, ID=1, rank=1)]
+>>> index.get_entries(2)
+[Entry(offset=38, length=18, ID=2, rank=0)]
+"""
+
+import typing
+import array
+import io
+import os
+import re
+import stat
+import struct
+import sys
+
+"""
+The signature of index files.
+"""
+MAGIC: bytes = b"ABCI"
+
+"""
+The version of the format.
+"""
+VERSION: int = 1
+
+_HEADER = struct.Struct("<4sH")
+_ENTRY = struct.Struct("<QIIH")
+_TRAILER = struct.Struct("<IIQQ4s")
+_UINT = struct.Struct("<I")
+
+_IS_BIG_ENDIAN = sys.byteorder == "big"
+
+"""
+The sentence ID at the end of a tree in the ABC Treebank format.
+"""
+_pID: typing.Pattern = re.compile(rb"\(ID (\d+)\)\)\s*$")
+
+class BrokenIndexError(ValueError):
+    """
+    Raised when an index is broken or does not match the output.
+    """
+# === END CLASS ===
+
+class Entry(typing.NamedTuple):
+    """
+    The location of a tree in the output.
+    """
+    offset: int
+    length: int
+    ID: int
+    rank: int
+# === END CLASS ===
+
+def get_start_offset(stream: typing.BinaryIO) -> int:
+    """
+    Get the offset at which writing to an output begins:
+        the end of a regular file, which is appended to,
+        or 0 for pipes and terminals.
+    """
+    try:
+        st = os.fstat(stream.fileno())
+    except (OSError, io.UnsupportedOperation):
+        return 0
+    # === END TRY ===
+
+    return st.st_size if stat.S_ISREG(st.st_mode) else 0
+# === END ===
+
+class IndexWriter:
+    """
+    A writer of an index, fed with the output as it is written.
+
+    Parameters
+    ----------
+    stream : binary stream
+        The index file.
+        The header is written on construction.
+    """
+
+    def __init__(self, stream: typing.BinaryIO):
+        self.stream = stream
+        self.first_ID: typing.Optional[int] = None
+        self.n_entries = 0
+        # The numbers of the entries before each sentence
+        self._starts = array.array("I")
+        self._last_ID: typing.Optional[int] = None
+        self._last_rank = 0
+
+        stream.write(_HEADER.pack(MAGIC, VERSION))
+    # === END ===
+
+    def add(self, ID: int, offset: int, length: int) -> None:
+        """
+        Add a tree.
+        Trees must be added in the order of the output,
+            the n-best trees of a sentence being consecutive.
+
+        Raises
+        ------
+        ValueError
+            If the sentence ID goes backwards.
+        """
+        if ID == self._last_ID:
+            self._last_rank += 1
+        else:
+            if self.first_ID is None:
+                self.first_ID = ID
+            elif ID < self._last_ID:
+                raise ValueError(
+                    f"sentence {ID} comes after sentence {self._last_ID}"
+                )
+            # === END IF ===
+
+            # Sentences skipped have no entries.
+            while self.first_ID + len(self._starts) <= ID:
+                self._starts.append(self.n_entries)
+            # === END WHILE ===
+
+            self._last_ID = ID
+            self._last_rank = 0
+        # === END IF ===
+
+        self.stream.write(_ENTRY.pack(offset, length, ID, self._last_rank))
+        self.n_entries += 1
+    # === END ===
+
+    def add_lines(self, data: bytes, offset: int) -> None:
+        """
+        Add the trees in a piece of the output.
+
+        Parameters
+        ----------
+        data : bytes
+            Whole lines of the output, each of which is a tree
+                ending with its ID.
+        offset : int
+            The offset of `data` in the output.
+
+        Raises
+        ------
+        BrokenIndexError
+            If a line has no sentence ID.
+        """
+        for line in data.split(b"\n"):
+            if line:
+                match = _pID.search(line)
+                if match is None:
+                    raise BrokenIndexError(
+                        f"no sentence ID in the line at {offset}"
+                    )
+                # === END IF ===
+                self.add(int(match.group(1)), offset, len(line))
+            # === END IF ===
+            offset += len(line) + 1
+        # === END FOR line ===
+    # === END ===
+
+    def close(self) -> None:
+        """
+        Write the ID table and the trailer.
+        The stream is not closed.
+        """
+        table_offset = _HEADER.size + self.n_entries * _ENTRY.size
+
+        starts = array.array("I", self._starts)
+        starts.append(self.n_entries)
+        if _IS_BIG_ENDIAN:
+            starts.byteswap()
+        # === END IF ===
+
+        self.stream.write(starts.tobytes())
+        self.stream.write(
+            _TRAILER.pack(
+                self.first_ID or 0,
+                len(self._starts),
+                self.n_entries,
+                table_offset,
+                MAGIC,
+            )
+        )
+        self.stream.flush()
+    # === END ===
+# === END CLASS ===
+
+class Index:
+    """
+    An index read from a buffer, e.g. a memory-mapped file.
+
+    Parameters
+    ----------
+    buf : bytes-like object
+        The content of an index file.
+
+    Attributes
+    ----------
+    first_ID : int
+        The first sentence ID.
+    n_IDs : int
+        The number of sentence IDs, from `first_ID` on.
+    n_entries : int
+        The number of trees.
+
+    Raises
+    ------
+    BrokenIndexError
+        If the index is broken or incomplete.
+    """
+
+    def __init__(self, buf: typing.Union[bytes, memoryview, "mmap.mmap"]):
+        self.buf = buf
+
+        if (
+            len(buf) < _HEADER.size + _TRAILER.size
+            or _HEADER.unpack_from(buf) != (MAGIC, VERSION)
+        ):
+            raise BrokenIndexError("not an index file of this version")
+        # === END IF ===
+
+        (
+            self.first_ID, self.n_IDs, self.n_entries, self._table_offset, magic
+        ) = _TRAILER.unpack_from(buf, len(buf) - _TRAILER.size)
+
+        if (
+            magic != MAGIC
+            or self._table_offset != _HEADER.size + self.n_entries * _ENTRY.size
+            or len(buf) != (
+                self._table_offset + (self.n_IDs + 1) * _UINT.size + _TRAILER.size
+            )
+        ):
+            raise BrokenIndexError("incomplete index; rebuild it from the output")
+        # === END IF ===
+    # === END ===
+
+    def _get_start(self, i: int) -> int:
+        return _UINT.unpack_from(self.buf, self._table_offset + i * _UINT.size)[0]
+    # === END ===
+
+    def get_entry(self, i: int) -> Entry:
+        """
+        Get the `i`-th entry in the order of the output.
+        """
+        if not 0 <= i < self.n_entries:
+            raise IndexError(i)
+        # === END IF ===
+
+        return Entry._make(
+            _ENTRY.unpack_from(self.buf, _HEADER.size + i * _ENTRY.size)
+        )
+    # === END ===
+
+    def get_entries(self, ID: int) -> typing.List[Entry]:
+        """
+        Get the entries of the n-best trees of a sentence.
+
+        Raises
+        ------
+        KeyError
+            If the sentence ID is out of the index.
+        """
+        i = ID - self.first_ID
+        if not 0 <= i < self.n_IDs:
+            raise KeyError(ID)
+        # === END IF ===
+
+        return [
+            self.get_entry(j)
+            for j in range(self._get_start(i), self._get_start(i + 1))
+        ]
+    # === END ===
+# === END CLASS ===
+
+def add_output(
+    writer: IndexWriter,
+    output: typing.BinaryIO,
+    end: typing.Optional[int] = None,
+    chunk_size: int = 1 << 20,
+) -> None:
+    """
+    Add the trees of an existing output to an index.
+
+    Parameters
+    ----------
+    writer : IndexWriter
+        The index.
+    output : binary stream
+        The output in the ABC Treebank format, read from the beginning.
+    end : int, optional
+        The size of the output to be read.
+        By default, the output is read to the end.
+    chunk_size : int
+        The number of bytes read at once.
+    """
+    offset = 0
+    rest = b""
+
+    while True:
+        if end is not None:
+            chunk_size = min(chunk_size, end - offset - len(rest))
+        # === END IF ===
+
+        chunk = output.read(chunk_size) if chunk_size > 0 else b""
+        if not chunk:
+            break
+        # === END IF ===
+
+        data = rest + chunk
+        # The end of the last whole line
+        cut = data.rfind(b"\n") + 1
+        writer.add_lines(data[:cut], offset)
+        offset += cut
+        rest = data[cut:]
+    # === END WHILE ===
+
+    # The last line without a newline
+    writer.add_lines(rest, offset)
+# === END ===
+
+def build_index(
+    output: typing.BinaryIO,
+    stream: typing.BinaryIO,
+    chunk_size: int = 1 << 20,
+) -> int:
+    """
+    Build the index of an existing output.
+
+    Parameters
+    ----------
+    output : binary stream
+        The output in the ABC Treebank format, read from the beginning.
+    stream : binary stream
+        The index file.
+    chunk_size : int
+        The number of bytes read at once.
+
+    Returns
+    -------
+    n_entries : int
+        The number of trees indexed.
+    """
+    writer = IndexWriter(stream)
+    add_output(writer, output, chunk_size = chunk_size)
+    writer.close()
+
+    return writer.n_entries
+# === END ===
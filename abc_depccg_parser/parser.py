@@ -1,17 +1,65 @@
 import typing
+import itertools
+import functools
 import pathlib
 import io
+import array
 import sys
-import parsy
+import logging
 
 from . import tokenizer
+from . import category
+from . import stats
+
+logger = logging.getLogger(__name__)
 
 parser: "depccg.parser.JapaneseCCGParser" = None
+_parser_options: typing.Optional[typing.Dict[str, typing.Any]] = None
 
-def generate_parser(
-    model_path: typing.Union[str, pathlib.Path] = None
-    # pathlib.PurePosixPath("/...")
-) -> "depccg.parser.JapaneseCCGParser" :
+"""
+The binary rules used by the parser, by their names in depccg.
+"""
+BINARY_RULES: typing.Tuple[str, ...] = (
+    ">",    # 順方向関数適用
+    "<",    # 逆方向関数適用
+    ">B",   # 順方向関数合成 X/Y Y/Z -> X/Z
+    "<B1",  # Y\Z X\Y -> X\Z
+    "<B2",  # (X\Y)|Z W\X --> (W\Y)|Z
+    "<B3",  # ((X\Y)|Z)|W U\X --> ((U\Y)|Z)|W
+    "<B4",  # (((X\Y)|Z)|W)|U S\X --> (((S\Y)|Z)|W)|U
+)
+
+"""
+The names of the binary rules that can be used (see `_generate_binary_rules`).
+"""
+AVAILABLE_BINARY_RULES: typing.FrozenSet[str] = frozenset(BINARY_RULES)
+
+"""
+The options of the parser other than the binary rules.
+"""
+# パーザのオプション
+PARSER_OPTIONS: typing.Dict[str, typing.Any] = dict(
+    # unary ruleを使いすぎないようにペナルティを与えます。
+    unary_penalty = 0.1,
+    #nbest=,
+    # ルートのカテゴリがこれらに含まれる木のみ解析結果として出力します
+    possible_root_cats = [
+        "S[m]", "FRAG", "INTJP", "CP[f]", "CP[q]", 
+        "S[imp]", "CP[t]", "LST", "CP-EXL"
+    ],
+    use_seen_rules = False,
+    use_category_dict = False,
+    # 長い文は諦める
+    max_length = 250,
+    # 一定時間内に解析が終了しない場合解析を諦める
+    max_steps = 10000000,
+    # 構文解析にGPUを使うかどうか？
+    gpu = -1
+)
+
+def _generate_binary_rules(
+    names: typing.Iterable[str]
+) -> typing.List["depccg.combinator.Combinator"]:
     from depccg.combinator import (
         HeadfinalCombinator,
         JaForwardApplication,
@@ -24,58 +72,197 @@ def generate_parser(
         JaGeneralizedBackwardComposition2,
         JaGeneralizedBackwardComposition3,
     )
-    from depccg.parser import JapaneseCCGParser
+
+    rules: typing.Dict[str, typing.Callable[[], typing.Any]] = {
+        ">": lambda: JaForwardApplication(),
+        "<": lambda: JaBackwardApplication(),
+        ">B": lambda: JaGeneralizedForwardComposition0(
+            '/', '/', '/', '>B'
+        ),
+        "<B1": lambda: JaGeneralizedBackwardComposition0(
+            '\\', '\\', '\\', '<B1'
+        ),
+        "<B2": lambda: JaGeneralizedBackwardComposition1(
+            '\\', '\\', '\\', '<B2'
+        ),
+        "<B3": lambda: JaGeneralizedBackwardComposition2(
+            '\\', '\\', '\\', '<B3'
+        ),
+        "<B4": lambda: JaGeneralizedBackwardComposition3(
+            '\\', '\\', '\\', '<B4'
+        ),
+    }
 
     # 使う組み合わせ規則 headfinal_combinatorでくるんでください。
-    binary_rules = [
-        HeadfinalCombinator(r) 
-        for r in {
-            JaForwardApplication(),             # 順方向関数適用
-            JaBackwardApplication(),            # 逆方向関数適用
-            JaGeneralizedForwardComposition0(
-                # 順方向関数合成 X/Y Y/Z -> X/Z
-                '/', '/', '/', '>B'
-            ),
-            JaGeneralizedBackwardComposition0(
-                # Y\Z X\Y -> X\Z
-                '\\', '\\', '\\', '<B1'
-            ),
-            JaGeneralizedBackwardComposition1(
-                # (X\Y)|Z W\X --> (W\Y)|Z
-                '\\', '\\', '\\', '<B2'
-            ),
-            JaGeneralizedBackwardComposition2(
-                # ((X\Y)|Z)|W U\X --> ((U\Y)|Z)|W
-                '\\', '\\', '\\', '<B3'
-            ),
-            JaGeneralizedBackwardComposition3(
-                # (((X\Y)|Z)|W)|U S\X --> (((S\Y)|Z)|W)|U
-                '\\', '\\', '\\', '<B4'
-            ),
-        }
+    return [
+        HeadfinalCombinator(rules[name]()) 
+        for name in names
     ]
+# === END ===
+
+"""
+The types of the options of the parser which can be configured
+    (see `make_parser_options`).
+"""
+_PARSER_OPTION_TYPES: typing.Dict[str, type] = {
+    "unary_penalty": float,
+    "nbest": int,
+    "possible_root_cats": list,
+    "use_seen_rules": bool,
+    "use_category_dict": bool,
+    "max_length": int,
+    "max_steps": int,
+    "gpu": int,
+    "binary_rules": list,
+}
+
+def make_parser_options(
+    config: typing.Optional[typing.Mapping[str, typing.Any]] = None
+) -> typing.Dict[str, typing.Any]:
+    """
+    Make the options of the parser,
+        overriding the defaults with a configuration.
+
+    Parameters
+    ----------
+    config : mapping, optional
+        Options to override, by the keys of `PARSER_OPTIONS`,
+            "nbest" (the number of trees per sentence)
+            and "binary_rules" (a list of names in `AVAILABLE_BINARY_RULES`).
+
+    Returns
+    -------
+    options : dict
+        The options, including "binary_rules".
+
+    Raises
+    ------
+    ValueError
+        If an option is unknown or invalid.
 
-    # パーザのオプション
-    kwargs = dict(
-        # unary ruleを使いすぎないようにペナルティを与えます。
-        unary_penalty = 0.1,
-        #nbest=,
-        binary_rules = binary_rules,
-        # ルートのカテゴリがこれらに含まれる木のみ解析結果として出力します
-        possible_root_cats = [
-            "S[m]", "FRAG", "INTJP", "CP[f]", "CP[q]", 
-            "S[imp]", "CP[t]", "LST", "CP-EXL"
-        ],
-        use_seen_rules = False,
-        use_category_dict = False,
-        # 長い文は諦める
-        max_length = 250,
-        # 一定時間内に解析が終了しない場合解析を諦める
-        max_steps = 10000000,
-        # 構文解析にGPUを使うかどうか？
-        gpu = -1
+    Examples
+    --------
+    >>> make_parser_options({"binary_rules": [">", "<"]})["binary_rules"]
+    ['>', '<']
+    """
+    options: typing.Dict[str, typing.Any] = dict(
+        PARSER_OPTIONS,
+        binary_rules = list(BINARY_RULES),
     )
 
+    for key, value in (config or {}).items():
+        if key not in _PARSER_OPTION_TYPES:
+            raise ValueError(f"unknown parser option: {key!r}")
+        # === END IF ===
+
+        expected = _PARSER_OPTION_TYPES[key]
+        if expected is float and isinstance(value, int):
+            value = float(value)
+        # === END IF ===
+
+        # bool is a subclass of int.
+        if not isinstance(value, expected) or (
+            expected is not bool and isinstance(value, bool)
+        ):
+            raise ValueError(
+                f"parser option {key!r} must be of type {expected.__name__}, "
+                f"not {type(value).__name__}"
+            )
+        # === END IF ===
+
+        if key == "unary_penalty" and value < 0:
+            raise ValueError("parser option 'unary_penalty' must not be negative")
+        elif key in ("nbest", "max_length", "max_steps") and value < 1:
+            raise ValueError(f"parser option {key!r} must be positive")
+        elif key == "possible_root_cats":
+            if not value:
+                raise ValueError("parser option 'possible_root_cats' must not be empty")
+            # === END IF ===
+            for cat in value:
+                if not isinstance(cat, str):
+                    raise ValueError(
+                        f"invalid root category in parser options: {cat!r}"
+                    )
+                # === END IF ===
+                try:
+                    category.parse(cat)
+                except category.CategoryParseError as e:
+                    raise ValueError(
+                        f"invalid root category in parser options: {cat!r}"
+                    ) from e
+                # === END TRY ===
+            # === END FOR cat ===
+        elif key == "binary_rules":
+            unknown = [
+                name for name in value 
+                if name not in AVAILABLE_BINARY_RULES
+            ]
+            if unknown:
+                raise ValueError(
+                    f"unknown binary rules in parser options: {unknown!r} "
+                    f"(available: {', '.join(sorted(AVAILABLE_BINARY_RULES))})"
+                )
+            elif not value or len(set(value)) != len(value):
+                raise ValueError(
+                    "parser option 'binary_rules' must be non-empty "
+                    "and free of duplicates"
+                )
+            # === END IF ===
+        # === END IF ===
+
+        options[key] = list(value) if isinstance(value, list) else value
+    # === END FOR key ===
+
+    return options
+# === END ===
+
+def load_parser_config(
+    path: typing.Union[str, pathlib.Path]
+) -> typing.Dict[str, typing.Any]:
+    """
+    Load a configuration of the parser from a JSON file,
+        which is an object of options (see `make_parser_options`).
+
+    Raises
+    ------
+    ValueError
+        If the file is not a JSON object.
+    """
+    import json
+
+    with open(path, encoding = "utf-8") as f:
+        config = json.load(f)
+    # === END WITH f ===
+
+    if not isinstance(config, dict):
+        raise ValueError(f"{path}: a parser configuration must be a JSON object")
+    # === END IF ===
+
+    return config
+# === END ===
+
+def generate_parser(
+    model_path: typing.Union[str, pathlib.Path] = None,
+    # pathlib.PurePosixPath("/...")
+    options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+) -> "depccg.parser.JapaneseCCGParser" :
+    """
+    Generate a parser.
+
+    Parameters
+    ----------
+    model_path : str or pathlib.Path
+        The path to a user model.
+    options : dict, optional
+        The options of the parser made by `make_parser_options`.
+        Defaults to `PARSER_OPTIONS` and `BINARY_RULES`.
+    """
+    from depccg.parser import JapaneseCCGParser
+
+    options = options or make_parser_options()
+    kwargs = dict(options)
+    kwargs["binary_rules"] = _generate_binary_rules(options["binary_rules"])
+
     # 設定ファイルとallennlpのモデルからパーザを初期化
     model_path_str: str = str(model_path)
 
@@ -88,61 +275,763 @@ def generate_parser(
     return parser
 # === END ===
 
+def load_parser(
+    model_path: typing.Union[str, pathlib.Path] = None,
+    options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+) -> "depccg.parser.JapaneseCCGParser":
+    """
+    Get the global parser, 
+        generating it if not yet generated or generated with other options.
+    """
+    global parser, _parser_options
+
+    options = options or make_parser_options()
+
+    if not parser or _parser_options != options:
+        with stats.timed("load_parser"):
+            parser = generate_parser(model_path, options)
+        # === END WITH ===
+        _parser_options = options
+    # === END IF ===
+
+    return parser
+# === END ===
+
+def get_parser_identity(
+    model_path: typing.Union[str, pathlib.Path] = None,
+    options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+) -> str:
+    """
+    Get a digest that identifies the parser 
+        generated by `generate_parser` with the given model and options,
+        for keying caches of parse results.
+
+    The digest covers the version of depccg, the parser options, 
+        the binary rules, and the path, size and modification time 
+        of each file of the model.
+    """
+    import hashlib
+    import importlib.metadata
+    import json
+
+    try:
+        depccg_version = importlib.metadata.version("depccg")
+    except importlib.metadata.PackageNotFoundError:
+        depccg_version = None
+    # === END TRY ===
+
+    model_files = []
+    if model_path is not None:
+        model_dir = pathlib.Path(model_path).resolve()
+        model_files.append(str(model_dir))
+
+        for f in sorted(model_dir.rglob("*")):
+            if f.is_file():
+                stat = f.stat()
+                model_files.append(
+                    (str(f.relative_to(model_dir)), stat.st_size, stat.st_mtime_ns)
+                )
+            # === END IF ===
+        # === END FOR f ===
+    # === END IF ===
+
+    options = dict(options or make_parser_options())
+    binary_rules = options.pop("binary_rules")
+
+    identity = json.dumps(
+        {
+            "depccg": depccg_version,
+            "options": options,
+            "binary_rules": binary_rules,
+            "model": model_files,
+        },
+        sort_keys = True,
+        ensure_ascii = False,
+    )
+
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+# === END ===
+
 def parse_doc(
     doc: typing.Iterable[str],
     model_path: typing.Union[str, pathlib.Path] = None, 
     is_to_tokenize: bool = False,
     batchsize: int = 16,
+    cache: typing.Optional["cache.ParseCache"] = None,
+    workers: int = 1,
+    **kwargs
 ) -> typing.Tuple["parsed_trees", typing.Iterator[typing.Iterable[typing.Any]]]:
-    from depccg.parser import JapaneseCCGParser
-    import depccg.tokens
-    global parser
+    """
+    Parse a whole document.
+
+    If `workers` is more than 1, chunks of the document are parsed
+        by worker processes each of which loads its own parser,
+        and the trees are restored as `cache.CachedTree`
+        (see `workers.parse_doc`).
+    Such trees are not trees of depccg: they can be printed
+        in the ABC Treebank format (e.g. `dump_parsed_ABCT`)
+        or in JSON (`tree.json()` or the "json" format of 
+        `dump_batch_parsed_others`), but not in the other formats of depccg.
+    The same holds for the trees found in `cache`.
+    See `parse_tagged` for the other keyword arguments.
+    """
+    if workers > 1:
+        from . import workers as _workers
 
-    if not parser:
-        parser = generate_parser(model_path)
+        return _workers.parse_doc(
+            doc,
+            model_path = model_path,
+            is_to_tokenize = is_to_tokenize,
+            batchsize = batchsize,
+            workers = workers,
+            cache = cache,
+            **kwargs
+        )
     # === END IF ===
-    
-    doc_stripped: typing.Iterator[str] = filter(
-        None,
-        (sent.strip() for sent in doc)
+
+    return parse_sentences(
+        list(_strip_doc(doc)),
+        model_path = model_path,
+        is_to_tokenize = is_to_tokenize,
+        batchsize = batchsize,
+        cache = cache,
+        **kwargs
     )
+# === END ===
+
+def iter_parse_doc(
+    doc: typing.Iterable[str],
+    model_path: typing.Union[str, pathlib.Path] = None, 
+    is_to_tokenize: bool = False,
+    batchsize: int = 16,
+    max_in_flight: typing.Optional[int] = None,
+    cache: typing.Optional["cache.ParseCache"] = None,
+    tokenize_workers: int = 1,
+    pipelined: bool = False,
+    **kwargs
+) -> typing.Iterator[
+    typing.Tuple["parsed_trees", typing.List[typing.Iterable[typing.Any]]]
+]:
+    """
+    Parse a document chunk by chunk.
+
+    Unlike `parse_doc`, which reads up the whole document before parsing,
+        this function reads at most `max_in_flight` sentences at a time,
+        tags and parses them, and yields the results
+        before moving on to the next chunk.
+    Memory consumption is thus bounded by the chunk size 
+        rather than the size of the document.
+
+    Parameters
+    ----------
+    doc : iterable of str
+        Sentences, each of which is a line.
+    model_path : str or pathlib.Path, optional
+        The path to a user model.
+    is_to_tokenize : bool
+        Whether to tokenize sentences with janome before parsing.
+    batchsize : int
+        The batch size of the supertagger.
+    max_in_flight : int, optional
+        The maximum number of sentences read ahead and kept in memory.
+        Defaults to `batchsize`, 
+            or `SORT_WINDOW_BATCHES` batches if sorting by length.
+    cache : cache.ParseCache, optional
+        A cache of parse results.
+    tokenize_workers : int
+        The number of worker processes that tokenize sentences with janome
+            while the parser works on preceding chunks
+            (see `workers.iter_tag_chunks`).
+        Effective only if `is_to_tokenize` is true.
+    pipelined : bool
+        Whether to run reading, tokenization and parsing concurrently
+            on their own threads (see `pipeline.iter_pipeline`),
+            which also lets the consumer of this generator 
+            (e.g. printing) work while the next chunk is parsed.
+    **kwargs
+        Passed to `parse_tagged` (e.g. `sort_by_length`).
 
-    doc_tagged: typing.Iterator[typing.Iterable[typing.Any]]
-    doc_tokenized: typing.Iterator[typing.Iterable[typing.Any]]
+    Yields
+    ------
+    parsed_trees_and_doc_tagged : tuple
+        A pair of the parsed trees and the tagged tokens of a chunk,
+            in the same shape as the result of `parse_doc`.
+    """
+    chunk_size = get_chunk_size(
+        batchsize, max_in_flight, kwargs.get("sort_by_length", False)
+    )
 
-    if is_to_tokenize:
-        doc_tagged, doc_tokenized = tokenizer.tokenize(
-            (
-                tuple(word for word in sent.split(' '))
-                for sent in doc_stripped
+    chunks = iter_chunks(_strip_doc(doc), chunk_size)
+
+    def tag(
+        chunks: typing.Iterator[typing.List[str]]
+    ) -> typing.Iterator[typing.Tuple[typing.List[typing.Any], typing.List[typing.Any]]]:
+        if is_to_tokenize and tokenize_workers > 1:
+            from . import workers
+            return workers.iter_tag_chunks(chunks, tokenize_workers)
+        else:
+            return (
+                tag_sentences(chunk, is_to_tokenize) for chunk in chunks
             )
-        )
+        # === END IF ===
+    # === END ===
+
+    def parse(
+        chunks_tagged: typing.Iterator[typing.Tuple[typing.List[typing.Any], typing.List[typing.Any]]]
+    ) -> typing.Iterator[typing.Tuple["parsed_trees", typing.List[typing.Any]]]:
+        for doc_tagged, doc_tokenized in chunks_tagged:
+            yield parse_tagged(
+                doc_tokenized,
+                doc_tagged,
+                model_path = model_path,
+                is_to_tokenize = is_to_tokenize,
+                batchsize = batchsize,
+                cache = cache,
+                **kwargs
+            )
+        # === END FOR ===
+    # === END ===
+
+    if pipelined:
+        from . import pipeline
+        yield from pipeline.iter_pipeline(chunks, tag, parse)
     else:
-        doc_tokenized = list(doc_stripped)
-        doc_tagged = depccg.tokens.annotate_XX(
-            (
-                tuple(word for word in sent.split(' '))
-                for sent in doc_tokenized
-            ),
-            tokenize = is_to_tokenize
-        )
+        yield from parse(tag(chunks))
     # === END IF ===
+# === END ===
+
+def iter_parse_doc_ABCT(
+    doc: typing.Iterable[str],
+    model_path: typing.Union[str, pathlib.Path] = None, 
+    is_to_tokenize: bool = False,
+    batchsize: int = 16,
+    max_in_flight: typing.Optional[int] = None,
+    workers: int = 1,
+    start_ID: int = 1,
+    cache: typing.Optional["cache.ParseCache"] = None,
+    sentence_timeout: typing.Optional[float] = None,
+    fallback: typing.Optional[str] = None,
+    known_cats: typing.Optional[typing.Sequence[str]] = None,
+    **kwargs
+) -> typing.Iterator[str]:
+    """
+    Parse a document chunk by chunk and print the results in the ABC Treebank format.
 
-    parsed_trees = parser.parse_doc(
+    Parameters
+    ----------
+    doc : iterable of str
+        Sentences, each of which is a line.
+    model_path : str or pathlib.Path, optional
+        The path to a user model.
+    is_to_tokenize : bool
+        Whether to tokenize sentences with janome before parsing.
+    batchsize : int
+        The batch size of the supertagger.
+    max_in_flight : int, optional
+        The number of sentences in a chunk. 
+        Defaults to `batchsize`,
+            or `SORT_WINDOW_BATCHES` batches if sorting by length.
+    workers : int
+        The number of parser processes.
+        If more than 1, chunks are distributed over 
+            worker processes each of which loads its own parser.
+        See `workers.iter_parse_doc_ABCT`.
+    start_ID : int
+        The ID of the first sentence.
+    cache : cache.ParseCache, optional
+        A cache of parse results.
+    sentence_timeout : float, optional
+        The time limit of parsing a sentence in seconds.
+        If given, sentences are parsed in worker processes
+            (at least one), which are killed and replaced 
+            when they run over the limit
+            (see `workers.iter_parse_doc_ABCT_with_timeout`).
+    fallback : str, optional
+        How to print sentences that are given up on
+            (see `print_fallback_ABCT`).
+        They are left out by default.
+    known_cats : sequence of str, optional
+        depccg categories to be translated in advance
+            (see `warm_cat_translation_cache`),
+            in each worker process if any.
+    **kwargs
+        Passed to `iter_parse_doc` (e.g. `sort_by_length`).
+        In parallel parsing, 
+            each worker tokenizes its own chunks while others parse,
+            and `tokenize_workers` and `pipelined` are ignored.
+
+    Yields
+    ------
+    abct : str
+        The parsed trees of a chunk, in the input order,
+            numbered consecutively from `start_ID`.
+    """
+    if workers > 1 or sentence_timeout:
+        from . import workers as _workers
+
+        kwargs.pop("tokenize_workers", None)
+        kwargs.pop("pipelined", None)
+
+        if sentence_timeout:
+            yield from _workers.iter_parse_doc_ABCT_with_timeout(
+                doc,
+                model_path = model_path,
+                is_to_tokenize = is_to_tokenize,
+                batchsize = batchsize,
+                max_in_flight = max_in_flight,
+                workers = workers,
+                start_ID = start_ID,
+                cache = cache,
+                sentence_timeout = sentence_timeout,
+                fallback = fallback,
+                known_cats = known_cats,
+                **kwargs
+            )
+        else:
+            yield from _workers.iter_parse_doc_ABCT(
+                doc,
+                model_path = model_path,
+                is_to_tokenize = is_to_tokenize,
+                batchsize = batchsize,
+                max_in_flight = max_in_flight,
+                workers = workers,
+                start_ID = start_ID,
+                cache = cache,
+                fallback = fallback,
+                known_cats = known_cats,
+                **kwargs
+            )
+        # === END IF ===
+        return
+    # === END IF ===
+
+    if known_cats:
+        warm_cat_translation_cache(known_cats)
+    # === END IF ===
+
+    ID = start_ID
+    for parsed_trees, doc_tagged in iter_parse_doc(
+        doc,
+        model_path = model_path,
+        is_to_tokenize = is_to_tokenize,
+        batchsize = batchsize,
+        max_in_flight = max_in_flight,
+        cache = cache,
+        **kwargs
+    ):
+        yield print_batch_parsed_ABCT(
+            parsed_trees, doc_tagged, ID, fallback = fallback
+        )
+        ID += len(parsed_trees)
+    # === END FOR ===
+# === END ===
+
+def parse_sentences(
+    sentences: typing.List[str],
+    model_path: typing.Union[str, pathlib.Path] = None, 
+    is_to_tokenize: bool = False,
+    batchsize: int = 16,
+    cache: typing.Optional["cache.ParseCache"] = None,
+    **kwargs
+) -> typing.Tuple["parsed_trees", typing.List[typing.Iterable[typing.Any]]]:
+    """
+    Tag and parse a list of stripped, non-empty sentences.
+
+    See `parse_tagged` for the other keyword arguments.
+    """
+    doc_tagged, doc_tokenized = tag_sentences(sentences, is_to_tokenize)
+
+    return parse_tagged(
         doc_tokenized,
-        batchsize = batchsize
+        doc_tagged,
+        model_path = model_path,
+        is_to_tokenize = is_to_tokenize,
+        batchsize = batchsize,
+        cache = cache,
+        **kwargs
     )
+# === END ===
+
+def tag_sentences(
+    sentences: typing.List[str],
+    is_to_tokenize: bool = False,
+) -> typing.Tuple[
+    typing.List[typing.Iterable[typing.Any]],
+    typing.List[typing.Iterable[typing.Any]]
+]:
+    """
+    Tag a list of stripped, non-empty sentences.
+
+    Returns
+    -------
+    doc_tagged : list
+        The tokens of the sentences.
+    doc_tokenized : list
+        The sentences as given to the parser of depccg.
+    """
+    import depccg.tokens
+
+    with stats.timed("tag"):
+        if is_to_tokenize:
+            return tokenizer.tokenize(
+                (
+                    tuple(word for word in sent.split(' '))
+                    for sent in sentences
+                )
+            )
+        else:
+            return (
+                depccg.tokens.annotate_XX(
+                    (
+                        tuple(word for word in sent.split(' '))
+                        for sent in sentences
+                    ),
+                    tokenize = is_to_tokenize
+                ),
+                sentences,
+            )
+        # === END IF ===
+    # === END WITH ===
+# === END ===
+
+def parse_tagged(
+    doc_tokenized: typing.List[typing.Iterable[typing.Any]],
+    doc_tagged: typing.List[typing.Iterable[typing.Any]],
+    model_path: typing.Union[str, pathlib.Path] = None, 
+    is_to_tokenize: bool = False,
+    batchsize: int = 16,
+    cache: typing.Optional["cache.ParseCache"] = None,
+    sort_by_length: bool = False,
+    max_tokens_per_batch: typing.Optional[int] = None,
+    parser_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+) -> typing.Tuple["parsed_trees", typing.List[typing.Iterable[typing.Any]]]:
+    """
+    Parse tagged sentences (see `tag_sentences`)
+        with the parser of the given options (see `load_parser`).
+
+    Identical sentences are parsed only once
+        and share the same trees in the result.
+    If `sort_by_length` is true, sentences are handed to the supertagger
+        in the order of their lengths, so that each batch consists of 
+        sentences of similar lengths and wastes less on padding;
+        the results are put back in the original order.
+    If `max_tokens_per_batch` is given, batches are filled 
+        up to the budget of padded words (see `iter_token_batches`)
+        instead of `batchsize` sentences,
+        so that the memory of a batch does not depend on sentence lengths.
+    If a cache is given, sentences found in it are neither supertagged
+        nor parsed, and their trees are restored as `cache.CachedTree`.
+    The parser is loaded only when some sentence is to be parsed.
+    """
+    if stats.collector:
+        stats.add("sentences", len(doc_tokenized))
+        stats.add("words", sum(map(count_words, doc_tokenized)))
+    # === END IF ===
+
+    def parse(doc: typing.List[typing.Any]) -> typing.List[typing.Any]:
+        parser = load_parser(model_path, parser_options)
+
+        def parse_batch(batch: typing.List[typing.Any], batchsize: int):
+            if not stats.collector:
+                return parser.parse_doc(batch, batchsize = batchsize)
+            # === END IF ===
+
+            with stats.timed("parse") as timer:
+                res = parser.parse_doc(batch, batchsize = batchsize)
+            # === END WITH ===
+
+            # Sentences are parsed in batches;
+            #   each is deemed to take an equal share of the time
+            #   (see `stats.Stats.observe_latency`).
+            if batch:
+                stats.collector.observe_latency(
+                    timer.seconds / len(batch),
+                    len(batch)
+                )
+            # === END IF ===
+            return res
+        # === END ===
+
+        def parse_batches(doc_unique: typing.List[typing.Any]):
+            if not max_tokens_per_batch:
+                return parse_batch(doc_unique, batchsize)
+            # === END IF ===
+
+            res = []
+            for batch in iter_token_batches(doc_unique, max_tokens_per_batch):
+                res.extend(parse_batch(batch, len(batch)))
+            # === END FOR ===
+            return res
+        # === END ===
+
+        if sort_by_length:
+            return _parse_unique(
+                lambda doc_unique: _parse_sorted_by_length(
+                    parse_batches, doc_unique
+                ),
+                doc
+            )
+        else:
+            return _parse_unique(parse_batches, doc)
+        # === END IF ===
+    # === END ===
+
+    if cache is None:
+        parsed_trees = parse(doc_tokenized)
+    else:
+        parsed_trees = cache.parse_doc(
+            doc_tokenized, doc_tagged, is_to_tokenize, parse
+        )
+    # === END IF ===
     
     return (parsed_trees, doc_tagged)
 # === END ===
 
+def _parse_unique(
+    parse: typing.Callable[[typing.List[typing.Any]], typing.List[typing.Any]],
+    doc: typing.List[typing.Any],
+) -> typing.List[typing.Any]:
+    """
+    Parse only the distinct sentences of a document 
+        and fan the results out to the original positions.
+
+    Parameters
+    ----------
+    parse : callable
+        The parser, which takes a list of tokenized sentences
+            and returns the list of their n-best trees.
+    doc : list
+        Tokenized sentences, each of which is a string or a sequence of words.
+    """
+    index_of: typing.Dict[typing.Any, int] = {}
+    doc_unique: typing.List[typing.Any] = []
+    indices: typing.List[int] = []
+
+    for sent in doc:
+        key = sent if isinstance(sent, str) else tuple(sent)
+        index = index_of.get(key)
+
+        if index is None:
+            index = index_of[key] = len(doc_unique)
+            doc_unique.append(sent)
+        # === END IF ===
+
+        indices.append(index)
+    # === END FOR sent ===
+
+    if len(doc_unique) == len(doc):
+        return parse(doc)
+    # === END IF ===
+
+    parsed_unique = parse(doc_unique)
+
+    return [parsed_unique[index] for index in indices]
+# === END ===
+
+def _parse_sorted_by_length(
+    parse: typing.Callable[[typing.List[typing.Any]], typing.List[typing.Any]],
+    doc: typing.List[typing.Any],
+) -> typing.List[typing.Any]:
+    """
+    Parse sentences in the order of their lengths 
+        and put the results back in the original order.
+    """
+    order = sorted(range(len(doc)), key = lambda i: count_words(doc[i]))
+    parsed_sorted = parse([doc[i] for i in order])
+
+    res: typing.List[typing.Any] = [None] * len(doc)
+    for i, parsed in zip(order, parsed_sorted):
+        res[i] = parsed
+    # === END FOR ===
+
+    return res
+# === END ===
+
+def count_words(sent: typing.Union[str, typing.Sequence[str]]) -> int:
+    """
+    Count the words of a tokenized sentence, 
+        which is either a string of words separated by spaces
+        or a sequence of words.
+    """
+    if isinstance(sent, str):
+        return sent.count(" ") + 1
+    else:
+        return len(sent)
+    # === END IF ===
+# === END ===
+
+def iter_token_batches(
+    doc: typing.Sequence[typing.Any],
+    max_tokens: int,
+) -> typing.Iterator[typing.List[typing.Any]]:
+    """
+    Split tokenized sentences into consecutive batches
+        whose padded sizes (the number of sentences 
+        times the number of words of the longest one)
+        are within a budget.
+
+    A sentence longer than the budget makes a batch of its own.
+    Sorting sentences by length beforehand packs the batches tighter.
+
+    Parameters
+    ----------
+    doc : sequence
+        Tokenized sentences (see `count_words`).
+    max_tokens : int
+        The budget of padded words of a batch.
+
+    Yields
+    ------
+    batch : list
+        A batch of sentences.
+    """
+    batch: typing.List[typing.Any] = []
+    batch_max_len = 0
+
+    for sent in doc:
+        n_words = count_words(sent)
+        new_max_len = max(batch_max_len, n_words)
+
+        if batch and (len(batch) + 1) * new_max_len > max_tokens:
+            yield batch
+            batch = []
+            new_max_len = n_words
+        # === END IF ===
+
+        batch.append(sent)
+        batch_max_len = new_max_len
+    # === END FOR sent ===
+
+    if batch:
+        yield batch
+    # === END IF ===
+# === END ===
+
+"""
+The default number of batches read at a time when sorting sentences by length.
+Sentences are sorted within such a window.
+"""
+SORT_WINDOW_BATCHES: int = 8
+
+def get_chunk_size(
+    batchsize: int,
+    max_in_flight: typing.Optional[int] = None,
+    sort_by_length: bool = False,
+) -> int:
+    """
+    Get the number of sentences parsed at a time.
+    """
+    if max_in_flight:
+        return max_in_flight
+    elif sort_by_length:
+        return batchsize * SORT_WINDOW_BATCHES
+    else:
+        return batchsize
+    # === END IF ===
+# === END ===
+
+def _strip_doc(doc: typing.Iterable[str]) -> typing.Iterator[str]:
+    return filter(
+        None,
+        (sent.strip() for sent in doc)
+    )
+# === END ===
+
+def iter_chunks(
+    items: typing.Iterable[typing.Any],
+    size: int
+) -> typing.Iterator[typing.List[typing.Any]]:
+    """
+    Split an iterable into lists of at most `size` items without reading ahead.
+    """
+    items = iter(items)
+
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        # === END IF ===
+
+        yield chunk
+    # === END WHILE ===
+# === END ===
+
+"""
+The output formats of depccg other than ABCT
+    which are printed sentence by sentence,
+    and thus can be printed chunk by chunk (see `dump_batch_parsed_others`).
+The others (e.g. "xml") enclose the whole document.
+"""
+STREAMABLE_FORMATS: typing.FrozenSet[str] = frozenset(
+    ("auto", "deriv", "ptb", "conll", "json")
+)
+
 def dump_batch_parsed_others(
     parsed_trees,
     tokens_of_trees,
     output_format: str,
     lang: str,
     stream: typing.TextIO = sys.stdout,
+    start_ID: int = 1,
 ):
+    """
+    Print parsed sentences in an output format of depccg other than ABCT.
+
+    Parameters
+    ----------
+    parsed_trees : list
+        The n-best trees of the sentences.
+    tokens_of_trees : list
+        The tokens of the sentences.
+    output_format : str
+        The output format.
+    lang : str
+        The language, e.g. "ja".
+    stream : text stream
+        The output stream.
+    start_ID : int
+        The ID of the first sentence.
+        Sentences are numbered from it as the printer of depccg
+            numbers a whole document,
+            so that a document can be printed chunk by chunk
+            in `STREAMABLE_FORMATS`.
+
+    Raises
+    ------
+    ValueError
+        If `start_ID` is not 1 in a format enclosing the whole document.
+    TypeError
+        If some trees are `cache.CachedTree` (e.g. from `parse_doc`
+            with multiple workers or a cache)
+            and the format is other than "json".
+    """
+    if output_format != "json":
+        from .cache import CachedTree
+
+        if any(
+            isinstance(tree, CachedTree)
+            for parsed in parsed_trees
+            for tree, _ in parsed
+        ):
+            raise TypeError(
+                "trees restored from a cache or from worker processes "
+                "can only be printed in the json or ABCT format, "
+                f"not in the {output_format} format"
+            )
+        # === END IF ===
+    # === END IF ===
+
+    if output_format in STREAMABLE_FORMATS:
+        _dump_batch_parsed_streamable(
+            parsed_trees, tokens_of_trees, output_format, stream, start_ID
+        )
+        return
+    elif start_ID != 1:
+        raise ValueError(
+            f"the {output_format} format cannot be printed chunk by chunk"
+        )
+    # === END IF ===
+
     import depccg.printer
     
     depccg.printer.print_(
@@ -155,32 +1044,195 @@ def dump_batch_parsed_others(
     )
 # === END ===
 
+def _dump_batch_parsed_streamable(
+    parsed_trees,
+    tokens_of_trees,
+    output_format: str,
+    stream: typing.TextIO,
+    start_ID: int,
+) -> None:
+    """
+    Print parsed sentences as `depccg.printer.print_` does 
+        in `STREAMABLE_FORMATS`, numbering them from `start_ID`.
+    """
+    import json
+
+    for ID, (parsed, tokens) in enumerate(
+        zip(parsed_trees, tokens_of_trees), start_ID
+    ):
+        for tree, prob in parsed:
+            if output_format == "json":
+                # Copied as `cache.CachedTree` returns its own dict.
+                res = dict(tree.json(tokens = tokens))
+                res["id"] = ID
+                res["prob"] = prob
+                print(json.dumps(res), file = stream)
+            elif output_format == "conll":
+                # depccg numbers sentences from 0 in this format.
+                print(
+                    f"# ID={ID - 1}\n# log probability={prob:.4e}\n"
+                    f"{tree.conll(tokens = tokens)}",
+                    file = stream
+                )
+            elif output_format == "auto":
+                print(
+                    f"ID={ID}, log probability={prob}\n"
+                    f"{tree.auto(tokens = tokens)}",
+                    file = stream
+                )
+            else:
+                print(
+                    f"ID={ID}, log probability={prob}\n"
+                    f"{getattr(tree, output_format)()}",
+                    file = stream
+                )
+            # === END IF ===
+        # === END FOR tree ===
+    # === END FOR ID ===
+# === END ===
+
 def dump_parsed_ABCT(
     parsed,
     tokens,
     ID: str = "NONE",
-    stream: typing.TextIO = sys.stdout,
+    stream: typing.Union[typing.TextIO, typing.BinaryIO] = sys.stdout,
+    via_json: bool = False,
+    fallback: typing.Optional[str] = None,
 ) -> typing.NoReturn:
-    for tree, prob in parsed:
-        tree_enh = {
-            "type": "ROOT",
-            "cat": "TOP",
-            "children": [
-                {
-                    "cat": "COMMENT",
-                    "surf": f"{{probability={prob}}}"
-                },
-                tree.json(tokens = tokens),
-                {
-                    "cat": "ID",
-                    "surf": str(ID)
-                }
-            ]
-        }
+    """
+    Write the parsed trees of a sentence in the ABC Treebank format,
+        one tree per line.
+    Text is written to `stream` once per sentence;
+        binary streams receive UTF-8 encoded bytes.
+
+    The trees of depccg are walked directly (see `print_depccg_tree_ABCT`).
+    If `via_json` is true, they are instead converted 
+        into the JSON format first (see `enhance_tree_json`),
+        which is slower but goes through `Tree.json` of depccg.
+
+    If the parser has given up on the sentence
+        (e.g. for running out of `max_steps`),
+        it is logged and printed as `fallback` (see `print_fallback_ABCT`).
+    """
+    if not parsed:
+        logger.warning("sentence %s: no parse found", ID)
+        _write(
+            stream,
+            print_fallback_ABCT(
+                [_get_token_word(token) for token in tokens],
+                ID, "failed", fallback
+            )
+        )
+        return
+    # === END IF ===
 
-        dump_tree_ABCT(tree_enh, stream)
-        stream.write("\n")
+    lines: typing.List[str] = []
+
+    for tree, prob in parsed:
+        if via_json:
+            lines.append(
+                print_tree_ABCT(enhance_tree_json(tree, tokens, prob, ID))
+            )
+        else:
+            lines.append(
+                f"(TOP (COMMENT {{probability={prob}}}) "
+                f"{print_depccg_tree_ABCT(tree, tokens)} "
+                f"(ID {ID}))"
+            )
+        # === END IF ===
+        lines.append("\n")
     # === END FOR parsed ===
+
+    _write(stream, "".join(lines))
+# === END ===
+
+def enhance_tree_json(
+    tree: "depccg.tree.Tree",
+    tokens,
+    prob: float,
+    ID: str = "NONE",
+) -> dict:
+    """
+    Convert a parsed tree into the JSON format 
+        with the probability and the ID attached, 
+        which `dump_tree_ABCT` prints in the ABC Treebank format.
+    """
+    return {
+        "type": "ROOT",
+        "cat": "TOP",
+        "children": [
+            {
+                "cat": "COMMENT",
+                "surf": f"{{probability={prob}}}"
+            },
+            tree.json(tokens = tokens),
+            {
+                "cat": "ID",
+                "surf": str(ID)
+            }
+        ]
+    }
+# === END ===
+
+def print_depccg_tree_ABCT(
+    tree: "depccg.tree.Tree",
+    tokens = None,
+) -> str:
+    """
+    Print a tree of depccg in the ABC Treebank format 
+        without converting it into the JSON format.
+
+    The output is the same as `print_tree_ABCT(tree.json(tokens = tokens))`.
+
+    Parameters
+    ----------
+    tree : depccg.tree.Tree
+        A parsed tree.
+    tokens : list of depccg.tokens.Token, optional
+        The tokens of the sentence, in the order of the leaves.
+        The surface form of a leaf is taken from "surf" or "word" of its token,
+            or the word of the leaf itself if no tokens are given.
+    """
+    parts: typing.List[str] = []
+    append = parts.append
+    translate = parse_cat_translate_TLG
+    leaf_index = 0
+
+    # Iterators over the children of the open nodes
+    stack: typing.List[typing.Iterator] = [iter((tree, ))]
+    # Every node but the root is preceded by a space.
+    sep = ""
+
+    while stack:
+        for node in stack[-1]:
+            cat = translate(str(node.cat))
+
+            if not node.is_leaf:
+                append(f"{sep}({cat}")
+                sep = " "
+                stack.append(iter(node.children))
+                break
+            # === END IF ===
+
+            if tokens is None:
+                word = node.word
+            else:
+                word = _get_token_word(tokens[leaf_index])
+            # === END IF ===
+            leaf_index += 1
+
+            append(f"{sep}({cat} {word})")
+            sep = " "
+        else:
+            # All the children are done.
+            stack.pop()
+            if stack:
+                append(")")
+            # === END IF ===
+        # === END FOR node ===
+    # === END WHILE ===
+
+    return "".join(parts)
 # === END ===
 
 def print_parsed_ABCT(
@@ -194,187 +1246,258 @@ def print_parsed_ABCT(
     # === END WITH sf ===
 # === END ====
 
-def dump_tree_ABCT(tree: dict, stream: typing.TextIO) -> typing.NoReturn:
-    cat = parse_cat_translate_TLG(tree["cat"])
-
-    if "children" in tree.keys():
-        stream.write(f"({cat}")
+def print_batch_parsed_ABCT(
+    parsed_trees,
+    tokens_of_trees,
+    start_ID: int = 1,
+    fallback: typing.Optional[str] = None,
+) -> str:
+    """
+    Print parsed trees of consecutive sentences in the ABC Treebank format.
+    """
+    with stats.timed("print"), io.StringIO() as sf:
+        for ID, (parsed, tokens) in enumerate(
+            zip(parsed_trees, tokens_of_trees),
+            start_ID
+        ):
+            dump_parsed_ABCT(
+                parsed, tokens, ID, stream = sf, fallback = fallback
+            )
+        # === END FOR ===
 
-        for child in tree["children"]:
-            stream.write(" ")
-            dump_tree_ABCT(child, stream)
-        # === END FOR child ===
+        return sf.getvalue()
+    # === END WITH sf ===
+# === END ===
 
-        stream.write(")")
+def _get_token_word(token) -> str:
+    if "surf" in token:
+        return token["surf"]
+    elif "word" in token:
+        return token["word"]
     else:
-        if "surf" in tree:
-            stream.write(
-                f"({cat} {tree['surf']})"
-            )
-        elif "word" in tree:
-            stream.write(
-                f"({cat} {tree['word']})"
-            )
-        else:
-            stream.write(
-                f"({cat} ERROR)"
-            )
+        return "ERROR"
     # === END IF ===
 # === END ===
 
-# ======
-# 1. Category Parser and Translators
-# ======
 """
-A tranalation table that translates atomic categories in the depccg format
-    to those in the ABC Treebank format.
-In fact, what this does is just get rid of brackets.
+The ways of printing sentences that are given up on:
 
-Examples
---------
-"S[m]" -> "Sm"
+FRAG
+    A flat FRAG tree whose leaves are the words with the category ERROR.
+ERROR
+    A single ERROR node of the whole sentence.
+none
+    Nothing.
 """
-pCAT_BASE_trans_table: typing.Dict[int, str] = (
-    str.maketrans(
-        {
-            "[": "",
-            "]": ""    
-        }
-    )
-)
+FALLBACKS: typing.Tuple[str, ...] = ("FRAG", "ERROR", "none")
 
-@parsy.generate
-def pCAT_BASE():
+def print_fallback_ABCT(
+    words: typing.Sequence[str],
+    ID: typing.Union[int, str] = "NONE",
+    reason: str = "failed",
+    fallback: typing.Optional[str] = "FRAG",
+) -> str:
     """
-    A parsy parser and translator of atomic depccg categories 
-        into abstract representations of CG categories.
+    Print a sentence that is given up on in the ABC Treebank format.
+
+    Parameters
+    ----------
+    words : sequence of str
+        The words of the sentence.
+    ID : int or str
+        The ID of the sentence.
+    reason : str
+        Why the sentence is given up on (e.g. "failed" or "timeout"),
+            which is put in the comment instead of the probability.
+    fallback : str, optional
+        One of `FALLBACKS`. 
+        `None` is the same as "none".
+
+    Returns
+    -------
+    res : str
+        A line of the fallback tree, or an empty string.
 
     Examples
     --------
-    "S[m]" -> {"type": "BASE", "lit": "Sm"}
+    >>> print_fallback_ABCT(["猫", "が"], 3, "timeout")
+    '(TOP (COMMENT {error=timeout}) (FRAG (ERROR 猫) (ERROR が)) (ID 3))\\n'
+    >>> print_fallback_ABCT(["猫", "が"], 3, "timeout", "ERROR")
+    '(TOP (COMMENT {error=timeout}) (ERROR 猫が) (ID 3))\\n'
     """
+    if fallback == "FRAG":
+        tree = "(FRAG {})".format(" ".join(f"(ERROR {word})" for word in words))
+    elif fallback == "ERROR":
+        tree = f"(ERROR {''.join(words)})"
+    elif fallback is None or fallback == "none":
+        return ""
+    else:
+        raise ValueError(f"unknown fallback: {fallback!r}")
+    # === END IF ===
 
-    cat = yield parsy.regex(r"[^()\\/]+")
-
-    return {
-        "type": "BASE",
-        "lit": cat.translate(pCAT_BASE_trans_table)
-    }
+    return f"(TOP (COMMENT {{error={reason}}}) {tree} (ID {ID}))\n"
 # === END ===
 
-@parsy.generate
-def pCAT_COMP_LEFT():
+def dump_tree_ABCT(
+    tree: dict,
+    stream: typing.Union[typing.TextIO, typing.BinaryIO],
+    cats: typing.Optional[typing.Iterable[str]] = None,
+    table: typing.Optional[category.CategoryTable] = None,
+) -> typing.NoReturn:
     """
-    A parsy parser and translator of left-functor depccg categories 
-        into abstract representations of CG categories.
+    Write a tree in the ABC Treebank format with a single write.
 
-    Examples
-    --------
-    "S[m]\\PP[s]\\PP[o]" -> 
-    {
-        "type": "L", 
-        "antecedent": {
-                "type": "Base",
-                "lit": "PPo",
-            }, 
-        "consequence": {
-            "type": "L":
-            "antecedent": {
-                "type": "Base",
-                "lit": "PPs",
-            }, 
-            "consequence": {
-                "type": "Base",
-                "lit": "Sm",
-            }, 
-        }
+    Parameters
+    ----------
+    tree : dict
+        A tree in the JSON format of depccg.
+    stream : text or binary stream
+        The output stream.
+        Binary streams receive UTF-8 encoded bytes.
+    cats : iterable of str, optional
+        The translated categories of the nodes (see `print_tree_ABCT`).
+    table : category.CategoryTable, optional
+        The table to translate the categories with (see `print_tree_ABCT`).
     """
-
-    cat1 = yield pCAT_COMP_RIGHT 
-    cat_others = yield (
-        parsy.match_item("\\") 
-        >> (
-             pCAT_COMP_RIGHT
-        )
-    ).many()
-
-    res = cat1
-    for cat_next in cat_others:
-        res = {
-            "type": "L",
-            "antecedent": cat_next,
-            "consequence": res,
-        }
-    return res
+    _write(stream, print_tree_ABCT(tree, cats, table))
 # === END ===
 
-@parsy.generate
-def pCAT_COMP_RIGHT():
+def print_tree_ABCT(
+    tree: dict,
+    cats: typing.Optional[typing.Iterable[str]] = None,
+    table: typing.Optional[category.CategoryTable] = None,
+) -> str:
     """
-    A parsy parser and translator of right-functor depccg categories 
-        into abstract representations of CG categories.
+    Print a tree in the ABC Treebank format.
 
-    Examples
-    --------
-    "S[m]/PP[s]/PP[o]" -> 
-    {
-        "type": "R", 
-        "antecedent": {
-                "type": "Base",
-                "lit": "PPo",
-            }, 
-        "consequence": {
-            "type": "R":
-            "antecedent": {
-                "type": "Base",
-                "lit": "PPs",
-            }, 
-            "consequence": {
-                "type": "Base",
-                "lit": "Sm",
-            }, 
-        }
+    The tree is walked with an explicit stack rather than recursion,
+        so that deep trees never hit the recursion limit.
+
+    Parameters
+    ----------
+    tree : dict
+        A tree in the JSON format of depccg.
+    cats : iterable of str, optional
+        The categories of the nodes already translated, in pre-order
+            (e.g. looked up by the IDs from `intern_tree_cats`).
+        Only as many as the nodes of the tree are taken,
+            so an iterator can be shared by consecutive trees.
+    table : category.CategoryTable, optional
+        The table to translate the categories with (`table.translate`),
+            which can be shared by trees and batches.
+        It is faster than the LRU cache of `parse_cat_translate_TLG`,
+            which is used by default.
+
+    Returns
+    -------
+    res : str
+        The tree in the ABC Treebank format.
     """
+    parts: typing.List[str] = []
+    append = parts.append
 
-    cat1 = yield pCAT_BASE | pCAT_PAR
-    cat_others = yield (
-        parsy.match_item("/") 
-        >> (pCAT_BASE | pCAT_PAR)
-    ).many()
+    if cats is not None:
+        next_cat = iter(cats).__next__
+        translate = None
+    elif table is not None:
+        translate = table.translate
+    else:
+        translate = parse_cat_translate_TLG
+    # === END IF ===
 
-    res = cat1
-    for cat_next in cat_others:
-        res = {
-            "type": "R",
-            "antecedent": cat_next,
-            "consequence": res,
-        }
-    return res
-# === END ===
+    # Iterators over the children of the open nodes
+    stack: typing.List[typing.Iterator[dict]] = [iter((tree, ))]
+    # Every node but the root is preceded by a space.
+    sep = ""
 
-@parsy.generate
-def pCAT_PAR():
-    """
-    A parsy parser and translator of parenthesized depccg categories 
-        into abstract representations of CG categories.
-    """
+    while stack:
+        for node in stack[-1]:
+            cat = next_cat() if translate is None else translate(node["cat"])
+
+            if "children" in node:
+                append(f"{sep}({cat}")
+                sep = " "
+                stack.append(iter(node["children"]))
+                break
+            elif "surf" in node:
+                append(f"{sep}({cat} {node['surf']})")
+            elif "word" in node:
+                append(f"{sep}({cat} {node['word']})")
+            else:
+                append(f"{sep}({cat} ERROR)")
+            # === END IF ===
+            sep = " "
+        else:
+            # All the children are done.
+            stack.pop()
+            if stack:
+                append(")")
+            # === END IF ===
+        # === END FOR node ===
+    # === END WHILE ===
 
-    yield parsy.match_item("(")
-    cat = yield pCAT
-    yield parsy.match_item(")")
+    return "".join(parts)
+# === END ===
 
-    return cat
+def _write(
+    stream: typing.Union[typing.TextIO, typing.BinaryIO],
+    text: str
+) -> None:
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)):
+        stream.write(text.encode("utf-8"))
+    else:
+        stream.write(text)
+    # === END IF ===
 # === END ===
 
+# ======
+# 1. Category Parser and Translators
+# ======
 """
-The root paraser and translator of any depccg categories 
-    into abstract representations of CG categories.
+A tranalation table that translates atomic categories in the depccg format
+    to those in the ABC Treebank format.
+In fact, what this does is just get rid of brackets.
+
+Examples
+--------
+"S[m]" -> "Sm"
 """
-pCAT = pCAT_COMP_LEFT
+pCAT_BASE_trans_table: typing.Dict[int, str] = (
+    str.maketrans(
+        {
+            "[": "",
+            "]": ""    
+        }
+    )
+)
+
+"""
+The names of the parsy reference implementation, 
+    which are loaded from `category_parsy` on first access
+    so that parsy is not imported unless needed.
+"""
+_PARSY_NAMES: typing.FrozenSet[str] = frozenset(
+    (
+        "pCAT_BASE", "pCAT_COMP_LEFT", "pCAT_COMP_RIGHT", "pCAT_PAR", "pCAT",
+    )
+)
+
+def __getattr__(name: str) -> typing.Any:
+    if name in _PARSY_NAMES:
+        from . import category_parsy
+        return getattr(category_parsy, name)
+    # === END IF ===
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+# === END ===
 
 def parse_cat(text: str) -> dict:
     """
-    Parse powered by parsy an depccg category and translate it into an abstract representation for CG categories.
+    Parse an depccg category and translate it into an abstract representation for CG categories.
+
+    The parsing is done by the hand-written parser in `category`.
+    See `parse_cat_parsy` for the reference implementation powered by parsy.
+    See `parse_cat_view` for a read-only view which builds no dicts.
 
     Parameters
     ----------
@@ -400,16 +1523,56 @@ def parse_cat(text: str) -> dict:
             'consequence': {'type': 'BASE', 'lit': 'Sm'}}}
     """
 
-    return pCAT.parse(text)
+    return category.parse(text).to_dict()
 # === END ===
 
-def translate_cat_TLG(cat: dict) -> str:
+def parse_cat_view(text: str) -> category.CatView:
+    """
+    Parse an depccg category into a read-only view of the interned category,
+        which behaves as the dict of `parse_cat` and compares equal to it
+        (see `category.CatView`).
+    Its `cat` is the category itself.
+
+    Parameters
+    ----------
+    text : str
+        A string representation of an depccg category.
+    
+    Returns
+    -------
+    res : category.CatView
+        An abstract representation of the given input.
+
+    Examples
+    --------
+    >>> parse_cat_view("S[m]/NP") == parse_cat("S[m]/NP")
+    True
+    """
+    return category.CatView(category.parse(text))
+# === END ===
+
+def parse_cat_parsy(text: str) -> dict:
+    """
+    Parse powered by parsy an depccg category and translate it into an abstract representation for CG categories.
+
+    This is the reference implementation of `parse_cat`.
+    Unlike `parse_cat`, it raises parsy.ParseError on invalid inputs.
     """
+
+    from . import category_parsy
+
+    return category_parsy.pCAT.parse(text)
+# === END ===
+
+def translate_cat_TLG(
+    cat: typing.Union[dict, category.Cat, category.CatView]
+) -> str:
+    r"""
     Print an abstract representation of a CG category in the ABC Treebank format.
 
     Parameters
     ----------
-    cat : dict
+    cat : dict or category.Cat or category.CatView
         An abstract representation of a CG category.
     
     Returns
@@ -424,9 +1587,15 @@ def translate_cat_TLG(cat: dict) -> str:
     '<<Sm/Sm>/<PPo\\<PPs\\Sp>>>'
     """
 
+    if isinstance(cat, category.CatView):
+        return category.translate_TLG(cat.cat)
+    elif isinstance(cat, category.Cat):
+        return category.translate_TLG(cat)
+    # === END IF ===
+
     input_type = cat["type"]
     if input_type == "L":
-        return f"<{translate_cat_TLG(cat['antecedent'])}\{translate_cat_TLG(cat['consequence'])}>"
+        return f"<{translate_cat_TLG(cat['antecedent'])}\\{translate_cat_TLG(cat['consequence'])}>"
     elif input_type == "R":
         return f"<{translate_cat_TLG(cat['consequence'])}/{translate_cat_TLG(cat['antecedent'])}>"
     else:
@@ -434,8 +1603,15 @@ def translate_cat_TLG(cat: dict) -> str:
     # === END IF ===
 # === END ===
 
-def parse_cat_translate_TLG(text: str):
-    """
+"""
+The maximum number of distinct categories 
+    whose translations are memoized by `parse_cat_translate_TLG`.
+"""
+CAT_TRANSLATION_CACHE_SIZE: int = 16384
+
+@functools.lru_cache(maxsize = CAT_TRANSLATION_CACHE_SIZE)
+def parse_cat_translate_TLG(text: str) -> str:
+    r"""
     Print an abstract representation of a CG category in the ABC Treebank format.
 
     Parameters
@@ -450,15 +1626,173 @@ def parse_cat_translate_TLG(text: str):
 
     Examples
     --------
-    >>> parse_cat_translate_TLG("(S[m]/S[m])/(S[p]\\PP[s]\\PP[o])"))
+    >>> parse_cat_translate_TLG("(S[m]/S[m])/(S[p]\\PP[s]\\PP[o])")
     '<<Sm/Sm>/<PPo\\<PPs\\Sp>>>'
 
     Notes
     --------
     parse_cat_translate_TLG(str) == translate_cat_TLG(parse_cat(str))
 
+    The results are memoized in a thread-safe LRU cache 
+        of `CAT_TRANSLATION_CACHE_SIZE` entries,
+        since a corpus contains only a few thousand distinct categories.
+    Hit and miss counts are available via 
+        `parse_cat_translate_TLG.cache_info()`.
+    The cache can be filled in advance with `warm_cat_translation_cache`.
+    """
+    return category.translate_TLG(category.parse(text))
+# === END ===
+
+def warm_cat_translation_cache(
+    cats: typing.Iterable[str]
+) -> typing.Tuple[int, int]:
+    """
+    Fill the translation cache of `parse_cat_translate_TLG` in advance.
+
+    Parameters
+    ----------
+    cats : iterable of str
+        depccg categories, one per item 
+            (e.g. lines of a file opened in the text mode).
+        Blank items and items beginning with "#" are ignored.
+
+    Returns
+    -------
+    n_warmed : int
+        The number of categories translated.
+    n_failed : int
+        The number of items that are not valid categories.
+    """
+    n_warmed = 0
+    n_failed = 0
+
+    for cat in cats:
+        cat = cat.strip()
+        if not cat or cat.startswith("#"):
+            continue
+        # === END IF ===
+
+        try:
+            parse_cat_translate_TLG(cat)
+            n_warmed += 1
+        except category.CategoryParseError:
+            n_failed += 1
+        # === END TRY ===
+    # === END FOR cat ===
+
+    return n_warmed, n_failed
+# === END ===
+
+def translate_cats(
+    cats: typing.Iterable[str],
+    table: typing.Optional[category.CategoryTable] = None,
+) -> typing.Tuple["array.array", typing.List[str]]:
     """
-    return translate_cat_TLG(parse_cat(text))
+    Translate depccg categories in bulk into the ABC Treebank format.
+
+    Each distinct category is translated only once.
+
+    Parameters
+    ----------
+    cats : iterable of str
+        depccg categories.
+    table : category.CategoryTable, optional
+        The table to intern the categories in,
+            which can be shared by batches so that IDs are consistent.
+        A new table is made by default.
+
+    Returns
+    -------
+    ids : array.array of int
+        The IDs of the categories, in the order of `cats`.
+    lookup : list of str
+        The translations indexed by the IDs (`table.lookup`).
+
+    Raises
+    ------
+    category.CategoryParseError
+        If a category is invalid.
+
+    Examples
+    --------
+    >>> ids, lookup = translate_cats(["S[m]/S[m]", "NP", "S[m]/S[m]"])
+    >>> [lookup[i] for i in ids]
+    ['<Sm/Sm>', 'NP', '<Sm/Sm>']
+    """
+    if table is None:
+        table = category.CategoryTable()
+    # === END IF ===
+
+    return table.intern_all(cats), table.lookup
+# === END ===
+
+def iter_tree_cats(tree: dict) -> typing.Iterator[str]:
+    """
+    Iterate over the categories of the nodes of a tree in the JSON format
+        in pre-order, the order in which `print_tree_ABCT` prints them.
+    """
+    stack: typing.List[dict] = [tree]
+
+    while stack:
+        node = stack.pop()
+        yield node["cat"]
+
+        if "children" in node:
+            stack.extend(reversed(node["children"]))
+        # === END IF ===
+    # === END WHILE ===
+# === END ===
+
+def intern_tree_cats(
+    trees: typing.Iterable[dict],
+    table: typing.Optional[category.CategoryTable] = None,
+) -> typing.Tuple["array.array", typing.List[str]]:
+    """
+    Intern all the categories in a batch of trees.
+
+    Parameters
+    ----------
+    trees : iterable of dict
+        Trees in the JSON format of depccg.
+    table : category.CategoryTable, optional
+        See `translate_cats`.
+
+    Returns
+    -------
+    ids : array.array of int
+        The IDs of the categories of the nodes of all the trees,
+            in pre-order, one tree after another.
+    lookup : list of str
+        The translations indexed by the IDs.
+
+    Examples
+    --------
+    >>> tree = {
+    ...     "cat": "S[m]",
+    ...     "children": [
+    ...         {"cat": "NP", "word": "猫"},
+    ...         {"cat": "S[m]\\\\NP", "word": "寝る"},
+    ...     ]
+    ... }
+    >>> ids, lookup = intern_tree_cats([tree, tree])
+    >>> ids.tolist()
+    [0, 1, 2, 0, 1, 2]
+    >>> cats = (lookup[i] for i in ids)
+    >>> [print_tree_ABCT(tree, cats) for _ in range(2)] == [print_tree_ABCT(tree)] * 2
+    True
+    >>> print_tree_ABCT(tree, (lookup[i] for i in ids))
+    '(Sm (NP 猫) (<NP\\\\Sm> 寝る))'
+    """
+    if table is None:
+        table = category.CategoryTable()
+    # === END IF ===
+
+    return (
+        table.intern_all(
+            itertools.chain.from_iterable(map(iter_tree_cats, trees))
+        ),
+        table.lookup,
+    )
 # === END ===
 
 
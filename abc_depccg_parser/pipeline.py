@@ -0,0 +1,211 @@
+"""
+Pipelines of stages running concurrently on threads.
+
+A stage is a function that transforms an iterator of items
+    into another iterator, e.g. chunks of sentences into chunks of tokens.
+In a pipeline, each stage runs on its own thread
+    and hands its results to the next stage through a bounded queue,
+    so that a slow stage (e.g. parsing) never waits for the others
+    (e.g. reading the input, tokenization or output)
+    as long as they keep up,
+    while no stage runs ahead by more than the size of the queue.
+
+The order of items is kept.
+An exception raised in a stage is passed down the pipeline
+    and raised again to the consumer of the pipeline.
+
+Examples
+--------
+>>> list(
+...     iter_pipeline(
+...         range(5),
+...         lambda items: (i * 2 for i in items),
+...         lambda items: (i + 1 for i in items),
+...     )
+... )
+[1, 3, 5, 7, 9]
+"""
+
+import typing
+import queue
+import threading
+
+"""
+The default number of items waiting between two stages.
+"""
+DEFAULT_QUEUE_SIZE: int = 2
+
+"""
+The interval in seconds at which blocked stages check
+    whether the pipeline is stopped.
+"""
+_POLL_INTERVAL: float = 0.1
+
+_END = object()
+
+class _Failure:
+    """
+    An exception raised in a stage, passed down the pipeline.
+    """
+    __slots__ = ("exc", )
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+    # === END ===
+# === END CLASS ===
+
+class _UpstreamFailure(Exception):
+    def __init__(self, failure: _Failure):
+        super().__init__()
+        self.failure = failure
+    # === END ===
+# === END CLASS ===
+
+class _Stopped(Exception):
+    """
+    Raised in a stage when the consumer has left the pipeline.
+    """
+# === END CLASS ===
+
+def _put(q: queue.Queue, item: typing.Any, stop: threading.Event) -> None:
+    while True:
+        if stop.is_set():
+            raise _Stopped
+        # === END IF ===
+
+        try:
+            q.put(item, timeout = _POLL_INTERVAL)
+            return
+        except queue.Full:
+            pass
+        # === END TRY ===
+    # === END WHILE ===
+# === END ===
+
+def _iter_queue(
+    q: queue.Queue,
+    stop: threading.Event
+) -> typing.Iterator[typing.Any]:
+    while True:
+        if stop.is_set():
+            raise _Stopped
+        # === END IF ===
+
+        try:
+            item = q.get(timeout = _POLL_INTERVAL)
+        except queue.Empty:
+            continue
+        # === END TRY ===
+
+        if item is _END:
+            return
+        elif isinstance(item, _Failure):
+            raise _UpstreamFailure(item)
+        # === END IF ===
+
+        yield item
+    # === END WHILE ===
+# === END ===
+
+def _run_stage(
+    stage: typing.Callable[[typing.Iterator[typing.Any]], typing.Iterable[typing.Any]],
+    in_q: typing.Optional[queue.Queue],
+    out_q: queue.Queue,
+    stop: threading.Event,
+) -> None:
+    try:
+        try:
+            for res in stage(
+                None if in_q is None else _iter_queue(in_q, stop)
+            ):
+                _put(out_q, res, stop)
+            # === END FOR res ===
+        except _UpstreamFailure as e:
+            _put(out_q, e.failure, stop)
+        except _Stopped:
+            raise
+        except BaseException as e:
+            _put(out_q, _Failure(e), stop)
+        else:
+            _put(out_q, _END, stop)
+        # === END TRY ===
+    except _Stopped:
+        pass
+    # === END TRY ===
+# === END ===
+
+def iter_pipeline(
+    items: typing.Iterable[typing.Any],
+    *stages: typing.Callable[[typing.Iterator[typing.Any]], typing.Iterable[typing.Any]],
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> typing.Iterator[typing.Any]:
+    """
+    Run stages concurrently, each on its own thread.
+
+    Parameters
+    ----------
+    items : iterable
+        The input of the first stage.
+        It is also iterated on its own thread,
+            so that reading the input (e.g. STDIN) overlaps with the stages.
+    *stages : callable
+        Functions each of which takes an iterator of items
+            and returns an iterable of the results.
+    queue_size : int
+        The maximum number of items waiting between two stages.
+
+    Yields
+    ------
+    res
+        The results of the last stage.
+        The consumer of the results works concurrently with the stages,
+            e.g. writing the output.
+
+    Raises
+    ------
+    Exception
+        Any exception raised in a stage or in iterating `items`.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize = queue_size) for _ in range(len(stages) + 1)]
+
+    threads = [
+        threading.Thread(
+            target = _run_stage,
+            args = (lambda _: items, None, queues[0], stop),
+            name = "pipeline-input",
+            daemon = True,
+        )
+    ]
+    for i, stage in enumerate(stages):
+        threads.append(
+            threading.Thread(
+                target = _run_stage,
+                args = (stage, queues[i], queues[i + 1], stop),
+                name = f"pipeline-stage-{i}",
+                daemon = True,
+            )
+        )
+    # === END FOR ===
+
+    for thread in threads:
+        thread.start()
+    # === END FOR ===
+
+    try:
+        while True:
+            item = queues[-1].get()
+
+            if item is _END:
+                break
+            elif isinstance(item, _Failure):
+                raise item.exc
+            # === END IF ===
+
+            yield item
+        # === END WHILE ===
+    finally:
+        # Let the stages go if the consumer leaves halfway.
+        stop.set()
+    # === END TRY ===
+# === END ===
@@ -0,0 +1,211 @@
+"""
+Random access to parsed output in the ABC Treebank format.
+
+The output and its index (see `index`) are memory-mapped,
+    so that a tree is fetched in constant time
+    without reading the rest of the output,
+    however large it is.
+
+Examples
+--------
+Parse with an index:
+
+    abc_depccg_parser parse -m MODEL --index parsed.abct.idx < sents.txt > parsed.abct
+
+and fetch trees:
+
+    with IndexedTreebank("parsed.abct") as treebank:
+        best = treebank.get(12345)
+        nbest = treebank[12345]
+"""
+
+import typing
+import mmap
+import pathlib
+
+from . import index
+
+class IndexedTreebank:
+    """
+    A memory-mapped output in the ABC Treebank format with its index.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The output.
+    index_path : str or pathlib.Path, optional
+        The index of the output.
+        By default, the path of the output with ".idx" appended.
+
+    Attributes
+    ----------
+    index : index.Index
+        The index.
+
+    Raises
+    ------
+    index.BrokenIndexError
+        If the index is broken, incomplete or does not match the output.
+    """
+
+    def __init__(
+        self,
+        path: typing.Union[str, pathlib.Path],
+        index_path: typing.Union[str, pathlib.Path, None] = None,
+    ):
+        path = pathlib.Path(path)
+        if index_path is None:
+            index_path = path.with_name(path.name + ".idx")
+        # === END IF ===
+
+        self._files: typing.List[typing.BinaryIO] = []
+        self._maps: typing.List[mmap.mmap] = []
+
+        try:
+            self._data = self._map(path)
+            self.index = index.Index(self._map(index_path))
+        except BaseException:
+            self.close()
+            raise
+        # === END TRY ===
+
+        if self.index.n_entries:
+            last = self.index.get_entry(self.index.n_entries - 1)
+            if last.offset + last.length > len(self._data):
+                self.close()
+                raise index.BrokenIndexError(
+                    "the index does not match the output"
+                )
+            # === END IF ===
+        # === END IF ===
+    # === END ===
+
+    def _map(self, path: typing.Union[str, pathlib.Path]) -> typing.Union[bytes, mmap.mmap]:
+        f = open(path, "rb")
+        self._files.append(f)
+
+        # Empty files cannot be mapped.
+        if not f.seek(0, 2):
+            return b""
+        # === END IF ===
+
+        m = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        self._maps.append(m)
+        return m
+    # === END ===
+
+    def close(self) -> None:
+        for m in self._maps:
+            m.close()
+        # === END FOR ===
+        for f in self._files:
+            f.close()
+        # === END FOR ===
+
+        self._maps = []
+        self._files = []
+    # === END ===
+
+    def __enter__(self) -> "IndexedTreebank":
+        return self
+    # === END ===
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    # === END ===
+
+    def __len__(self) -> int:
+        """
+        The number of sentence IDs, including those with no trees.
+        """
+        return self.index.n_IDs
+    # === END ===
+
+    def __contains__(self, ID: int) -> bool:
+        return 0 <= ID - self.index.first_ID < self.index.n_IDs
+    # === END ===
+
+    def iter_IDs(self) -> typing.Iterator[int]:
+        first_ID = self.index.first_ID
+        return iter(range(first_ID, first_ID + self.index.n_IDs))
+    # === END ===
+
+    def get_bytes(self, ID: int, rank: int = 0) -> bytes:
+        """
+        Fetch a tree as it is in the output, in UTF-8, without the newline.
+
+        Raises
+        ------
+        KeyError
+            If the sentence has no tree of the rank.
+        """
+        entries = self.index.get_entries(ID)
+        if not 0 <= rank < len(entries):
+            raise KeyError((ID, rank))
+        # === END IF ===
+
+        return self._get_entry_bytes(entries[rank])
+    # === END ===
+
+    def _get_entry_bytes(self, entry: index.Entry) -> bytes:
+        """
+        Fetch the tree of an index entry,
+            checking that it ends with the sentence ID of the entry.
+
+        Raises
+        ------
+        index.BrokenIndexError
+            If the index does not match the output.
+        """
+        offset, length, ID, _ = entry
+        data = self._data[offset:offset + length]
+
+        if not data.endswith(f"(ID {ID}))".encode("utf-8")):
+            raise index.BrokenIndexError(
+                f"the index does not match the output at sentence {ID}"
+            )
+        # === END IF ===
+
+        return data
+    # === END ===
+
+    def get(self, ID: int, rank: int = 0) -> str:
+        """
+        Fetch a tree.
+
+        Parameters
+        ----------
+        ID : int
+            The sentence ID.
+        rank : int
+            The n-best rank, from 0.
+
+        Returns
+        -------
+        tree : str
+            The tree in the ABC Treebank format, without the newline.
+
+        Raises
+        ------
+        KeyError
+            If the sentence has no tree of the rank.
+        """
+        return self.get_bytes(ID, rank).decode("utf-8")
+    # === END ===
+
+    def __getitem__(self, ID: int) -> typing.List[str]:
+        """
+        Fetch the n-best trees of a sentence.
+        The list is empty if the sentence has no trees.
+
+        Raises
+        ------
+        index.BrokenIndexError
+            If the index does not match the output.
+        """
+        return [
+            self._get_entry_bytes(entry).decode("utf-8")
+            for entry in self.index.get_entries(ID)
+        ]
+    # === END ===
+# === END CLASS ===
@@ -0,0 +1,516 @@
+"""
+A persistent parse server and its client.
+
+The server keeps the parser and the tokenizer loaded
+    and parses sentences sent over HTTP,
+    either on a TCP port or on a Unix domain socket.
+Sentences of concurrent requests are put together into one batch
+    before being handed to the parser.
+
+Protocol
+--------
+POST /parse with a JSON body:
+
+    {
+        "sentences": ["...", ...],
+        "format": "ABCT" | "json",      (optional, default: "ABCT")
+        "tokenize": true | false,       (optional, default: the server setting)
+        "start_ID": 1                   (optional, default: 1)
+    }
+
+The response is the ABCT trees in plain text
+    or a JSON object of the form {"results": [{"ID": ..., "trees": [...]}, ...]}.
+
+GET /health returns "OK" once the parser is loaded.
+"""
+
+import typing
+import sys
+import json
+import queue
+import socket
+import threading
+import time
+import pathlib
+import http.client
+import http.server
+import socketserver
+
+from . import parser
+from . import tokenizer
+
+OUTPUT_FORMATS: typing.Tuple[str, ...] = ("ABCT", "json")
+
+class _Job:
+    """
+    A parse request waiting to be batched.
+    """
+    __slots__ = (
+        "sentences", "output_format", "is_to_tokenize", "start_ID",
+        "done", "result", "error"
+    )
+
+    def __init__(
+        self,
+        sentences: typing.List[str],
+        output_format: str,
+        is_to_tokenize: bool,
+        start_ID: int,
+    ):
+        self.sentences = sentences
+        self.output_format = output_format
+        self.is_to_tokenize = is_to_tokenize
+        self.start_ID = start_ID
+        self.done = threading.Event()
+        self.result: typing.Any = None
+        self.error: typing.Optional[BaseException] = None
+    # === END ===
+# === END CLASS ===
+
+class Batcher:
+    """
+    Collect parse requests from multiple threads
+        and parse them together in a single thread.
+
+    Parameters
+    ----------
+    batchsize : int
+        The batch size of the supertagger.
+    max_batch_sentences : int
+        The maximum number of sentences put together.
+    max_wait : float
+        How long (in seconds) to wait for further requests
+            before parsing a batch.
+    parser_options : dict, optional
+        The options of the parser (see `parser.make_parser_options`).
+    """
+
+    def __init__(
+        self,
+        batchsize: int = 32,
+        max_batch_sentences: int = 256,
+        max_wait: float = 0.01,
+        parser_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    ):
+        self.batchsize = batchsize
+        self.parser_options = parser_options
+        self.max_batch_sentences = max_batch_sentences
+        self.max_wait = max_wait
+        self._jobs: "queue.Queue[_Job]" = queue.Queue()
+        self._thread = threading.Thread(
+            target = self._run,
+            name = "abc-depccg-parser-batcher",
+            daemon = True
+        )
+        self._thread.start()
+    # === END ===
+
+    def submit(
+        self,
+        sentences: typing.List[str],
+        output_format: str = "ABCT",
+        is_to_tokenize: bool = False,
+        start_ID: int = 1,
+    ) -> typing.Any:
+        """
+        Parse sentences and wait for the result.
+        """
+        job = _Job(sentences, output_format, is_to_tokenize, start_ID)
+        self._jobs.put(job)
+        job.done.wait()
+
+        if job.error:
+            raise job.error
+        # === END IF ===
+
+        return job.result
+    # === END ===
+
+    def _collect(self) -> typing.List[_Job]:
+        jobs = [self._jobs.get()]
+        n_sentences = len(jobs[0].sentences)
+        deadline = time.monotonic() + self.max_wait
+
+        while n_sentences < self.max_batch_sentences:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            # === END IF ===
+
+            try:
+                job = self._jobs.get(timeout = timeout)
+            except queue.Empty:
+                break
+            # === END TRY ===
+
+            jobs.append(job)
+            n_sentences += len(job.sentences)
+        # === END WHILE ===
+
+        return jobs
+    # === END ===
+
+    def _run(self) -> typing.NoReturn:
+        while True:
+            jobs = self._collect()
+
+            for is_to_tokenize in (False, True):
+                group = [
+                    job for job in jobs
+                    if job.is_to_tokenize == is_to_tokenize
+                ]
+                if group:
+                    self._process(group, is_to_tokenize)
+                # === END IF ===
+            # === END FOR ===
+        # === END WHILE ===
+    # === END ===
+
+    def _process(
+        self,
+        jobs: typing.List[_Job],
+        is_to_tokenize: bool
+    ) -> None:
+        try:
+            parsed_trees, doc_tagged = parser.parse_sentences(
+                [sent for job in jobs for sent in job.sentences],
+                is_to_tokenize = is_to_tokenize,
+                batchsize = self.batchsize,
+                parser_options = self.parser_options,
+            )
+
+            offset = 0
+            for job in jobs:
+                end = offset + len(job.sentences)
+                job.result = _render(
+                    parsed_trees[offset:end],
+                    doc_tagged[offset:end],
+                    job.output_format,
+                    job.start_ID,
+                )
+                offset = end
+            # === END FOR job ===
+        except Exception as e:
+            for job in jobs:
+                job.error = e
+            # === END FOR job ===
+        finally:
+            for job in jobs:
+                job.done.set()
+            # === END FOR job ===
+        # === END TRY ===
+    # === END ===
+# === END CLASS ===
+
+def _render(
+    parsed_trees,
+    tokens_of_trees,
+    output_format: str,
+    start_ID: int,
+) -> typing.Union[str, typing.List[dict]]:
+    if output_format == "json":
+        return [
+            {
+                "ID": ID,
+                "trees": [
+                    dict(tree.json(tokens = tokens), log_prob = prob)
+                    for tree, prob in parsed
+                ]
+            }
+            for ID, (parsed, tokens) in enumerate(
+                zip(parsed_trees, tokens_of_trees),
+                start_ID
+            )
+        ]
+    else:
+        return parser.print_batch_parsed_ABCT(
+            parsed_trees, tokens_of_trees, start_ID
+        )
+    # === END IF ===
+# === END ===
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    # Set by `serve`.
+    batcher: Batcher
+    is_to_tokenize: bool = False
+
+    def address_string(self) -> str:
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        # === END IF ===
+
+        # Unix domain sockets have no client addresses.
+        return "unix"
+    # === END ===
+
+    def _reply(
+        self,
+        code: int,
+        body: str,
+        content_type: str = "text/plain"
+    ) -> None:
+        data = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    # === END ===
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._reply(200, "OK")
+        else:
+            self._reply(404, "not found")
+        # === END IF ===
+    # === END ===
+
+    def do_POST(self) -> None:
+        if self.path != "/parse":
+            self._reply(404, "not found")
+            return
+        # === END IF ===
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            sentences = [
+                sent for sent in (
+                    str(s).strip() for s in request["sentences"]
+                ) if sent
+            ]
+            output_format = request.get("format", "ABCT")
+            if output_format not in OUTPUT_FORMATS:
+                raise ValueError(f"unknown format: {output_format}")
+            # === END IF ===
+            is_to_tokenize = bool(
+                request.get("tokenize", self.is_to_tokenize)
+            )
+            start_ID = int(request.get("start_ID", 1))
+        except (ValueError, KeyError, TypeError) as e:
+            self._reply(400, f"bad request: {e}")
+            return
+        # === END TRY ===
+
+        if not sentences:
+            result = [] if output_format == "json" else ""
+        else:
+            try:
+                result = self.batcher.submit(
+                    sentences, output_format, is_to_tokenize, start_ID
+                )
+            except Exception as e:
+                self._reply(500, f"parse error: {e}")
+                return
+            # === END TRY ===
+        # === END IF ===
+
+        if output_format == "json":
+            self._reply(
+                200,
+                json.dumps({"results": result}, ensure_ascii = False),
+                "application/json"
+            )
+        else:
+            self._reply(200, result)
+        # === END IF ===
+    # === END ===
+# === END CLASS ===
+
+class _ThreadingUnixHTTPServer(
+    socketserver.ThreadingMixIn,
+    socketserver.UnixStreamServer
+):
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        socketserver.UnixStreamServer.server_bind(self)
+        # Required by BaseHTTPRequestHandler.
+        self.server_name = "localhost"
+        self.server_port = 0
+    # === END ===
+# === END CLASS ===
+
+def serve(
+    model_path: typing.Union[str, pathlib.Path] = None,
+    parser_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: typing.Optional[typing.Union[str, pathlib.Path]] = None,
+    is_to_tokenize: bool = False,
+    batchsize: int = 32,
+    max_batch_sentences: int = 256,
+    max_wait: float = 0.01,
+    log_stream: typing.TextIO = sys.stderr,
+) -> typing.NoReturn:
+    """
+    Load the parser and serve parse requests until interrupted.
+
+    Parameters
+    ----------
+    model_path : str or pathlib.Path, optional
+        The path to a user model.
+    parser_options : dict, optional
+        The options of the parser (see `parser.make_parser_options`).
+    host, port : str, int
+        The TCP address to listen on.
+        Ignored if `socket_path` is given.
+    socket_path : str or pathlib.Path, optional
+        The path of a Unix domain socket to listen on.
+    is_to_tokenize : bool
+        Whether to tokenize sentences by default.
+    batchsize : int
+        The batch size of the supertagger.
+    max_batch_sentences : int
+        The maximum number of sentences of concurrent requests put together.
+    max_wait : float
+        How long (in seconds) to wait for concurrent requests.
+    """
+    # Warm up the singletons.
+    parser.load_parser(model_path, parser_options)
+    if is_to_tokenize and not tokenizer.tokenizer:
+        tokenizer.tokenizer = tokenizer.generate_tokenizer()
+    # === END IF ===
+
+    handler = type(
+        "Handler",
+        (_Handler, ),
+        {
+            "batcher": Batcher(
+                batchsize, max_batch_sentences, max_wait, parser_options
+            ),
+            "is_to_tokenize": is_to_tokenize,
+        }
+    )
+
+    if socket_path:
+        socket_path = pathlib.Path(socket_path)
+        if socket_path.is_socket():
+            socket_path.unlink()
+        # === END IF ===
+
+        httpd = _ThreadingUnixHTTPServer(str(socket_path), handler)
+        address = str(socket_path)
+    else:
+        httpd = http.server.ThreadingHTTPServer((host, port), handler)
+        address = f"http://{host}:{port}"
+    # === END IF ===
+
+    log_stream.write(f"Serving on {address}\n")
+    log_stream.flush()
+
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+        if socket_path:
+            socket_path.unlink()
+        # === END IF ===
+    # === END TRY ===
+# === END ===
+
+# ======
+# Client
+# ======
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float = None):
+        super().__init__("localhost", timeout = timeout)
+        self.socket_path = socket_path
+    # === END ===
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        # === END IF ===
+        self.sock.connect(self.socket_path)
+    # === END ===
+# === END CLASS ===
+
+class Client:
+    """
+    A client of the parse server.
+
+    Parameters
+    ----------
+    host, port : str, int
+        The TCP address of the server.
+    socket_path : str or pathlib.Path, optional
+        The path of the Unix domain socket of the server.
+        Preferred to `host` and `port` if given.
+    timeout : float, optional
+        The timeout of each request in seconds.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        socket_path: typing.Optional[typing.Union[str, pathlib.Path]] = None,
+        timeout: typing.Optional[float] = None,
+    ):
+        if socket_path:
+            self._conn = _UnixHTTPConnection(str(socket_path), timeout)
+        else:
+            self._conn = http.client.HTTPConnection(host, port, timeout)
+        # === END IF ===
+    # === END ===
+
+    def parse(
+        self,
+        sentences: typing.List[str],
+        output_format: str = "ABCT",
+        is_to_tokenize: typing.Optional[bool] = None,
+        start_ID: int = 1,
+    ) -> typing.Union[str, typing.List[dict]]:
+        """
+        Send sentences to the server and return the result.
+
+        Returns
+        -------
+        res : str or list of dict
+            The ABCT trees or, if `output_format` is "json",
+                the list of the results of the sentences.
+        """
+        request: typing.Dict[str, typing.Any] = {
+            "sentences": sentences,
+            "format": output_format,
+            "start_ID": start_ID,
+        }
+        if is_to_tokenize is not None:
+            request["tokenize"] = is_to_tokenize
+        # === END IF ===
+
+        self._conn.request(
+            "POST", "/parse",
+            body = json.dumps(request, ensure_ascii = False).encode("utf-8"),
+            headers = {"Content-Type": "application/json"}
+        )
+        response = self._conn.getresponse()
+        body = response.read().decode("utf-8")
+
+        if response.status != 200:
+            raise RuntimeError(
+                f"the parse server responded {response.status}: {body}"
+            )
+        # === END IF ===
+
+        if output_format == "json":
+            return json.loads(body)["results"]
+        else:
+            return body
+        # === END IF ===
+    # === END ===
+
+    def close(self) -> None:
+        self._conn.close()
+    # === END ===
+
+    def __enter__(self) -> "Client":
+        return self
+    # === END ===
+
+    def __exit__(self, *args) -> None:
+        self.close()
+    # === END ===
+# === END CLASS ===
@@ -0,0 +1,327 @@
+"""
+Statistics of parsing for profiling.
+
+The stages of parsing report their wall time and counts
+    to the global `collector`, which is `None` unless `enable`d,
+    in which case instrumentation costs no more than a function call
+    per chunk or batch of sentences.
+
+Stages
+------
+load_parser
+    Loading the model (`parser.generate_parser`).
+load_tokenizer
+    Loading janome and the ABC user dictionary
+    (`tokenizer.generate_tokenizer`).
+tag
+    Tokenization and tagging (`parser.tag_sentences`).
+parse
+    Supertagging and A* search (`parse_doc` of depccg).
+cache_lookup, cache_store
+    Reading and writing the parse cache.
+print
+    Printing trees in the ABC Treebank format,
+    including the translation of categories.
+write
+    Writing the output.
+
+Stages overlap when they run concurrently
+    (e.g. in a pipeline or in worker processes),
+    so their times may add up to more than the wall time.
+
+Examples
+--------
+>>> collector = enable()
+>>> with timed("parse"):
+...     pass
+>>> collector.report()["stages"]["parse"]["calls"]
+1
+>>> disable()
+"""
+
+import typing
+import contextlib
+import sys
+import threading
+import time
+
+"""
+The upper bounds, in milliseconds, of the bins of latency histograms.
+The last bin is unbounded.
+"""
+LATENCY_BINS_MS: typing.Tuple[float, ...] = tuple(
+    2.0 ** i for i in range(0, 17)
+)
+
+def _get_cat_cache_counts() -> typing.Tuple[int, int]:
+    """
+    Get the hits and misses of the translation cache of categories
+        (`parser.parse_cat_translate_TLG`) in this process,
+        or zeros if the parser module is not loaded.
+    """
+    parser = sys.modules.get(f"{__package__}.parser")
+    if parser is None:
+        return 0, 0
+    # === END IF ===
+
+    info = parser.parse_cat_translate_TLG.cache_info()
+    return info.hits, info.misses
+# === END ===
+
+class Stats:
+    """
+    A collector of statistics.
+
+    Attributes
+    ----------
+    stage_seconds : dict of str to float
+        The wall time of each stage.
+    stage_calls : dict of str to int
+        The number of times each stage is run.
+    counts : dict of str to int
+        Counters, e.g. "sentences", "words", "cache_hits" and "cache_misses".
+        The hits and misses of the translation cache of categories
+            ("category_cache_hits" and "category_cache_misses")
+            are added when the statistics are popped or reported,
+            so that those of worker processes are merged as well.
+    latency_bins : list of int
+        A histogram of the amortized parse latency per sentence
+            (see `LATENCY_BINS_MS` and `observe_latency`).
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.stage_seconds: typing.Dict[str, float] = {}
+        self.stage_calls: typing.Dict[str, int] = {}
+        self.counts: typing.Dict[str, int] = {}
+        self.latency_bins: typing.List[int] = [0] * (len(LATENCY_BINS_MS) + 1)
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self._lock = threading.Lock()
+        # The counts of the category cache already added
+        self._cat_cache_counts = _get_cat_cache_counts()
+    # === END ===
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+            self.stage_calls[stage] = self.stage_calls.get(stage, 0) + 1
+        # === END WITH ===
+    # === END ===
+
+    def add(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+        # === END WITH ===
+    # === END ===
+
+    def observe_latency(self, seconds: float, n: int = 1) -> None:
+        """
+        Record the parse latency of `n` sentences, each taking `seconds`.
+
+        As depccg parses sentences in batches,
+            the time of a batch is divided equally among its sentences:
+            the latency is amortized over batches,
+            and a slow sentence raises that of all the others in its batch.
+        Parse with a batch size of 1 to observe each sentence.
+        """
+        ms = seconds * 1000
+        i = 0
+        while i < len(LATENCY_BINS_MS) and ms > LATENCY_BINS_MS[i]:
+            i += 1
+        # === END WHILE ===
+
+        with self._lock:
+            self.latency_bins[i] += n
+            self.latency_sum += seconds * n
+            self.latency_max = max(self.latency_max, seconds)
+        # === END WITH ===
+    # === END ===
+
+    def _add_cat_cache_counts(self) -> None:
+        """
+        Add the hits and misses of the category cache
+            since they were last added.
+        """
+        hits, misses = _get_cat_cache_counts()
+        hits_added, misses_added = self._cat_cache_counts
+        self._cat_cache_counts = (hits, misses)
+
+        # The cache may have been cleared.
+        self.add("category_cache_hits", max(hits - hits_added, 0))
+        self.add("category_cache_misses", max(misses - misses_added, 0))
+    # === END ===
+
+    def pop(self) -> dict:
+        """
+        Take out the statistics collected so far in a picklable form
+            (e.g. to send them from a worker process),
+            leaving the collector empty.
+        """
+        self._add_cat_cache_counts()
+
+        with self._lock:
+            res = {
+                "stage_seconds": self.stage_seconds,
+                "stage_calls": self.stage_calls,
+                "counts": self.counts,
+                "latency_bins": self.latency_bins,
+                "latency_sum": self.latency_sum,
+                "latency_max": self.latency_max,
+            }
+            self.stage_seconds = {}
+            self.stage_calls = {}
+            self.counts = {}
+            self.latency_bins = [0] * (len(LATENCY_BINS_MS) + 1)
+            self.latency_sum = 0.0
+            self.latency_max = 0.0
+        # === END WITH ===
+
+        return res
+    # === END ===
+
+    def merge(self, popped: dict) -> None:
+        """
+        Add statistics taken out of another collector by `pop`.
+        """
+        with self._lock:
+            for stage, seconds in popped["stage_seconds"].items():
+                self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+            # === END FOR ===
+            for stage, calls in popped["stage_calls"].items():
+                self.stage_calls[stage] = self.stage_calls.get(stage, 0) + calls
+            # === END FOR ===
+            for name, value in popped["counts"].items():
+                self.counts[name] = self.counts.get(name, 0) + value
+            # === END FOR ===
+            for i, n in enumerate(popped["latency_bins"]):
+                self.latency_bins[i] += n
+            # === END FOR ===
+            self.latency_sum += popped["latency_sum"]
+            self.latency_max = max(self.latency_max, popped["latency_max"])
+        # === END WITH ===
+    # === END ===
+
+    def report(self) -> dict:
+        """
+        Make a report, which can be dumped in JSON.
+        """
+        self._add_cat_cache_counts()
+
+        wall_time = time.perf_counter() - self.start_time
+        n_sentences = self.counts.get("sentences", 0)
+        n_words = self.counts.get("words", 0)
+        n_latencies = sum(self.latency_bins)
+        n_hits = self.counts.get("cache_hits", 0)
+        n_lookups = n_hits + self.counts.get("cache_misses", 0)
+        n_cat_hits = self.counts.get("category_cache_hits", 0)
+        n_cat_lookups = n_cat_hits + self.counts.get("category_cache_misses", 0)
+
+        return {
+            "wall_seconds": wall_time,
+            "sentences": n_sentences,
+            "words": n_words,
+            "sentences_per_second": n_sentences / wall_time if wall_time else None,
+            "words_per_second": n_words / wall_time if wall_time else None,
+            "stages": {
+                stage: {
+                    "seconds": seconds,
+                    "calls": self.stage_calls[stage],
+                }
+                for stage, seconds in sorted(self.stage_seconds.items())
+            },
+            # Amortized over batches (see `observe_latency`)
+            "amortized_parse_latency_ms": {
+                "sentences": n_latencies,
+                "mean": (
+                    self.latency_sum / n_latencies * 1000
+                    if n_latencies else None
+                ),
+                "max": self.latency_max * 1000,
+                "histogram": [
+                    {"le": le, "count": count}
+                    for le, count in zip(
+                        LATENCY_BINS_MS + (None, ), self.latency_bins
+                    )
+                    if count
+                ],
+            },
+            "parse_cache": {
+                "hits": n_hits,
+                "lookups": n_lookups,
+                "hit_rate": n_hits / n_lookups if n_lookups else None,
+            },
+            "category_cache": {
+                "hits": n_cat_hits,
+                "lookups": n_cat_lookups,
+                "hit_rate": n_cat_hits / n_cat_lookups if n_cat_lookups else None,
+            },
+            "counts": dict(sorted(self.counts.items())),
+        }
+    # === END ===
+# === END CLASS ===
+
+collector: typing.Optional[Stats] = None
+
+def enable() -> Stats:
+    """
+    Start collecting statistics.
+    """
+    global collector
+
+    collector = Stats()
+    return collector
+# === END ===
+
+def disable() -> None:
+    global collector
+
+    collector = None
+# === END ===
+
+class _Timer:
+    """
+    Attributes
+    ----------
+    seconds : float
+        The wall time, available after exiting.
+    """
+    __slots__ = ("stats", "stage", "start", "seconds")
+
+    def __init__(self, stats: Stats, stage: str):
+        self.stats = stats
+        self.stage = stage
+    # === END ===
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+    # === END ===
+
+    def __exit__(self, *exc_info) -> None:
+        self.seconds = time.perf_counter() - self.start
+        self.stats.add_time(self.stage, self.seconds)
+    # === END ===
+# === END CLASS ===
+
+_NULL_TIMER = contextlib.nullcontext()
+
+def timed(stage: str) -> typing.ContextManager:
+    """
+    Time a stage if statistics are collected.
+    """
+    if collector is None:
+        return _NULL_TIMER
+    # === END IF ===
+
+    return _Timer(collector, stage)
+# === END ===
+
+def add(name: str, value: int = 1) -> None:
+    """
+    Add to a counter if statistics are collected.
+    """
+    if collector is not None:
+        collector.add(name, value)
+    # === END IF ===
+# === END ===
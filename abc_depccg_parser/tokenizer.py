@@ -1,15 +1,121 @@
 import typing
-import janome.tokenizer as jt
+import os
+import pathlib
+import hashlib
+import mmap
+import pickle
+import shutil
+
 from . import dic
+from . import stats
 
-tokenizer: jt.Tokenizer = None
+tokenizer: "janome.tokenizer.Tokenizer" = None
 
-def generate_tokenizer():
-    import janome.dic
+"""
+The environment variable that overrides the directory 
+    where compiled user dictionaries are cached.
+"""
+CACHE_DIR_ENV: str = "ABC_DEPCCG_PARSER_CACHE_DIR"
+
+_USER_DIC_FST_FILE: str = "user_fst.bin"
+_USER_DIC_ENTRIES_FILE: str = "user_entries.pickle"
+
+def get_cache_dir() -> pathlib.Path:
+    """
+    Get the default cache directory of this package.
+
+    It is `$ABC_DEPCCG_PARSER_CACHE_DIR` if set,
+        or otherwise `abc_depccg_parser` 
+        under `$XDG_CACHE_HOME` (default: `~/.cache`).
+    """
+    if os.environ.get(CACHE_DIR_ENV):
+        return pathlib.Path(os.environ[CACHE_DIR_ENV])
+    # === END IF ===
+
+    return pathlib.Path(
+        os.environ.get("XDG_CACHE_HOME") 
+        or pathlib.Path.home() / ".cache"
+    ) / "abc_depccg_parser"
+# === END ===
+
+def get_user_dic_cache_key() -> str:
+    """
+    Get the key that identifies the compiled ABC user dictionary.
+
+    The key consists of the version of janome, 
+        which determines the system dictionary and the FST format,
+        and a hash of the generation rules in `dic`.
+    """
+    from janome.version import JANOME_VERSION
+
+    rules_hash = hashlib.sha256(
+        pathlib.Path(dic.__file__).read_bytes()
+    ).hexdigest()[:16]
+
+    return f"userdic-janome{JANOME_VERSION}-{rules_hash}"
+# === END ===
+
+def generate_tokenizer(
+    cache_dir: typing.Union[str, pathlib.Path, None] = None,
+    use_cache: bool = True,
+) -> "janome.tokenizer.Tokenizer":
+    """
+    Generate a janome tokenizer equipped with the ABC user dictionary.
+
+    The user dictionary is compiled only once
+        and stored in a cache directory.
+    Later calls memory-map the compiled FST instead of compiling it again.
+
+    Parameters
+    ----------
+    cache_dir : str or pathlib.Path, optional
+        The cache directory. 
+        Defaults to `get_cache_dir()`.
+    use_cache : bool
+        Whether to use the cache.
+        If false, the user dictionary is compiled from scratch
+            and nothing is stored.
+    """
+    import janome.tokenizer
     from janome.sysdic import connections
-    import tempfile
 
-    tokenizer = jt.Tokenizer()
+    tokenizer = janome.tokenizer.Tokenizer()
+
+    user_dic_dir = (
+        pathlib.Path(cache_dir or get_cache_dir()) 
+        / get_user_dic_cache_key()
+    )
+
+    if use_cache:
+        try:
+            tokenizer.user_dic = _load_user_dic(user_dic_dir, connections)
+            return tokenizer
+        except (OSError, ValueError, pickle.UnpicklingError):
+            # No valid cache.
+            pass
+        # === END TRY ===
+    # === END IF ===
+
+    tokenizer.user_dic = _build_user_dic(tokenizer, connections)
+
+    if use_cache:
+        try:
+            _save_user_dic(tokenizer.user_dic, user_dic_dir)
+        except OSError:
+            # Caching is an optimization; an unwritable cache is no error.
+            pass
+        # === END TRY ===
+    # === END IF ===
+
+    return tokenizer
+# === END ===
+
+def _build_user_dic(
+    tokenizer: "janome.tokenizer.Tokenizer",
+    connections,
+) -> "janome.dic.UserDictionary":
+    import janome.dic
+    import tempfile
 
     abc_entries = dic.generate_abc_dic(
         sysdic = tokenizer.sys_dic.entries.values()
@@ -20,59 +126,176 @@ def generate_tokenizer():
             user_dict_tf.write(",".join(map(str, entry)))
             user_dict_tf.write("\n")
         # === END FOR entry ===
+        user_dict_tf.flush()
 
-        tokenizer.user_dic = janome.dic.UserDictionary(
+        return janome.dic.UserDictionary(
             user_dict_tf.name, 
             "utf8", "ipadic",
             connections
         )
     # === END WITH user_dict ===
+# === END ===
 
-    return tokenizer
+def _save_user_dic(
+    user_dic: "janome.dic.Dictionary",
+    user_dic_dir: pathlib.Path,
+) -> None:
+    import tempfile
+
+    user_dic_dir.parent.mkdir(parents = True, exist_ok = True)
+
+    # Write into a temporary directory and rename it
+    #   so that concurrent processes never see a half-written cache.
+    tmp_dir = pathlib.Path(
+        tempfile.mkdtemp(
+            prefix = user_dic_dir.name + ".", 
+            dir = user_dic_dir.parent
+        )
+    )
+
+    try:
+        (tmp_dir / _USER_DIC_FST_FILE).write_bytes(
+            user_dic.compiledFST[0]
+        )
+        with open(tmp_dir / _USER_DIC_ENTRIES_FILE, "wb") as f:
+            pickle.dump(user_dic.entries, f, protocol = pickle.HIGHEST_PROTOCOL)
+        # === END WITH f ===
+
+        os.rename(tmp_dir, user_dic_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors = True)
+
+        # Another process has done it first.
+        if not user_dic_dir.is_dir():
+            raise
+        # === END IF ===
+    # === END TRY ===
 # === END ===
 
-def tokenize(
+def _load_user_dic(
+    user_dic_dir: pathlib.Path,
+    connections,
+) -> "janome.dic.Dictionary":
+    import janome.dic
+
+    with open(user_dic_dir / _USER_DIC_ENTRIES_FILE, "rb") as f:
+        entries = pickle.load(f)
+    # === END WITH f ===
+
+    with open(user_dic_dir / _USER_DIC_FST_FILE, "rb") as f:
+        # The mapping outlives the file object.
+        fst = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+    # === END WITH f ===
+
+    return janome.dic.Dictionary([fst], entries, connections)
+# === END ===
+
+def analyze(
     sentences: typing.Iterable[typing.Iterable[str]]
-) -> typing.Tuple[
-    typing.List[typing.List["depccg.tokens.Token"]], 
-    typing.List[str]
-]:
-    import depccg.tokens
+) -> typing.List[typing.List[typing.Tuple[str, ...]]]:
+    """
+    Tokenize sentences with janome.
+
+    This is the part of `tokenize` that does not depend on depccg.
+    Its results consist only of strings
+        and are thus cheap to send from worker processes.
+
+    Parameters
+    ----------
+    sentences : iterable of iterable of str
+        Sentences, each of which is a sequence of strings
+            (e.g. the words of a pre-tokenized sentence)
+            that are concatenated before tokenization.
 
+    Returns
+    -------
+    res : list of list of tuple of str
+        The fields of the tokens of each sentence, 
+            in the order of `TOKEN_FIELDS`.
+    """
     global tokenizer 
 
     if tokenizer:
         pass
     else:
-        tokenizer = generate_tokenizer()
+        with stats.timed("load_tokenizer"):
+            tokenizer = generate_tokenizer()
+        # === END WITH ===
     # === END IF ===
 
     res = []
-    raw_sentences = []
 
     for sentence in sentences:
         sentence = ''.join(sentence)
-        tokenized = tokenizer.tokenize(sentence)
         tokens = []
 
-        for token in tokenized:
+        for token in tokenizer.tokenize(sentence):
             pos, pos1, pos2, pos3 = token.part_of_speech.split(',')
-            token = depccg.tokens.Token(
-                word=token.surface,
-                surf=token.surface,
-                pos=pos,
-                pos1=pos1,
-                pos2=pos2,
-                pos3=pos3,
-                inflectionForm=token.infl_form,
-                inflectionType=token.infl_type,
-                reading=token.reading,
-                base=token.base_form
+            tokens.append(
+                (
+                    token.surface, pos, pos1, pos2, pos3,
+                    token.infl_form, token.infl_type,
+                    token.reading, token.base_form,
+                )
             )
-            tokens.append(token)
-        raw_sentence = [token.surface for token in tokenized]
+        # === END FOR token ===
+
         res.append(tokens)
-        raw_sentences.append(raw_sentence)
+    # === END FOR sentence ===
+
+    return res
+# === END ===
+
+"""
+The fields of a token in the results of `analyze`.
+"""
+TOKEN_FIELDS: typing.Tuple[str, ...] = (
+    "surf", "pos", "pos1", "pos2", "pos3",
+    "inflectionForm", "inflectionType", "reading", "base",
+)
+
+def make_tokens(
+    analyzed: typing.Iterable[typing.Iterable[typing.Tuple[str, ...]]]
+) -> typing.Tuple[
+    typing.List[typing.List["depccg.tokens.Token"]], 
+    typing.List[typing.List[str]]
+]:
+    """
+    Make depccg tokens from the results of `analyze`.
+
+    Returns
+    -------
+    res : list of list of depccg.tokens.Token
+        The tokens of each sentence.
+    raw_sentences : list of list of str
+        The surface forms of the tokens of each sentence.
+    """
+    import depccg.tokens
+
+    res = []
+    raw_sentences = []
+
+    for fields_of_tokens in analyzed:
+        res.append(
+            [
+                depccg.tokens.Token(
+                    word = fields[0],
+                    **dict(zip(TOKEN_FIELDS, fields))
+                )
+                for fields in fields_of_tokens
+            ]
+        )
+        raw_sentences.append([fields[0] for fields in fields_of_tokens])
+    # === END FOR fields_of_tokens ===
 
     return res, raw_sentences
-# === END ===
\ No newline at end of file
+# === END ===
+
+def tokenize(
+    sentences: typing.Iterable[typing.Iterable[str]]
+) -> typing.Tuple[
+    typing.List[typing.List["depccg.tokens.Token"]], 
+    typing.List[typing.List[str]]
+]:
+    return make_tokens(analyze(sentences))
+# === END ===
@@ -0,0 +1,699 @@
+"""
+Parsing with multiple worker processes.
+
+Each worker process loads its own parser (and tokenizer) once,
+    and parses the chunks of sentences sent from the main process.
+The results are gathered in the input order.
+
+Workers can also be given a time limit per sentence
+    (see `iter_parse_doc_ABCT_with_timeout`).
+
+Tokenization alone can also be done by worker processes
+    (see `iter_tag_chunks`), 
+    so that it overlaps with parsing in the main process.
+"""
+
+import typing
+import collections
+import functools
+import multiprocessing
+import pathlib
+import time
+
+from . import parser
+from . import tokenizer
+from . import stats
+
+_worker_options: typing.Dict[str, typing.Any] = {}
+
+"""
+The time limit in seconds of starting a worker process,
+    including loading the model.
+"""
+WORKER_START_TIMEOUT: float = 600.0
+
+class WorkerError(RuntimeError):
+    """
+    Raised when a worker process fails to start, e.g. to load the model.
+    """
+# === END CLASS ===
+
+_init_error: typing.Optional[str] = None
+
+def _catching_init_error(init: typing.Callable[..., None]) -> typing.Callable[..., None]:
+    """
+    Make an initializer of worker processes record its failure
+        instead of raising it,
+        which would make the pool respawn the worker again and again.
+    The failure is raised by `_check_worker` in the tasks of the worker.
+    """
+    @functools.wraps(init)
+    def wrapper(*args, **kwargs) -> None:
+        global _init_error
+
+        try:
+            init(*args, **kwargs)
+        except Exception as e:
+            _init_error = f"{type(e).__name__}: {e}"
+        # === END TRY ===
+    # === END ===
+
+    return wrapper
+# === END ===
+
+def _check_worker() -> None:
+    """
+    Raise the failure of the initializer of this worker process, if any.
+    """
+    if _init_error is not None:
+        raise WorkerError(f"a worker process failed to start: {_init_error}")
+    # === END IF ===
+# === END ===
+
+def _wait_started(result: "multiprocessing.pool.AsyncResult") -> None:
+    """
+    Wait for `_check_worker` run in a pool,
+        which is done once a worker process has started.
+
+    Raises
+    ------
+    WorkerError
+        If the worker process failed to start 
+            or did not start within `WORKER_START_TIMEOUT` seconds.
+    """
+    try:
+        result.get(WORKER_START_TIMEOUT)
+    except multiprocessing.TimeoutError:
+        raise WorkerError(
+            "no worker process started "
+            f"within {WORKER_START_TIMEOUT:.0f} seconds"
+        )
+    # === END TRY ===
+# === END ===
+
+@_catching_init_error
+def _init_worker(
+    model_path: typing.Union[str, pathlib.Path],
+    is_to_tokenize: bool,
+    batchsize: int,
+    cache: typing.Optional["cache.ParseCache"],
+    kwargs: typing.Dict[str, typing.Any],
+    is_to_collect_stats: bool = False,
+    known_cats: typing.Optional[typing.Sequence[str]] = None,
+) -> None:
+    """
+    Load the parser and the tokenizer into a fresh worker process,
+        and warm its cache of category translations with `known_cats`
+        (see `parser.warm_cat_translation_cache`).
+    """
+    if is_to_collect_stats:
+        stats.enable()
+    # === END IF ===
+
+    if known_cats:
+        parser.warm_cat_translation_cache(known_cats)
+    # === END IF ===
+
+    try:
+        import torch
+    except ImportError:
+        pass
+    else:
+        # Workers already saturate the CPU cores;
+        #   threading within each worker only oversubscribes them.
+        torch.set_num_threads(1)
+    # === END TRY ===
+
+    _worker_options.update(
+        model_path = model_path,
+        is_to_tokenize = is_to_tokenize,
+        batchsize = batchsize,
+        cache = cache,
+        **kwargs
+    )
+
+    parser.load_parser(model_path, kwargs.get("parser_options"))
+
+    if is_to_tokenize:
+        with stats.timed("load_tokenizer"):
+            tokenizer.tokenizer = tokenizer.generate_tokenizer()
+        # === END WITH ===
+    # === END IF ===
+# === END ===
+
+def _parse_chunk_ABCT(
+    start_ID: int,
+    sentences: typing.List[str],
+    fallback: typing.Optional[str] = None,
+) -> typing.Tuple[str, typing.Optional[dict]]:
+    """
+    Returns
+    -------
+    abct : str
+        The parsed trees in the ABC Treebank format.
+    popped_stats : dict, optional
+        The statistics collected since the last chunk, if any
+            (see `stats.Stats.pop`).
+    """
+    _check_worker()
+
+    parsed_trees, doc_tagged = parser.parse_sentences(
+        sentences,
+        **_worker_options
+    )
+
+    # Trees of depccg are not picklable.
+    # They are thus printed within the worker.
+    abct = parser.print_batch_parsed_ABCT(
+        parsed_trees, doc_tagged, start_ID, fallback = fallback
+    )
+
+    return abct, (stats.collector.pop() if stats.collector else None)
+# === END ===
+
+def _parse_chunk(
+    sentences: typing.List[str],
+) -> typing.Tuple[
+    typing.Tuple[
+        typing.List[typing.List[typing.Tuple[dict, float]]],
+        typing.List[typing.Iterable[typing.Any]]
+    ],
+    typing.Optional[dict]
+]:
+    """
+    Returns
+    -------
+    parsed_json_and_doc_tagged : tuple
+        The n-best trees of each sentence in the JSON format of depccg
+            with their probabilities, and the tokens of the sentences.
+    popped_stats : dict, optional
+        The statistics collected since the last chunk, if any
+            (see `stats.Stats.pop`).
+    """
+    _check_worker()
+
+    parsed_trees, doc_tagged = parser.parse_sentences(
+        sentences,
+        **_worker_options
+    )
+
+    # Trees of depccg are not picklable.
+    # They are thus sent in JSON, as they are cached.
+    parsed_json = [
+        [(tree.json(tokens = tokens), prob) for tree, prob in parsed]
+        for parsed, tokens in zip(parsed_trees, doc_tagged)
+    ]
+
+    return (
+        (parsed_json, doc_tagged),
+        (stats.collector.pop() if stats.collector else None)
+    )
+# === END ===
+
+def _iter_pool(
+    tasks: typing.Iterable[typing.Tuple[typing.Callable, tuple]],
+    workers: int,
+    initargs: tuple,
+) -> typing.Iterator[typing.Any]:
+    """
+    Run tasks on a pool of worker processes 
+        and yield their results in the order of the tasks.
+
+    At most two tasks per worker are pending at a time,
+        so that the input is not read up in advance.
+    """
+    max_pending = 2 * workers
+
+    # Forking a process that has loaded torch may deadlock.
+    context = multiprocessing.get_context("spawn")
+
+    with context.Pool(
+        processes = workers,
+        initializer = _init_worker,
+        initargs = initargs,
+    ) as pool:
+        _wait_started(pool.apply_async(_check_worker))
+
+        pending: typing.Deque[multiprocessing.pool.AsyncResult] = (
+            collections.deque()
+        )
+
+        for func, args in tasks:
+            pending.append(pool.apply_async(func, args))
+
+            if len(pending) >= max_pending:
+                yield _collect(pending.popleft())
+            # === END IF ===
+        # === END FOR ===
+
+        while pending:
+            yield _collect(pending.popleft())
+        # === END WHILE ===
+    # === END WITH pool ===
+# === END ===
+
+def iter_parse_doc_ABCT(
+    doc: typing.Iterable[str],
+    model_path: typing.Union[str, pathlib.Path] = None, 
+    is_to_tokenize: bool = False,
+    batchsize: int = 16,
+    max_in_flight: typing.Optional[int] = None,
+    workers: int = 2,
+    start_ID: int = 1,
+    cache: typing.Optional["cache.ParseCache"] = None,
+    fallback: typing.Optional[str] = None,
+    known_cats: typing.Optional[typing.Sequence[str]] = None,
+    **kwargs
+) -> typing.Iterator[str]:
+    """
+    Parse a document with multiple worker processes
+        and print the results in the ABC Treebank format.
+
+    The document is split into chunks of `max_in_flight` sentences.
+    At most two chunks per worker are pending at a time,
+        so that the input is not read up in advance.
+
+    Parameters
+    ----------
+    See `parser.iter_parse_doc_ABCT`.
+
+    Yields
+    ------
+    abct : str
+        The parsed trees of a chunk, in the input order.
+    """
+    chunk_size = parser.get_chunk_size(
+        batchsize, max_in_flight, kwargs.get("sort_by_length", False)
+    )
+
+    def iter_tasks() -> typing.Iterator[typing.Tuple[typing.Callable, tuple]]:
+        ID = start_ID
+        for chunk in parser.iter_chunks(parser._strip_doc(doc), chunk_size):
+            yield _parse_chunk_ABCT, (ID, chunk, fallback)
+            ID += len(chunk)
+        # === END FOR chunk ===
+    # === END ===
+
+    yield from _iter_pool(
+        iter_tasks(),
+        workers,
+        # Each worker reopens the cache.
+        (
+            model_path, is_to_tokenize, batchsize, cache, kwargs,
+            stats.collector is not None, known_cats
+        ),
+    )
+# === END ===
+
+def parse_doc(
+    doc: typing.Iterable[str],
+    model_path: typing.Union[str, pathlib.Path] = None, 
+    is_to_tokenize: bool = False,
+    batchsize: int = 16,
+    workers: int = 2,
+    cache: typing.Optional["cache.ParseCache"] = None,
+    **kwargs
+) -> typing.Tuple["parsed_trees", typing.List[typing.Iterable[typing.Any]]]:
+    """
+    Parse a document with multiple worker processes.
+
+    The document is split into chunks of `batchsize` sentences
+        (or `parser.SORT_WINDOW_BATCHES` batches if sorting by length),
+        which are distributed over the workers.
+    Trees are sent back from the workers in JSON
+        and restored as `cache.CachedTree`,
+        which can only be printed in the ABC Treebank format or in JSON
+        (see `parser.parse_doc`).
+
+    Parameters
+    ----------
+    See `parser.parse_doc`.
+
+    Returns
+    -------
+    parsed_trees_and_doc_tagged : tuple
+        The n-best trees of the sentences and their tokens,
+            in the input order, as the result of `parser.parse_doc`.
+    """
+    from .cache import CachedTree
+
+    chunk_size = parser.get_chunk_size(
+        batchsize, None, kwargs.get("sort_by_length", False)
+    )
+
+    parsed_trees = []
+    doc_tagged = []
+
+    for parsed_json, chunk_tagged in _iter_pool(
+        (
+            (_parse_chunk, (chunk, ))
+            for chunk in parser.iter_chunks(parser._strip_doc(doc), chunk_size)
+        ),
+        workers,
+        (
+            model_path, is_to_tokenize, batchsize, cache, kwargs,
+            stats.collector is not None
+        ),
+    ):
+        parsed_trees.extend(
+            [(CachedTree(tree_json), prob) for tree_json, prob in parsed]
+            for parsed in parsed_json
+        )
+        doc_tagged.extend(chunk_tagged)
+    # === END FOR ===
+
+    return parsed_trees, doc_tagged
+# === END ===
+
+def _collect(result: "multiprocessing.pool.AsyncResult") -> typing.Any:
+    """
+    Get the result of `_parse_chunk_ABCT` or `_parse_chunk`,
+        merging the statistics of the worker.
+    """
+    res, popped_stats = result.get()
+
+    if popped_stats and stats.collector:
+        stats.collector.merge(popped_stats)
+    # === END IF ===
+
+    return res
+# === END ===
+
+class _Slot:
+    """
+    A worker process that can be killed and replaced
+        when it runs over its time limit.
+
+    Attributes
+    ----------
+    task : tuple of (int, list of str, bool), optional
+        The task being worked on, if any:
+            the ID of the first sentence, the sentences,
+            and whether they are retried one by one.
+    deadline : float
+        The time limit of the task in terms of `time.monotonic`.
+    """
+
+    def __init__(self, context, initargs: tuple):
+        self.context = context
+        self.initargs = initargs
+        self.task: typing.Optional[typing.Tuple[int, typing.List[str], bool]] = None
+        self.result: typing.Optional[multiprocessing.pool.AsyncResult] = None
+        self.deadline = 0.0
+        self._start()
+    # === END ===
+
+    def _start(self) -> None:
+        self.pool = self.context.Pool(
+            processes = 1,
+            initializer = _init_worker,
+            initargs = self.initargs,
+        )
+        # Resolved once the model is loaded.
+        self.ready = self.pool.apply_async(_check_worker)
+    # === END ===
+
+    def submit(
+        self,
+        task: typing.Tuple[int, typing.List[str], bool],
+        time_limit: float,
+        fallback: typing.Optional[str],
+    ) -> None:
+        # Loading the model does not count toward the time limit.
+        _wait_started(self.ready)
+
+        start_ID, sentences, _ = task
+        self.task = task
+        self.result = self.pool.apply_async(
+            _parse_chunk_ABCT, (start_ID, sentences, fallback)
+        )
+        self.deadline = time.monotonic() + time_limit
+    # === END ===
+
+    def restart(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
+        self.task = None
+        self.result = None
+        self._start()
+    # === END ===
+
+    def close(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
+    # === END ===
+# === END CLASS ===
+
+"""
+The interval in seconds at which workers are checked for their time limits.
+"""
+_POLL_INTERVAL: float = 0.05
+
+def _get_fallback_words(sentence: str, is_to_tokenize: bool) -> typing.List[str]:
+    """
+    Get the words of a sentence given up on, as it would have been parsed.
+
+    Raw sentences are tokenized as in the workers,
+        the tokenizer being loaded into this process
+        on the first sentence given up on.
+    """
+    if is_to_tokenize:
+        (tokens, ) = tokenizer.analyze((sentence.split(" "), ))
+        return [fields[0] for fields in tokens]
+    else:
+        return sentence.split(" ")
+    # === END IF ===
+# === END ===
+
+def iter_parse_doc_ABCT_with_timeout(
+    doc: typing.Iterable[str],
+    model_path: typing.Union[str, pathlib.Path] = None, 
+    is_to_tokenize: bool = False,
+    batchsize: int = 16,
+    max_in_flight: typing.Optional[int] = None,
+    workers: int = 1,
+    start_ID: int = 1,
+    cache: typing.Optional["cache.ParseCache"] = None,
+    sentence_timeout: float = 60.0,
+    fallback: typing.Optional[str] = None,
+    known_cats: typing.Optional[typing.Sequence[str]] = None,
+    **kwargs
+) -> typing.Iterator[str]:
+    """
+    Parse a document with worker processes 
+        under a time limit per sentence,
+        and print the results in the ABC Treebank format.
+
+    A chunk of sentences, parsed in batches, is allowed 
+        `sentence_timeout` seconds per sentence in total,
+        so that chunks of healthy sentences keep their batching
+        and their workers however long they take as a whole.
+    If a chunk runs over, its worker is killed and replaced,
+        and its sentences are parsed again one by one,
+        each within `sentence_timeout` seconds.
+    A sentence that still runs over is logged 
+        and printed as `fallback` (see `parser.print_fallback_ABCT`).
+
+    Parameters
+    ----------
+    workers : int
+        The number of worker processes. 
+        A single worker still keeps the main process responsive.
+    sentence_timeout : float
+        The time limit per sentence in seconds.
+    fallback : str, optional
+        How to print sentences that are given up on.
+    Others
+        See `parser.iter_parse_doc_ABCT`.
+
+    Yields
+    ------
+    abct : str
+        The parsed trees of a chunk or a sentence, in the input order.
+    """
+    chunk_size = parser.get_chunk_size(
+        batchsize, max_in_flight, kwargs.get("sort_by_length", False)
+    )
+    max_pending = 2 * workers
+
+    context = multiprocessing.get_context("spawn")
+    initargs = (
+        model_path, is_to_tokenize, batchsize, cache, kwargs,
+        stats.collector is not None, known_cats
+    )
+
+    chunks = parser.iter_chunks(parser._strip_doc(doc), chunk_size)
+    is_exhausted = False
+    ID = start_ID
+    
+    # Tasks to be submitted
+    todo: typing.Deque[typing.Tuple[int, typing.List[str], bool]] = (
+        collections.deque()
+    )
+    # Results not yet yielded, by the ID of their first sentences,
+    #   with the numbers of their sentences
+    done: typing.Dict[int, typing.Tuple[str, int]] = {}
+    next_ID = start_ID
+
+    slots = [_Slot(context, initargs) for _ in range(workers)]
+
+    try:
+        while True:
+            while not is_exhausted and len(todo) + len(done) < max_pending:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    is_exhausted = True
+                else:
+                    todo.append((ID, chunk, False))
+                    ID += len(chunk)
+                # === END IF ===
+            # === END WHILE ===
+
+            for slot in slots:
+                if slot.task is None and todo:
+                    task = todo.popleft()
+                    slot.submit(
+                        task, sentence_timeout * len(task[1]), fallback
+                    )
+                # === END IF ===
+            # === END FOR slot ===
+
+            busy = [slot for slot in slots if slot.task is not None]
+            if not busy:
+                # Nothing left
+                break
+            # === END IF ===
+
+            busy[0].result.wait(_POLL_INTERVAL)
+            now = time.monotonic()
+
+            for slot in busy:
+                task_ID, sentences, is_retried = slot.task
+
+                if slot.result.ready():
+                    done[task_ID] = (_collect(slot.result), len(sentences))
+                    slot.task = None
+                elif now >= slot.deadline:
+                    slot.restart()
+
+                    if is_retried or len(sentences) == 1:
+                        parser.logger.warning(
+                            "sentence %d: timed out after %.1f s",
+                            task_ID, sentence_timeout
+                        )
+                        done[task_ID] = (
+                            parser.print_fallback_ABCT(
+                                _get_fallback_words(
+                                    sentences[0], is_to_tokenize
+                                ),
+                                task_ID, "timeout", fallback
+                            ),
+                            1
+                        )
+                    else:
+                        parser.logger.warning(
+                            "sentences %d-%d: timed out; retrying one by one",
+                            task_ID, task_ID + len(sentences) - 1
+                        )
+                        todo.extendleft(
+                            (task_ID + i, [sentence], True)
+                            for i, sentence 
+                            in reversed(tuple(enumerate(sentences)))
+                        )
+                    # === END IF ===
+                # === END IF ===
+            # === END FOR slot ===
+
+            while next_ID in done:
+                abct, n_sentences = done.pop(next_ID)
+                yield abct
+                next_ID += n_sentences
+            # === END WHILE ===
+        # === END WHILE ===
+    finally:
+        for slot in slots:
+            slot.close()
+        # === END FOR ===
+    # === END TRY ===
+# === END ===
+
+@_catching_init_error
+def _init_tokenize_worker() -> None:
+    """
+    Load the tokenizer, with the cached ABC user dictionary, 
+        into a fresh worker process.
+    """
+    tokenizer.tokenizer = tokenizer.generate_tokenizer()
+# === END ===
+
+def _analyze_chunk(
+    sentences: typing.List[str],
+) -> typing.List[typing.List[typing.Tuple[str, ...]]]:
+    _check_worker()
+    return tokenizer.analyze(sent.split(' ') for sent in sentences)
+# === END ===
+
+def iter_tag_chunks(
+    chunks: typing.Iterable[typing.List[str]],
+    workers: int = 2,
+    max_pending: typing.Optional[int] = None,
+) -> typing.Iterator[
+    typing.Tuple[
+        typing.List[typing.List["depccg.tokens.Token"]],
+        typing.List[typing.List[str]]
+    ]
+]:
+    """
+    Tokenize chunks of sentences with janome in worker processes.
+
+    Chunks are sent to the workers ahead of the consumer
+        of this generator, at most `max_pending` chunks at a time,
+        so that tokenization overlaps with 
+        whatever the consumer does (e.g. parsing)
+        while the memory stays bounded.
+
+    Parameters
+    ----------
+    chunks : iterable of list of str
+        Chunks of stripped, non-empty sentences.
+    workers : int
+        The number of worker processes.
+    max_pending : int, optional
+        The maximum number of chunks sent to the workers
+            and not yet consumed.
+        Defaults to twice the number of workers.
+
+    Yields
+    ------
+    doc_tagged_and_doc_tokenized : tuple
+        The tagged tokens and the tokenized sentences of a chunk, 
+            in the input order, as the result of `parser.tag_sentences`.
+    """
+    max_pending = max_pending or 2 * workers
+    context = multiprocessing.get_context("spawn")
+
+    with context.Pool(
+        processes = workers,
+        initializer = _init_tokenize_worker,
+    ) as pool:
+        _wait_started(pool.apply_async(_check_worker))
+
+        pending: typing.Deque[multiprocessing.pool.AsyncResult] = (
+            collections.deque()
+        )
+
+        for chunk in chunks:
+            pending.append(pool.apply_async(_analyze_chunk, (chunk, )))
+
+            if len(pending) >= max_pending:
+                # Tokens of depccg are made here,
+                #   sparing their pickling.
+                yield tokenizer.make_tokens(pending.popleft().get())
+            # === END IF ===
+        # === END FOR chunk ===
+
+        while pending:
+            yield tokenizer.make_tokens(pending.popleft().get())
+        # === END WHILE ===
+    # === END WITH pool ===
+# === END ===
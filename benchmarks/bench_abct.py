@@ -0,0 +1,168 @@
+"""
+Benchmark of the ABCT tree writer.
+
+Checks that `parser.dump_tree_ABCT` produces byte-identical output
+    to the former recursive implementation below on synthetic trees,
+    and compares their speed.
+
+Usage
+-----
+    python benchmarks/bench_abct.py [--n-trees N] [--seed SEED]
+"""
+
+import typing
+import argparse
+import io
+import os
+import random
+import time
+
+from abc_depccg_parser import parser
+
+CATS_LEAF: typing.Tuple[str, ...] = (
+    "NP", "N", "PP[s]\\NP", "PP[o1]\\NP", "S[m]\\S[a]",
+    "(S[m]\\PP[s])\\PP[o1]", "NP/NP", "(S[a]\\PP[s])\\NP",
+    "S[m]/S[m]", "CP[f]\\S[m]",
+)
+CATS_NODE: typing.Tuple[str, ...] = (
+    "S[m]", "S[a]", "S[m]\\PP[s]", "NP", "PP[s]", "(S[m]\\PP[s])\\PP[o1]",
+)
+
+def dump_tree_ABCT_reference(tree: dict, stream: typing.TextIO) -> None:
+    """
+    The former implementation: one recursion and several writes per node.
+    """
+    cat = parser.parse_cat_translate_TLG(tree["cat"])
+
+    if "children" in tree.keys():
+        stream.write(f"({cat}")
+
+        for child in tree["children"]:
+            stream.write(" ")
+            dump_tree_ABCT_reference(child, stream)
+        # === END FOR child ===
+
+        stream.write(")")
+    else:
+        if "surf" in tree:
+            stream.write(
+                f"({cat} {tree['surf']})"
+            )
+        elif "word" in tree:
+            stream.write(
+                f"({cat} {tree['word']})"
+            )
+        else:
+            stream.write(
+                f"({cat} ERROR)"
+            )
+    # === END IF ===
+# === END ===
+
+def random_tree(
+    rng: random.Random,
+    n_tokens: int,
+    right_branching: float = 0.8
+) -> dict:
+    """
+    Generate a random binary tree in the JSON format of depccg.
+    Japanese trees are mostly right-branching.
+    """
+    if n_tokens == 1:
+        leaf = {"type": "LEAF", "cat": rng.choice(CATS_LEAF)}
+        if rng.random() < 0.9:
+            leaf["surf"] = rng.choice("猫犬がをにはた") * rng.randint(1, 3)
+        elif rng.random() < 0.5:
+            leaf["word"] = "語"
+        # === END IF ===
+        return leaf
+    # === END IF ===
+
+    if rng.random() < right_branching:
+        n_left = 1
+    else:
+        n_left = rng.randint(1, n_tokens - 1)
+    # === END IF ===
+
+    return {
+        "type": rng.choice(("<", ">", "<B1", "<B2")),
+        "cat": rng.choice(CATS_NODE),
+        "children": [
+            random_tree(rng, n_left, right_branching),
+            random_tree(rng, n_tokens - n_left, right_branching),
+        ]
+    }
+# === END ===
+
+def wrap(tree: dict, ID: int) -> dict:
+    return {
+        "type": "ROOT",
+        "cat": "TOP",
+        "children": [
+            {"cat": "COMMENT", "surf": "{probability=-1.0}"},
+            tree,
+            {"cat": "ID", "surf": str(ID)},
+        ]
+    }
+# === END ===
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description = __doc__.split("\n\n")[0])
+    argparser.add_argument("--n-trees", type = int, default = 2000)
+    argparser.add_argument("--seed", type = int, default = 0)
+    args = argparser.parse_args()
+
+    rng = random.Random(args.seed)
+    trees = [
+        wrap(random_tree(rng, min(int(rng.expovariate(1 / 25)) + 1, 250)), i)
+        for i in range(args.n_trees)
+    ]
+    # The longest sentences that the parser accepts
+    trees.append(wrap(random_tree(rng, 250, right_branching = 1.0), 0))
+
+    for tree in trees:
+        with io.StringIO() as sf:
+            dump_tree_ABCT_reference(tree, sf)
+            expected = sf.getvalue()
+        # === END WITH ===
+
+        with io.StringIO() as sf:
+            parser.dump_tree_ABCT(tree, sf)
+            assert sf.getvalue() == expected
+        # === END WITH ===
+
+        with io.BytesIO() as bf:
+            parser.dump_tree_ABCT(tree, bf)
+            assert bf.getvalue() == expected.encode("utf-8")
+        # === END WITH ===
+    # === END FOR tree ===
+    print(f"output check: {len(trees)} trees identical (text and binary)")
+
+    for label, func in (
+        ("recursive", dump_tree_ABCT_reference),
+        ("iterative", parser.dump_tree_ABCT),
+    ):
+        # A file stream, like STDOUT redirected to a file
+        with open(os.devnull, "w", encoding = "utf-8") as f:
+            start = time.perf_counter()
+            for tree in trees:
+                func(tree, f)
+            # === END FOR ===
+            t = time.perf_counter() - start
+        # === END WITH ===
+        print(f"{label:>10}: {t * 1000:8.1f} ms")
+    # === END FOR ===
+
+    with open(os.devnull, "wb") as f:
+        start = time.perf_counter()
+        for tree in trees:
+            parser.dump_tree_ABCT(tree, f)
+        # === END FOR ===
+        t = time.perf_counter() - start
+    # === END WITH ===
+    print(f"{'binary':>10}: {t * 1000:8.1f} ms")
+# === END ===
+
+if __name__ == "__main__":
+    main()
+# === END IF ===
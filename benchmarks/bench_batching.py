@@ -0,0 +1,184 @@
+"""
+Benchmark of length-bucketed batching.
+
+The supertagger pads every sentence in a batch to the longest one,
+    so the work of a batch is proportional to
+    its size times the length of its longest sentence.
+This script draws sentence lengths from a log-normal distribution
+    (a typical shape of corpus sentence lengths)
+    and reports the padded work and its overhead over the real tokens
+    for batching in the input order
+    and for batching after sorting within windows of the input
+    (`parser.parse_sentences(..., sort_by_length = True)`),
+    together with the largest padded batch, which bounds the peak memory,
+    both for batches of `--batchsize` sentences
+    and for batches filled up to `--max-tokens-per-batch` words.
+
+With `--model`, it also parses the synthetic sentences with a real model
+    and reports the throughput of both orders.
+
+Usage
+-----
+    python benchmarks/bench_batching.py [--n-sents N] [--batchsize B]
+        [--max-tokens-per-batch T] [--window W] [--seed SEED]
+        [--model MODEL_DIR]
+"""
+
+import typing
+import argparse
+import math
+import random
+import time
+
+from abc_depccg_parser import parser
+
+def random_lengths(
+    rng: random.Random,
+    n_sents: int,
+    mean: float = 25,
+    max_length: int = 250,
+) -> typing.List[int]:
+    """
+    Draw sentence lengths from a log-normal distribution
+        whose mean is about `mean`.
+    """
+    sigma = 0.6
+    mu = math.log(mean) - sigma ** 2 / 2
+
+    return [
+        min(max(int(rng.lognormvariate(mu, sigma)), 1), max_length)
+        for _ in range(n_sents)
+    ]
+# === END ===
+
+def padded_work(
+    lengths: typing.Sequence[int],
+    batchsize: int,
+    window: typing.Optional[int] = None,
+    max_tokens: typing.Optional[int] = None,
+) -> typing.Tuple[int, int]:
+    """
+    Count the padded tokens of batches,
+        sorting the lengths within windows if `window` is given
+        and filling batches up to `max_tokens` if given.
+
+    Returns
+    -------
+    work : int
+        The total padded tokens.
+    peak : int
+        The padded tokens of the largest batch.
+    """
+    work = 0
+    peak = 0
+    chunk_size = window or batchsize
+
+    for chunk in parser.iter_chunks(lengths, chunk_size):
+        if window:
+            chunk = sorted(chunk)
+        # === END IF ===
+
+        if max_tokens:
+            # Lengths stand in for sentences of as many words.
+            batches = parser.iter_token_batches(
+                [("w", ) * n for n in chunk], max_tokens
+            )
+            batches = ([len(sent) for sent in batch] for batch in batches)
+        else:
+            batches = parser.iter_chunks(chunk, batchsize)
+        # === END IF ===
+
+        for batch in batches:
+            size = len(batch) * max(batch)
+            work += size
+            peak = max(peak, size)
+        # === END FOR batch ===
+    # === END FOR chunk ===
+
+    return work, peak
+# === END ===
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description = __doc__.split("\n\n")[0])
+    argparser.add_argument("--n-sents", type = int, default = 10000)
+    argparser.add_argument("--batchsize", type = int, default = 16)
+    argparser.add_argument("--max-tokens-per-batch", type = int, default = 400)
+    argparser.add_argument(
+        "--window", type = int, default = None,
+        help = "the number of sentences sorted at a time "
+        "(default: SORT_WINDOW_BATCHES batches)"
+    )
+    argparser.add_argument("--seed", type = int, default = 0)
+    argparser.add_argument("--model", default = None)
+    args = argparser.parse_args()
+
+    window = args.window or parser.get_chunk_size(
+        args.batchsize, sort_by_length = True
+    )
+
+    rng = random.Random(args.seed)
+    lengths = random_lengths(rng, args.n_sents)
+    n_tokens = sum(lengths)
+    print(
+        f"{len(lengths)} sentences, {n_tokens} tokens, "
+        f"batch size {args.batchsize}, window {window}, "
+        f"token budget {args.max_tokens_per_batch}"
+    )
+
+    for label, w, max_tokens in (
+        ("in order", None, None),
+        ("sorted", window, None),
+        ("budget", None, args.max_tokens_per_batch),
+        ("budget+sorted", window, args.max_tokens_per_batch),
+    ):
+        work, peak = padded_work(lengths, args.batchsize, w, max_tokens)
+        print(
+            f"{label:>13}: {work:9d} padded tokens "
+            f"(overhead {work / n_tokens - 1:6.1%}), "
+            f"largest batch {peak:5d}"
+        )
+    # === END FOR ===
+
+    if args.model is None:
+        return
+    # === END IF ===
+
+    sentences = [
+        " ".join(rng.choice("猫 犬 が を に は 見 た".split()) for _ in range(n))
+        for n in lengths
+    ]
+
+    # Load the model before timing.
+    parser.parse_sentences(
+        sentences[:1], args.model,
+        is_to_tokenize = False, batchsize = args.batchsize
+    )
+
+    for label, sort_by_length, max_tokens in (
+        ("in order", False, None),
+        ("sorted", True, None),
+        ("budget", False, args.max_tokens_per_batch),
+        ("budget+sorted", True, args.max_tokens_per_batch),
+    ):
+        start = time.perf_counter()
+        for _ in parser.iter_parse_doc(
+            sentences, args.model,
+            is_to_tokenize = False,
+            batchsize = args.batchsize,
+            max_in_flight = window,
+            sort_by_length = sort_by_length,
+            max_tokens_per_batch = max_tokens,
+        ):
+            pass
+        # === END FOR ===
+        t = time.perf_counter() - start
+        print(
+            f"{label:>13}: {t:8.2f} s "
+            f"({len(sentences) / t:7.1f} sents/s, {n_tokens / t:8.1f} tokens/s)"
+        )
+    # === END FOR ===
+# === END ===
+
+if __name__ == "__main__":
+    main()
+# === END IF ===
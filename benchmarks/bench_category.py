@@ -0,0 +1,85 @@
+"""
+Benchmark of the category parser.
+
+Generates random depccg categories
+    and compares the speed of the hand-written parser (`category.parse`)
+    with that of the parsy reference implementation (`parser.parse_cat_parsy`).
+Their agreement is tested in tests/test_category.py.
+
+Usage
+-----
+    python benchmarks/bench_category.py [--n-cats N] [--seed SEED]
+"""
+
+import typing
+import argparse
+import random
+import time
+
+from abc_depccg_parser import parser
+from abc_depccg_parser import category
+
+BASE_CATS: typing.Tuple[str, ...] = (
+    "S[m]", "S[a]", "S[p]", "S[imp]", "NP", "N", "PP[s]", "PP[o1]",
+    "PP[o2]", "CP[f]", "CP[t]", "FRAG", "INTJP", "LST", "CP-EXL",
+    "NUM", "S[sbj]", "S[adv]",
+)
+
+def random_cat(rng: random.Random, depth: int = 0) -> str:
+    """
+    Generate a random depccg category,
+        including long functor chains such as the results of <B4.
+    """
+    if depth > 2 or rng.random() < 0.2 + depth * 0.3:
+        return rng.choice(BASE_CATS)
+    # === END IF ===
+
+    res = random_cat(rng, depth + 1)
+    for _ in range(rng.randint(1, 5 - depth)):
+        arg = random_cat(rng, depth + 1)
+        if "/" in arg or "\\" in arg:
+            arg = f"({arg})"
+        # === END IF ===
+        res = res + rng.choice("/\\") + arg
+    # === END FOR ===
+
+    if depth and rng.random() < 0.5:
+        res = f"({res})"
+    # === END IF ===
+
+    return res
+# === END ===
+
+def _time(func, cats: typing.List[str]) -> float:
+    start = time.perf_counter()
+    for cat in cats:
+        func(cat)
+    # === END FOR ===
+    return time.perf_counter() - start
+# === END ===
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description = __doc__.split("\n\n")[0])
+    argparser.add_argument("--n-cats", type = int, default = 5000)
+    argparser.add_argument("--seed", type = int, default = 0)
+    args = argparser.parse_args()
+
+    rng = random.Random(args.seed)
+    cats = [random_cat(rng) for _ in range(args.n_cats)]
+
+    n_chars = sum(map(len, cats))
+    for label, func in (
+        ("parsy", lambda c: parser.translate_cat_TLG(parser.parse_cat_parsy(c))),
+        ("hand-written", lambda c: category.translate_TLG(category.parse(c))),
+    ):
+        t = _time(func, cats)
+        print(
+            f"{label:>12}: {t * 1000:8.1f} ms "
+            f"({n_chars / t / 1e6:.2f} M chars/s)"
+        )
+    # === END FOR ===
+# === END ===
+
+if __name__ == "__main__":
+    main()
+# === END IF ===
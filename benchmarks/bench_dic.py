@@ -0,0 +1,176 @@
+"""
+Benchmark of the collection of atomic morphemes in `dic._gen_abc_dic`.
+
+Compares the single-pass collection (`dic._collect_morphemes`)
+    with the reference implementation below,
+    which scans the system dictionary once per morpheme,
+    and checks that both generate the same custom entries.
+
+Usage
+-----
+    python benchmarks/bench_dic.py [--repeat N]
+
+Requires the package to be installed (e.g. `pip install -e .`)
+    and janome < 0.4, whose system dictionary exposes its entries.
+"""
+
+import typing
+import argparse
+import re
+import time
+import contextlib
+
+import janome.tokenizer as jt
+
+from abc_depccg_parser import dic
+from abc_depccg_parser.dic import JanomeLexEntry
+
+def collect_morphemes_reference(
+    sysdic: typing.Iterable[typing.Iterable[typing.Any]]
+) -> typing.Dict[str, typing.Tuple[JanomeLexEntry]]:
+    """
+    The former implementation: one scan of `sysdic` per morpheme.
+    """
+    morphemes: typing.Dict[str, typing.Tuple[JanomeLexEntry]] = {
+        # -- はず（名詞，非自立）
+        "hazu": tuple(
+            JanomeLexEntry(*e)
+            for e in sysdic
+            if re.match(r"^(はず|ハズ|筈)$", e[7]) and re.match(r"名詞,非自立", e[4])
+        ),
+        # -- か（終助詞）
+        "ka": tuple(
+            JanomeLexEntry(*e)
+            for e in sysdic
+            if re.match(r"^か$", e[7])
+        ),
+        # -- ない（形容詞）
+        "nai_adj": tuple(
+            JanomeLexEntry(*e) 
+            for e in sysdic
+            if re.match(r"^(ない|無い)$", e[7]) and re.match(r"形容詞", e[4])
+        ),
+        # -- ない（助動詞）
+        # -- ん（助動詞）
+        # -- ぬ（否定助動詞）
+        "nai_aux": tuple(
+            JanomeLexEntry(*e)
+            for e in sysdic
+            if (
+                re.match(r"^ん$", e[7]) 
+                or (re.match(r"^ない$", e[7]) and re.match(r"助動詞", e[4]))
+                or (re.match(r"^ぬ$", e[7]) and re.match(r"特殊・ヌ", e[5]))
+            )
+        ),
+        # -- ます（助動詞）
+        "masu": tuple(
+            JanomeLexEntry(*e)
+            for e in sysdic
+            if re.match(r"^ます", e[7]) and re.match(r"助動詞", e[4])
+        ),
+        # -- ある（自立動詞）
+        "aru": tuple(
+            JanomeLexEntry(*e)
+            for e in sysdic
+            if re.match(r"^(ある|有る)$", e[7]) and re.match(r"動詞,自立", e[4])
+        ),
+        # -- なる（補助動詞）
+        "naru": tuple(
+            JanomeLexEntry(*e)
+            for e in sysdic
+            if re.match(r"^(なる|成る)$", e[7]) and re.match(r"動詞,非自立", e[4])
+        ),
+        # -- いく（補助動詞）
+        "iku": tuple(
+            JanomeLexEntry(*e)
+            for e in sysdic
+            if re.match(r"^(いく|行く)$", e[7]) and re.match(r"動詞,非自立", e[4])
+        ),
+        # -- いける（補助動詞）
+        "ikeru": tuple(
+            JanomeLexEntry(*e)
+            for e in sysdic
+            if re.match(r"^(いける|行ける)$", e[7]) and re.match(r"動詞,非自立", e[4])
+        ),
+        # -- て・で（接続助詞）
+        "te": tuple(
+            JanomeLexEntry(*e)
+            for e in sysdic
+            if re.match(r"^(て|で)$", e[7]) and re.match(r"助詞,接続助詞", e[4])
+        ),
+        # -- う（助動詞）
+        "u": tuple(
+            JanomeLexEntry(*e)
+            for e in sysdic
+            if re.match(r"^う$", e[7]) and re.match(r"助動詞", e[4])
+        ),
+        # -- だろ
+        # -- でしょ
+        "daro": tuple(
+            JanomeLexEntry(*e)
+            for e in sysdic
+            if re.match(r"^(だ|です)$", e[7]) and re.match(r"未然形", e[6])
+        )
+    }
+
+    return morphemes
+# === END ===
+
+@contextlib.contextmanager
+def _use_collector(collector):
+    original = dic._collect_morphemes
+    dic._collect_morphemes = collector
+    try:
+        yield
+    finally:
+        dic._collect_morphemes = original
+    # === END TRY ===
+# === END ===
+
+def _time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    # === END FOR ===
+    return best
+# === END ===
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description = __doc__.split("\n\n")[0])
+    argparser.add_argument("--repeat", type = int, default = 3)
+    args = argparser.parse_args()
+
+    sysdic = list(jt.Tokenizer().sys_dic.entries.values())
+    print(f"system dictionary: {len(sysdic)} entries")
+
+    morphemes_ref = collect_morphemes_reference(sysdic)
+    morphemes_new = dic._collect_morphemes(sysdic)
+    assert morphemes_ref == morphemes_new, "collected morphemes differ"
+
+    with _use_collector(collect_morphemes_reference):
+        entries_ref = set(dic._gen_abc_dic(sysdic))
+    # === END WITH ===
+    entries_new = set(dic._gen_abc_dic(sysdic))
+    assert entries_ref == entries_new, "generated entries differ"
+    print(f"generated entries: {len(entries_new)} (identical)")
+
+    for label, collector in (
+        ("reference", collect_morphemes_reference),
+        ("single-pass", dic._collect_morphemes),
+    ):
+        t_collect = _time(lambda: collector(sysdic), args.repeat)
+        with _use_collector(collector):
+            t_gen = _time(lambda: set(dic._gen_abc_dic(sysdic)), args.repeat)
+        # === END WITH ===
+        print(
+            f"{label:>12}: collect {t_collect * 1000:8.1f} ms, "
+            f"_gen_abc_dic {t_gen * 1000:8.1f} ms"
+        )
+    # === END FOR ===
+# === END ===
+
+if __name__ == "__main__":
+    main()
+# === END IF ===
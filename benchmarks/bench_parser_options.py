@@ -0,0 +1,126 @@
+"""
+Benchmark of parser configurations.
+
+Parses the same sentences with each configuration of the parser
+    and reports the throughput, the coverage
+    (the ratio of sentences for which a tree is found)
+    and the most frequent root categories,
+    so as to see how much accuracy is traded for speed,
+    e.g. by dropping <B3 and <B4 or lowering max_steps.
+
+Configurations are JSON files of parser options
+    (see `parser.make_parser_options`).
+Without `--config`, the presets in `PRESETS` are compared.
+
+Usage
+-----
+    python benchmarks/bench_parser_options.py --model MODEL_DIR
+        --input SENTENCES [--config JSON ...] [--tokenize]
+        [--batchsize B] [--max-sents N]
+"""
+
+import typing
+import argparse
+import collections
+import pathlib
+import time
+
+from abc_depccg_parser import parser
+
+PRESETS: typing.Dict[str, typing.Dict[str, typing.Any]] = {
+    "default": {},
+    "no <B3/<B4": {"binary_rules": [">", "<", ">B", "<B1", "<B2"]},
+    "max_steps 1e5": {"max_steps": 100000},
+    "no <B3/<B4, max_steps 1e5": {
+        "binary_rules": [">", "<", ">B", "<B1", "<B2"],
+        "max_steps": 100000,
+    },
+}
+
+def run(
+    sentences: typing.List[str],
+    model_path: str,
+    options: typing.Dict[str, typing.Any],
+    is_to_tokenize: bool,
+    batchsize: int,
+) -> typing.Tuple[float, int, typing.Counter[str]]:
+    """
+    Returns
+    -------
+    seconds : float
+        The time spent on parsing, excluding loading the parser.
+    n_parsed : int
+        The number of sentences for which a tree is found.
+    root_cats : collections.Counter of str
+        The root categories of the best trees.
+    """
+    parser.load_parser(model_path, options)
+
+    start = time.perf_counter()
+    parsed_trees, _ = parser.parse_sentences(
+        sentences,
+        model_path = model_path,
+        is_to_tokenize = is_to_tokenize,
+        batchsize = batchsize,
+        parser_options = options,
+    )
+    seconds = time.perf_counter() - start
+
+    root_cats: typing.Counter[str] = collections.Counter(
+        str(parsed[0][0].cat) for parsed in parsed_trees if parsed
+    )
+
+    return seconds, sum(root_cats.values()), root_cats
+# === END ===
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description = __doc__.split("\n\n")[0])
+    argparser.add_argument("--model", required = True)
+    argparser.add_argument("--input", required = True)
+    argparser.add_argument("--config", nargs = "*", default = None)
+    argparser.add_argument("--tokenize", action = "store_true")
+    argparser.add_argument("--batchsize", type = int, default = 32)
+    argparser.add_argument("--max-sents", type = int, default = None)
+    args = argparser.parse_args()
+
+    with open(args.input, encoding = "utf-8") as f:
+        sentences = list(parser._strip_doc(f))[:args.max_sents]
+    # === END WITH f ===
+    n_words = sum(parser.count_words(sent) for sent in sentences)
+
+    if args.config:
+        configs = {
+            pathlib.Path(path).name: parser.load_parser_config(path)
+            for path in args.config
+        }
+    else:
+        configs = PRESETS
+    # === END IF ===
+
+    print(f"{len(sentences)} sentences, {n_words} words")
+
+    for label, config in configs.items():
+        options = parser.make_parser_options(config)
+        seconds, n_parsed, root_cats = run(
+            sentences, args.model, options, args.tokenize, args.batchsize
+        )
+
+        print(
+            f"{label}: {seconds:8.2f} s "
+            f"({len(sentences) / seconds:7.1f} sents/s, "
+            f"{n_words / seconds:8.1f} words/s), "
+            f"coverage {n_parsed / len(sentences):6.1%}"
+        )
+        print(
+            "    root categories: "
+            + ", ".join(
+                f"{cat} {n / len(sentences):.1%}"
+                for cat, n in root_cats.most_common(5)
+            )
+        )
+    # === END FOR ===
+# === END ===
+
+if __name__ == "__main__":
+    main()
+# === END IF ===
@@ -0,0 +1,113 @@
+"""
+Startup-time benchmark of the command line interface.
+
+Runs `python -X importtime -m abc_depccg_parser <subcommand> --help`
+    for each subcommand and reports the total import time
+    and any heavy modules (depccg, allennlp, torch, janome, parsy)
+    imported on the way, which should be none.
+
+Usage
+-----
+    python benchmarks/bench_startup.py [--repeat N] [--max-import-ms MS]
+
+Exits with 1 if a heavy module is imported
+    or the import time exceeds `--max-import-ms`.
+"""
+
+import typing
+import argparse
+import subprocess
+import sys
+
+SUBCOMMANDS: typing.Tuple[typing.Tuple[str, ...], ...] = (
+    (),
+    ("parse", ),
+    ("dic", ),
+    ("serve", ),
+    ("client", ),
+    ("to-abct", ),
+    ("index", ),
+)
+
+HEAVY_MODULES: typing.FrozenSet[str] = frozenset(
+    ("depccg", "allennlp", "torch", "janome", "parsy", "numpy")
+)
+
+def measure(subcommand: typing.Tuple[str, ...]) -> typing.Tuple[float, typing.Set[str]]:
+    """
+    Returns
+    -------
+    import_ms : float
+        The total import time in milliseconds.
+    heavy : set of str
+        The heavy modules imported.
+    """
+    proc = subprocess.run(
+        [
+            sys.executable, "-X", "importtime",
+            "-m", "abc_depccg_parser", *subcommand, "--help"
+        ],
+        stdout = subprocess.DEVNULL,
+        stderr = subprocess.PIPE,
+        check = True,
+        universal_newlines = True,
+    )
+
+    total_us = 0
+    heavy: typing.Set[str] = set()
+
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        # === END IF ===
+
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # The header line
+            continue
+        # === END IF ===
+
+        total_us += int(fields[0])
+        module = fields[2].strip().split(".")[0]
+        if module in HEAVY_MODULES:
+            heavy.add(module)
+        # === END IF ===
+    # === END FOR line ===
+
+    return total_us / 1000, heavy
+# === END ===
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description = __doc__.split("\n\n")[0])
+    argparser.add_argument("--repeat", type = int, default = 3)
+    argparser.add_argument("--max-import-ms", type = float, default = None)
+    args = argparser.parse_args()
+
+    failed = False
+
+    for subcommand in SUBCOMMANDS:
+        results = [measure(subcommand) for _ in range(args.repeat)]
+        import_ms = min(ms for ms, _ in results)
+        heavy = set().union(*(h for _, h in results))
+
+        label = " ".join(subcommand) or "(root)"
+        print(
+            f"{label:>8}: imports {import_ms:7.1f} ms"
+            + (f", heavy modules: {', '.join(sorted(heavy))}" if heavy else "")
+        )
+
+        if heavy or (
+            args.max_import_ms is not None
+            and import_ms > args.max_import_ms
+        ):
+            failed = True
+        # === END IF ===
+    # === END FOR subcommand ===
+
+    sys.exit(1 if failed else 0)
+# === END ===
+
+if __name__ == "__main__":
+    main()
+# === END IF ===
@@ -0,0 +1,697 @@
+"""
+A benchmark suite of the hot paths of the package.
+
+Runs offline without any model:
+
+- categories and trees are synthetic
+    (see `bench_category.random_cat` and `bench_abct.random_tree`),
+- the ABC user dictionary and the tokenizer are built
+    from the janome system dictionary,
+- and depccg's parser is replaced by `StubParser`,
+    which returns synthetic trees instantly,
+    so that the batching, caching, printing and writing around it
+    are measured alone.
+    Sentences are given pre-tagged, and depccg need not be installed.
+
+Each case is run `--repeat` times and the fastest run is reported.
+Results can be written in JSON (`--output`)
+    and compared with those of another commit (`--compare`).
+
+Usage
+-----
+    python benchmarks/suite.py [--repeat N] [--scale S] [--only NAME ...]
+        [--output FILE] [--compare BASELINE_FILE] [--threshold RATIO]
+
+Exits with 1 if a case is slower than the baseline
+    by more than `--threshold` times.
+"""
+
+import typing
+import argparse
+import datetime
+import io
+import json
+import os
+import pathlib
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from abc_depccg_parser import parser
+from abc_depccg_parser import category
+from abc_depccg_parser import binary
+from abc_depccg_parser import cache
+from abc_depccg_parser import dic
+from abc_depccg_parser import index
+from abc_depccg_parser import pipeline
+from abc_depccg_parser import reader
+from abc_depccg_parser import tokenizer
+
+from bench_abct import random_tree, wrap, CATS_LEAF, CATS_NODE
+from bench_category import random_cat
+
+class StubParser:
+    """
+    A stand-in for the parser of depccg,
+        which returns a right-branching tree per sentence.
+    Trees are made once per sentence length.
+    """
+
+    def __init__(self):
+        self._trees: typing.Dict[int, cache.CachedTree] = {}
+    # === END ===
+
+    def _get_tree(self, n_words: int) -> cache.CachedTree:
+        if n_words not in self._trees:
+            tree = {"cat": CATS_LEAF[n_words % len(CATS_LEAF)], "word": "w"}
+            for i in range(n_words - 1):
+                tree = {
+                    "cat": CATS_NODE[i % len(CATS_NODE)],
+                    "children": [
+                        {"cat": CATS_LEAF[i % len(CATS_LEAF)], "word": "w"},
+                        tree
+                    ]
+                }
+            # === END FOR ===
+            self._trees[n_words] = cache.CachedTree(tree)
+        # === END IF ===
+
+        return self._trees[n_words]
+    # === END ===
+
+    def parse_doc(
+        self,
+        doc: typing.List[typing.Any],
+        batchsize: int = 16,
+    ) -> typing.List[typing.List[typing.Tuple[cache.CachedTree, float]]]:
+        return [
+            [(self._get_tree(parser.count_words(sent)), -1.0)]
+            for sent in doc
+        ]
+    # === END ===
+# === END CLASS ===
+
+def _install_stub_parser() -> None:
+    parser.parser = StubParser()
+    # The options that `parser.load_parser` expects by default
+    parser._parser_options = parser.make_parser_options()
+# === END ===
+
+def random_sentences(
+    rng: random.Random,
+    n_sents: int,
+    vocab: typing.Sequence[str],
+    duplicate_rate: float = 0.1,
+) -> typing.List[str]:
+    """
+    Generate pre-tokenized sentences of log-normal lengths,
+        some of which are repeated.
+    """
+    res: typing.List[str] = []
+
+    for _ in range(n_sents):
+        if res and rng.random() < duplicate_rate:
+            res.append(rng.choice(res))
+        else:
+            n_words = min(max(int(rng.lognormvariate(3, 0.6)), 1), 250)
+            res.append(" ".join(rng.choice(vocab) for _ in range(n_words)))
+        # === END IF ===
+    # === END FOR ===
+
+    return res
+# === END ===
+
+def _tag(sentences: typing.List[str]) -> typing.List[typing.List[dict]]:
+    """
+    Tag sentences with tokens which have surface forms only.
+    """
+    return [[{"word": word} for word in sent.split(" ")] for sent in sentences]
+# === END ===
+
+# ------
+# Cases
+# ------
+# Each case prepares its inputs and returns
+#   the function to be timed and the number of items it processes.
+
+Case = typing.Tuple[typing.Callable[[], typing.Any], int]
+
+def case_category_parse(rng: random.Random, scale: float) -> Case:
+    cats = [random_cat(rng) for _ in range(int(5000 * scale))]
+
+    def run():
+        for cat in cats:
+            category.parse(cat)
+        # === END FOR ===
+    # === END ===
+
+    return run, len(cats)
+# === END ===
+
+def case_translate_cat_TLG(rng: random.Random, scale: float) -> Case:
+    cats = [parser.parse_cat(random_cat(rng)) for _ in range(int(5000 * scale))]
+
+    def run():
+        for cat in cats:
+            parser.translate_cat_TLG(cat)
+        # === END FOR ===
+    # === END ===
+
+    return run, len(cats)
+# === END ===
+
+def case_parse_cat_translate_TLG_cold(rng: random.Random, scale: float) -> Case:
+    cats = [random_cat(rng) for _ in range(int(5000 * scale))]
+
+    def run():
+        parser.parse_cat_translate_TLG.cache_clear()
+        for cat in cats:
+            parser.parse_cat_translate_TLG(cat)
+        # === END FOR ===
+    # === END ===
+
+    return run, len(cats)
+# === END ===
+
+def case_parse_cat_translate_TLG_warm(rng: random.Random, scale: float) -> Case:
+    # As many distinct categories as a model has
+    cats_distinct = [random_cat(rng) for _ in range(500)]
+    cats = [rng.choice(cats_distinct) for _ in range(int(100000 * scale))]
+
+    def run():
+        for cat in cats:
+            parser.parse_cat_translate_TLG(cat)
+        # === END FOR ===
+    # === END ===
+
+    return run, len(cats)
+# === END ===
+
+def case_dump_tree_ABCT(rng: random.Random, scale: float) -> Case:
+    trees = [
+        wrap(random_tree(rng, min(int(rng.expovariate(1 / 25)) + 1, 250)), i)
+        for i in range(int(2000 * scale))
+    ]
+
+    def run():
+        with io.StringIO() as sf:
+            for tree in trees:
+                parser.dump_tree_ABCT(tree, sf)
+            # === END FOR ===
+        # === END WITH ===
+    # === END ===
+
+    return run, len(trees)
+# === END ===
+
+def case_dump_tree_ABCT_interned(rng: random.Random, scale: float) -> Case:
+    trees = [
+        wrap(random_tree(rng, min(int(rng.expovariate(1 / 25)) + 1, 250)), i)
+        for i in range(int(2000 * scale))
+    ]
+
+    # Shared by the runs as by the batches of a long run,
+    #   like the LRU cache of `case_dump_tree_ABCT`.
+    table = category.CategoryTable()
+
+    def run():
+        with io.StringIO() as sf:
+            for tree in trees:
+                parser.dump_tree_ABCT(tree, sf, table = table)
+            # === END FOR ===
+        # === END WITH ===
+    # === END ===
+
+    return run, len(trees)
+# === END ===
+
+def case_translate_cats(rng: random.Random, scale: float) -> Case:
+    cats_distinct = [random_cat(rng) for _ in range(500)]
+    cats = [rng.choice(cats_distinct) for _ in range(int(100000 * scale))]
+
+    def run():
+        parser.translate_cats(cats)
+    # === END ===
+
+    return run, len(cats)
+# === END ===
+
+def case_print_depccg_tree_ABCT(rng: random.Random, scale: float) -> Case:
+    trees = [
+        cache.CachedTree(
+            random_tree(rng, min(int(rng.expovariate(1 / 25)) + 1, 250))
+        )
+        for _ in range(int(2000 * scale))
+    ]
+
+    def run():
+        for tree in trees:
+            parser.print_depccg_tree_ABCT(tree)
+        # === END FOR ===
+    # === END ===
+
+    return run, len(trees)
+# === END ===
+
+def _make_binary(trees: typing.List[cache.CachedTree]) -> bytes:
+    with io.BytesIO() as f:
+        writer = binary.Writer(f)
+        for ID, tree in enumerate(trees, 1):
+            writer.write_tree(tree, -1.0, None, ID)
+        # === END FOR ===
+
+        return f.getvalue()
+    # === END WITH f ===
+# === END ===
+
+def case_binary_write(rng: random.Random, scale: float) -> Case:
+    trees = [
+        cache.CachedTree(
+            random_tree(rng, min(int(rng.expovariate(1 / 25)) + 1, 250))
+        )
+        for _ in range(int(2000 * scale))
+    ]
+
+    def run():
+        _make_binary(trees)
+    # === END ===
+
+    return run, len(trees)
+# === END ===
+
+def case_binary_read(rng: random.Random, scale: float) -> Case:
+    data = _make_binary(
+        [
+            cache.CachedTree(
+                random_tree(rng, min(int(rng.expovariate(1 / 25)) + 1, 250))
+            )
+            for _ in range(int(2000 * scale))
+        ]
+    )
+
+    def run():
+        with io.BytesIO(data) as f:
+            for _ in binary.Reader(f):
+                pass
+            # === END FOR ===
+        # === END WITH f ===
+    # === END ===
+
+    return run, int(2000 * scale)
+# === END ===
+
+def case_binary_to_ABCT(rng: random.Random, scale: float) -> Case:
+    data = _make_binary(
+        [
+            cache.CachedTree(
+                random_tree(rng, min(int(rng.expovariate(1 / 25)) + 1, 250))
+            )
+            for _ in range(int(2000 * scale))
+        ]
+    )
+
+    def run():
+        binary.to_ABCT(data)
+    # === END ===
+
+    return run, int(2000 * scale)
+# === END ===
+
+def case_reader_get(rng: random.Random, scale: float) -> Case:
+    tmp_dir = pathlib.Path(tempfile.mkdtemp(prefix = "abc_depccg_parser_bench_"))
+    n_trees = int(20000 * scale)
+
+    with open(tmp_dir / "parsed.abct", "wb") as f:
+        for i in range(1, n_trees + 1):
+            parser.dump_tree_ABCT(
+                wrap(random_tree(rng, min(int(rng.expovariate(1 / 25)) + 1, 250)), i),
+                f
+            )
+            f.write(b"\n")
+        # === END FOR ===
+    # === END WITH f ===
+
+    with open(tmp_dir / "parsed.abct", "rb") as output, open(
+        tmp_dir / "parsed.abct.idx", "wb"
+    ) as f:
+        index.build_index(output, f)
+    # === END WITH ===
+
+    IDs = [rng.randint(1, n_trees) for _ in range(10000)]
+
+    def run():
+        with reader.IndexedTreebank(tmp_dir / "parsed.abct") as treebank:
+            for ID in IDs:
+                treebank.get(ID)
+            # === END FOR ===
+        # === END WITH ===
+    # === END ===
+
+    return run, len(IDs)
+# === END ===
+
+def _get_sysdic_entries() -> typing.List[typing.Any]:
+    import janome.tokenizer
+
+    return list(janome.tokenizer.Tokenizer().sys_dic.entries.values())
+# === END ===
+
+def case_gen_abc_dic(rng: random.Random, scale: float) -> Case:
+    entries = _get_sysdic_entries()
+
+    def run():
+        set(dic._gen_abc_dic(entries))
+    # === END ===
+
+    return run, 1
+# === END ===
+
+def case_generate_tokenizer_cold(rng: random.Random, scale: float) -> Case:
+    def run():
+        tokenizer.generate_tokenizer(use_cache = False)
+    # === END ===
+
+    return run, 1
+# === END ===
+
+def case_generate_tokenizer_warm(rng: random.Random, scale: float) -> Case:
+    cache_dir = tempfile.mkdtemp(prefix = "abc_depccg_parser_bench_")
+    # Compile and store the user dictionary in advance.
+    tokenizer.generate_tokenizer(cache_dir = cache_dir)
+
+    def run():
+        tokenizer.generate_tokenizer(cache_dir = cache_dir)
+    # === END ===
+
+    return run, 1
+# === END ===
+
+def case_tokenizer_analyze(rng: random.Random, scale: float) -> Case:
+    entries = _get_sysdic_entries()
+    # Surface forms of the system dictionary as words
+    vocab = [rng.choice(entries)[0] for _ in range(5000)]
+    sentences = [
+        sent.split(" ")
+        for sent in random_sentences(rng, int(300 * scale), vocab)
+    ]
+
+    tokenizer.tokenizer = tokenizer.generate_tokenizer()
+
+    def run():
+        tokenizer.analyze(sentences)
+    # === END ===
+
+    return run, len(sentences)
+# === END ===
+
+def _make_parse_tagged_case(
+    rng: random.Random,
+    scale: float,
+    **kwargs
+) -> Case:
+    sentences = random_sentences(
+        rng, int(5000 * scale),
+        [f"w{i}" for i in range(1000)]
+    )
+    doc_tagged = _tag(sentences)
+    _install_stub_parser()
+
+    def run():
+        for chunk_tokenized, chunk_tagged in zip(
+            parser.iter_chunks(sentences, 256),
+            parser.iter_chunks(doc_tagged, 256),
+        ):
+            parser.parse_tagged(
+                chunk_tokenized, chunk_tagged,
+                batchsize = 32,
+                **kwargs
+            )
+        # === END FOR ===
+    # === END ===
+
+    return run, len(sentences)
+# === END ===
+
+def case_parse_tagged(rng: random.Random, scale: float) -> Case:
+    return _make_parse_tagged_case(rng, scale)
+# === END ===
+
+def case_parse_tagged_sorted(rng: random.Random, scale: float) -> Case:
+    return _make_parse_tagged_case(rng, scale, sort_by_length = True)
+# === END ===
+
+def case_parse_tagged_token_budget(rng: random.Random, scale: float) -> Case:
+    return _make_parse_tagged_case(
+        rng, scale, sort_by_length = True, max_tokens_per_batch = 1000
+    )
+# === END ===
+
+def _make_abct_output_case(
+    rng: random.Random,
+    scale: float,
+    pipelined: bool,
+) -> Case:
+    sentences = random_sentences(
+        rng, int(5000 * scale),
+        [f"w{i}" for i in range(1000)]
+    )
+    _install_stub_parser()
+
+    def tag(chunks):
+        return ((_tag(chunk), chunk) for chunk in chunks)
+    # === END ===
+
+    def parse(chunks_tagged):
+        for doc_tagged, doc_tokenized in chunks_tagged:
+            yield parser.parse_tagged(doc_tokenized, doc_tagged, batchsize = 32)
+        # === END FOR ===
+    # === END ===
+
+    def run():
+        chunks = parser.iter_chunks(sentences, 32)
+
+        if pipelined:
+            results = pipeline.iter_pipeline(chunks, tag, parse)
+        else:
+            results = parse(tag(chunks))
+        # === END IF ===
+
+        with open(os.devnull, "w", encoding = "utf-8") as f:
+            ID = 1
+            for parsed_trees, doc_tagged in results:
+                f.write(
+                    parser.print_batch_parsed_ABCT(parsed_trees, doc_tagged, ID)
+                )
+                f.flush()
+                ID += len(parsed_trees)
+            # === END FOR ===
+        # === END WITH ===
+    # === END ===
+
+    return run, len(sentences)
+# === END ===
+
+def case_abct_output(rng: random.Random, scale: float) -> Case:
+    return _make_abct_output_case(rng, scale, pipelined = False)
+# === END ===
+
+def case_abct_output_pipelined(rng: random.Random, scale: float) -> Case:
+    return _make_abct_output_case(rng, scale, pipelined = True)
+# === END ===
+
+def case_parse_cache_hits(rng: random.Random, scale: float) -> Case:
+    sentences = random_sentences(
+        rng, int(2000 * scale),
+        [f"w{i}" for i in range(1000)],
+        duplicate_rate = 0,
+    )
+    doc_tagged = _tag(sentences)
+    _install_stub_parser()
+
+    parse_cache = cache.ParseCache(
+        tempfile.mkdtemp(prefix = "abc_depccg_parser_bench_"),
+        identity = "bench",
+    )
+    # Fill the cache.
+    parser.parse_tagged(sentences, doc_tagged, cache = parse_cache)
+
+    def run():
+        parser.parse_tagged(sentences, doc_tagged, cache = parse_cache)
+    # === END ===
+
+    return run, len(sentences)
+# === END ===
+
+CASES: typing.Dict[str, typing.Callable[[random.Random, float], Case]] = {
+    "category.parse": case_category_parse,
+    "translate_cat_TLG": case_translate_cat_TLG,
+    "parse_cat_translate_TLG.cold": case_parse_cat_translate_TLG_cold,
+    "parse_cat_translate_TLG.warm": case_parse_cat_translate_TLG_warm,
+    "translate_cats": case_translate_cats,
+    "dump_tree_ABCT": case_dump_tree_ABCT,
+    "dump_tree_ABCT.interned": case_dump_tree_ABCT_interned,
+    "print_depccg_tree_ABCT": case_print_depccg_tree_ABCT,
+    "binary.write": case_binary_write,
+    "binary.read": case_binary_read,
+    "binary.to_ABCT": case_binary_to_ABCT,
+    "reader.get": case_reader_get,
+    "dic._gen_abc_dic": case_gen_abc_dic,
+    "generate_tokenizer.cold": case_generate_tokenizer_cold,
+    "generate_tokenizer.warm": case_generate_tokenizer_warm,
+    "tokenizer.analyze": case_tokenizer_analyze,
+    "parse_tagged": case_parse_tagged,
+    "parse_tagged.sorted": case_parse_tagged_sorted,
+    "parse_tagged.token_budget": case_parse_tagged_token_budget,
+    "abct_output": case_abct_output,
+    "abct_output.pipelined": case_abct_output_pipelined,
+    "parse_cache.hits": case_parse_cache_hits,
+}
+
+def run_case(
+    name: str,
+    seed: int,
+    scale: float,
+    repeat: int,
+) -> typing.Dict[str, typing.Any]:
+    run, n_items = CASES[name](random.Random(seed), scale)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    # === END FOR ===
+
+    seconds = min(times)
+    return {
+        "seconds": seconds,
+        "items": n_items,
+        "items_per_second": n_items / seconds if seconds else None,
+    }
+# === END ===
+
+def _get_commit() -> typing.Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            stdout = subprocess.PIPE,
+            stderr = subprocess.DEVNULL,
+            cwd = str(pathlib.Path(__file__).parent),
+            check = True,
+            universal_newlines = True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    # === END TRY ===
+# === END ===
+
+def compare(
+    results: typing.Dict[str, typing.Dict[str, typing.Any]],
+    baseline: typing.Dict[str, typing.Dict[str, typing.Any]],
+    threshold: float,
+) -> typing.List[str]:
+    """
+    Print the ratios of times to the baseline.
+
+    Returns
+    -------
+    regressions : list of str
+        The cases slower than the baseline by more than `threshold` times.
+    """
+    regressions = []
+
+    for name, res in results.items():
+        if name not in baseline:
+            continue
+        # === END IF ===
+
+        ratio = res["seconds"] / baseline[name]["seconds"]
+        mark = ""
+        if ratio > threshold:
+            regressions.append(name)
+            mark = "  REGRESSION"
+        # === END IF ===
+        print(f"{name:>30}: {ratio:6.2f}x of baseline{mark}")
+    # === END FOR ===
+
+    return regressions
+# === END ===
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description = __doc__.split("\n\n")[0])
+    argparser.add_argument("--repeat", type = int, default = 3)
+    argparser.add_argument(
+        "--scale", type = float, default = 1.0,
+        help = "a factor of the sizes of the inputs"
+    )
+    argparser.add_argument("--seed", type = int, default = 0)
+    argparser.add_argument(
+        "--only", nargs = "*", default = None, choices = list(CASES),
+        metavar = "NAME",
+    )
+    argparser.add_argument(
+        "--output", default = None,
+        help = "a file to write the results in JSON (\"-\" for STDOUT)"
+    )
+    argparser.add_argument(
+        "--compare", default = None,
+        help = "a JSON file of results to compare with"
+    )
+    argparser.add_argument("--threshold", type = float, default = 1.2)
+    args = argparser.parse_args()
+
+    import janome.version
+
+    # The table goes to STDERR if the JSON goes to STDOUT.
+    log = sys.stderr if args.output == "-" else sys.stdout
+
+    results: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+    for name in args.only or CASES:
+        results[name] = run_case(name, args.seed, args.scale, args.repeat)
+        print(
+            f"{name:>30}: {results[name]['seconds'] * 1000:10.1f} ms "
+            f"({results[name]['items_per_second']:12.1f} items/s)",
+            file = log
+        )
+    # === END FOR name ===
+
+    report = {
+        "meta": {
+            "commit": _get_commit(),
+            "date": datetime.datetime.now().isoformat(timespec = "seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "janome": janome.version.JANOME_VERSION,
+            "seed": args.seed,
+            "scale": args.scale,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent = 2)
+        sys.stdout.write("\n")
+    elif args.output:
+        with open(args.output, "w", encoding = "utf-8") as f:
+            json.dump(report, f, indent = 2)
+            f.write("\n")
+        # === END WITH f ===
+    # === END IF ===
+
+    if args.compare:
+        with open(args.compare, encoding = "utf-8") as f:
+            baseline = json.load(f)["results"]
+        # === END WITH f ===
+
+        regressions = compare(results, baseline, args.threshold)
+        sys.exit(1 if regressions else 0)
+    # === END IF ===
+# === END ===
+
+if __name__ == "__main__":
+    main()
+# === END IF ===
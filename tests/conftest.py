@@ -0,0 +1,101 @@
+"""
+Fixtures of the tests.
+
+The tests run against the fake of depccg in `fake_depccg`,
+    which needs no model (see `fake_depccg/depccg/parser.py`).
+It is put first on the path of this process,
+    of the worker processes spawned from it,
+    and of the commands run by `run_cli`.
+"""
+
+import typing
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+from abc_depccg_parser import tokenizer
+
+"""
+The directory of the fake of depccg.
+"""
+FAKE_DEPCCG_DIR: pathlib.Path = pathlib.Path(__file__).parent / "fake_depccg"
+
+"""
+The root of the repository.
+"""
+ROOT_DIR: pathlib.Path = pathlib.Path(__file__).parent.parent
+
+sys.path.insert(0, str(FAKE_DEPCCG_DIR))
+
+@pytest.fixture
+def model_dir(tmp_path: pathlib.Path) -> pathlib.Path:
+    """
+    A model directory, which the fake parser does not read.
+    """
+    res = tmp_path / "model"
+    res.mkdir()
+    return res
+# === END ===
+
+@pytest.fixture
+def cli_env(tmp_path: pathlib.Path) -> typing.Dict[str, str]:
+    """
+    The environment variables of the command line interface
+        run with the fake of depccg.
+    """
+    res = dict(os.environ)
+    res["PYTHONPATH"] = os.pathsep.join((str(FAKE_DEPCCG_DIR), str(ROOT_DIR)))
+    # Keep the caches of the package (e.g. parse results) apart.
+    res[tokenizer.CACHE_DIR_ENV] = str(tmp_path / "cache")
+    return res
+# === END ===
+
+@pytest.fixture
+def run_cli(
+    cli_env: typing.Dict[str, str]
+) -> typing.Callable[..., subprocess.CompletedProcess]:
+    """
+    Run the command line interface with the fake of depccg.
+
+    The returned function takes the arguments of the command,
+        its standard input as `input` (str or bytes),
+        and environment variables to be added as `env`.
+    The output is returned as bytes, 
+        and the command is checked to succeed unless `check = False`.
+    """
+    def run(
+        *args: str,
+        input: typing.Union[str, bytes] = b"",
+        env: typing.Optional[typing.Dict[str, str]] = None,
+        check: bool = True,
+    ) -> subprocess.CompletedProcess:
+        if isinstance(input, str):
+            input = input.encode("utf-8")
+        # === END IF ===
+
+        full_env = dict(cli_env)
+        full_env.update(env or {})
+
+        res = subprocess.run(
+            (sys.executable, "-m", "abc_depccg_parser") + args,
+            input = input,
+            capture_output = True,
+            env = full_env,
+            timeout = 300,
+        )
+
+        if check and res.returncode != 0:
+            raise AssertionError(
+                f"command failed ({res.returncode}):\n"
+                + res.stderr.decode("utf-8", "replace")
+            )
+        # === END IF ===
+
+        return res
+    # === END ===
+
+    return run
+# === END ===
@@ -0,0 +1,7 @@
+"""
+A fake of depccg for the tests.
+
+It has just the part of the interface of depccg which this package uses.
+The parser needs no model:
+    it makes a right-branching tree of each sentence (see `parser`).
+"""
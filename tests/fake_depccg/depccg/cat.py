@@ -0,0 +1,9 @@
+class Category:
+    def __init__(self, text: str):
+        self.text = text
+    # === END ===
+
+    def __str__(self) -> str:
+        return self.text
+    # === END ===
+# === END CLASS ===
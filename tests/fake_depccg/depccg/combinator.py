@@ -0,0 +1,24 @@
+class _Combinator:
+    def __init__(self, *args):
+        self.args = args
+    # === END ===
+# === END CLASS ===
+
+HeadfinalCombinator = type("HeadfinalCombinator", (_Combinator, ), {})
+JaForwardApplication = type("JaForwardApplication", (_Combinator, ), {})
+JaBackwardApplication = type("JaBackwardApplication", (_Combinator, ), {})
+JaGeneralizedForwardComposition0 = type(
+    "JaGeneralizedForwardComposition0", (_Combinator, ), {}
+)
+JaGeneralizedBackwardComposition0 = type(
+    "JaGeneralizedBackwardComposition0", (_Combinator, ), {}
+)
+JaGeneralizedBackwardComposition1 = type(
+    "JaGeneralizedBackwardComposition1", (_Combinator, ), {}
+)
+JaGeneralizedBackwardComposition2 = type(
+    "JaGeneralizedBackwardComposition2", (_Combinator, ), {}
+)
+JaGeneralizedBackwardComposition3 = type(
+    "JaGeneralizedBackwardComposition3", (_Combinator, ), {}
+)
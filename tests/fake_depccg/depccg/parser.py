@@ -0,0 +1,99 @@
+"""
+A parser which needs no model.
+
+Each sentence is parsed into a right-branching tree,
+    whose log probability is -0.5 per word.
+With the option `nbest`, the tree is returned that many times,
+    the log probability decreasing by 1 each time.
+
+Environment variables
+---------------------
+FAKE_DEPCCG_DELAY
+    The time in seconds taken to parse each sentence.
+FAKE_DEPCCG_SLOW_ON
+    A word on which the parser takes a second more.
+FAKE_DEPCCG_LOG
+    A file to which each sentence parsed is appended as a line.
+FAKE_DEPCCG_BATCH_LOG
+    A file to which the numbers of the words of the sentences
+        of each batch are appended as a line.
+FAKE_DEPCCG_FAIL_ON
+    A word on which the parser raises `RuntimeError`.
+"""
+
+import typing
+import os
+import time
+
+from .tree import Tree
+
+def _split_words(sentence: typing.Any) -> typing.List[str]:
+    return sentence.split(" ") if isinstance(sentence, str) else list(sentence)
+# === END ===
+
+def _count_words(sentence: typing.Any) -> int:
+    return len(_split_words(sentence))
+# === END ===
+
+class JapaneseCCGParser:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+    # === END ===
+
+    @classmethod
+    def from_json(cls, config_path: str, model_path: str, **kwargs):
+        return cls(**kwargs)
+    # === END ===
+
+    def parse_doc(
+        self,
+        doc: typing.List[typing.Any],
+        probs = None,
+        tag_list = None,
+        batchsize: int = 16,
+    ) -> typing.List[typing.List[typing.Tuple[Tree, float]]]:
+        nbest = self.kwargs.get("nbest") or 1
+        delay = float(os.environ.get("FAKE_DEPCCG_DELAY", "0"))
+        slow_on = os.environ.get("FAKE_DEPCCG_SLOW_ON")
+        log_path = os.environ.get("FAKE_DEPCCG_LOG")
+        fail_on = os.environ.get("FAKE_DEPCCG_FAIL_ON")
+        batch_log_path = os.environ.get("FAKE_DEPCCG_BATCH_LOG")
+        res = []
+
+        if batch_log_path:
+            with open(batch_log_path, "a", encoding = "utf-8") as f:
+                f.write(" ".join(str(_count_words(sent)) for sent in doc) + "\n")
+            # === END WITH ===
+        # === END IF ===
+
+        for sentence in doc:
+            words = _split_words(sentence)
+            time.sleep(delay + (slow_on in words))
+
+            if fail_on in words:
+                raise RuntimeError(f"failed on {fail_on!r}")
+            # === END IF ===
+
+            if log_path:
+                with open(log_path, "a", encoding = "utf-8") as f:
+                    f.write(" ".join(words) + "\n")
+                # === END WITH ===
+            # === END IF ===
+
+            tree = Tree("NP", word = words[-1], start_of_span = len(words) - 1)
+            for i in reversed(range(len(words) - 1)):
+                tree = Tree(
+                    "S[m]",
+                    [Tree("S[m]/S[m]", word = words[i], start_of_span = i), tree],
+                    op_string = ">",
+                )
+            # === END FOR i ===
+
+            res.append(
+                [(tree, -0.5 * len(words) - rank) for rank in range(nbest)]
+            )
+        # === END FOR sentence ===
+
+        return res
+    # === END ===
+# === END CLASS ===
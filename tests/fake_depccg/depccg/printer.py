@@ -0,0 +1,44 @@
+"""
+The printers of the formats used by the tests,
+    numbering sentences per call as depccg does.
+"""
+
+import json
+import sys
+
+def print_(
+    nbest_trees,
+    tagged_doc,
+    lang: str = "en",
+    format: str = "auto",
+    semantic_templates = None,
+    file = sys.stdout,
+) -> None:
+    if format == "xml":
+        print("<candc>", file = file)
+        for i, parsed in enumerate(nbest_trees, 1):
+            for tree, prob in parsed:
+                print(f'<ccg sentence="{i}" prob="{prob}"/>', file = file)
+            # === END FOR ===
+        # === END FOR ===
+        print("</candc>", file = file)
+    elif format == "json":
+        for i, (parsed, tokens) in enumerate(zip(nbest_trees, tagged_doc), 1):
+            for tree, prob in parsed:
+                res = tree.json(tokens = tokens)
+                res["id"] = i
+                res["prob"] = prob
+                print(json.dumps(res), file = file)
+            # === END FOR ===
+        # === END FOR ===
+    elif format == "auto":
+        for i, (parsed, tokens) in enumerate(zip(nbest_trees, tagged_doc), 1):
+            for tree, prob in parsed:
+                tree_string = tree.auto(tokens = tokens)
+                print(f"ID={i}, log probability={prob}\n{tree_string}", file = file)
+            # === END FOR ===
+        # === END FOR ===
+    else:
+        raise NotImplementedError(format)
+    # === END IF ===
+# === END ===
@@ -0,0 +1,25 @@
+import typing
+
+class Token(dict):
+    """
+    A token, whose fields are also available as attributes.
+    """
+
+    def __getattr__(self, name: str) -> typing.Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+        # === END TRY ===
+    # === END ===
+# === END CLASS ===
+
+def annotate_XX(
+    sentences: typing.Iterable[typing.Iterable[str]],
+    tokenize: bool = False,
+) -> typing.List[typing.List[Token]]:
+    return [
+        [Token(word = word, surf = word, pos = "XX") for word in sentence]
+        for sentence in sentences
+    ]
+# === END ===
@@ -0,0 +1,52 @@
+import typing
+
+from .cat import Category
+
+class Tree:
+    def __init__(
+        self,
+        cat: str,
+        children: typing.Sequence["Tree"] = (),
+        word: typing.Optional[str] = None,
+        start_of_span: int = 0,
+        op_string: str = "",
+    ):
+        self.cat = Category(cat)
+        self.children = list(children)
+        self.word = word
+        self.start_of_span = start_of_span
+        self.op_string = op_string
+    # === END ===
+
+    @property
+    def is_leaf(self) -> bool:
+        return not self.children
+    # === END ===
+
+    def json(self, tokens = None) -> dict:
+        if self.is_leaf:
+            token = tokens[self.start_of_span] if tokens else {}
+            return {
+                "type": "LEAF",
+                "cat": str(self.cat),
+                "surf": token.get("surf", self.word),
+                "pos": token.get("pos", "XX"),
+            }
+        else:
+            return {
+                "type": self.op_string,
+                "cat": str(self.cat),
+                "children": [child.json(tokens) for child in self.children],
+            }
+        # === END IF ===
+    # === END ===
+
+    def auto(self, tokens = None) -> str:
+        if self.is_leaf:
+            return f"(<L {self.cat} XX XX {self.word} {self.cat}>)"
+        else:
+            children = " ".join(child.auto(tokens) for child in self.children)
+            return f"(<T {self.cat} 0 {len(self.children)}> {children} )"
+        # === END IF ===
+    # === END ===
+# === END CLASS ===
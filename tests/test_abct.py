@@ -0,0 +1,47 @@
+"""
+Tests of the printing of parsed trees in the ABC Treebank format.
+"""
+
+import io
+import pathlib
+
+from abc_depccg_parser import parser
+
+SENTENCES: str = "猫\n猫 が 寝る\ns1 a b c d\n"
+
+def test_direct_printing_matches_json(model_dir: pathlib.Path):
+    parsed_trees, doc_tagged = parser.parse_doc(
+        SENTENCES.splitlines(), model_path = model_dir,
+        parser_options = parser.make_parser_options({"nbest": 2}),
+    )
+
+    for ID, (parsed, tokens) in enumerate(zip(parsed_trees, doc_tagged), 1):
+        with io.StringIO() as direct, io.StringIO() as via_json:
+            parser.dump_parsed_ABCT(parsed, tokens, ID, stream = direct)
+            parser.dump_parsed_ABCT(
+                parsed, tokens, ID, stream = via_json, via_json = True
+            )
+            assert direct.getvalue() == via_json.getvalue()
+            assert direct.getvalue().count("\n") == 2
+        # === END WITH ===
+
+        with io.BytesIO() as f:
+            parser.dump_parsed_ABCT(parsed, tokens, ID, stream = f)
+            assert f.getvalue().decode("utf-8") == parser.print_parsed_ABCT(
+                parsed, tokens, ID
+            )
+        # === END WITH f ===
+    # === END FOR ===
+# === END ===
+
+def test_direct_printing_without_tokens(model_dir: pathlib.Path):
+    parsed_trees, doc_tagged = parser.parse_doc(
+        SENTENCES.splitlines(), model_path = model_dir
+    )
+
+    for (tree, _), *_ in parsed_trees:
+        assert parser.print_depccg_tree_ABCT(tree) == parser.print_tree_ABCT(
+            tree.json()
+        )
+    # === END FOR ===
+# === END ===
@@ -0,0 +1,95 @@
+"""
+Tests of the batching of sentences for the parser.
+"""
+
+import pathlib
+
+import pytest
+
+"""
+Sentences of mixed lengths, some of which are repeated.
+"""
+SENTENCES: str = "".join(
+    f"s{i % 5} " + " ".join("w" * (i * 7 % 5 + 1)) + "\n" for i in range(1, 17)
+)
+
+def _parse(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path, *options: str
+) -> bytes:
+    log_path = tmp_path / "parsed.txt"
+    if log_path.exists():
+        log_path.unlink()
+    # === END IF ===
+
+    res = run_cli(
+        "parse", "-m", str(model_dir), *options,
+        input = SENTENCES,
+        env = {"FAKE_DEPCCG_LOG": str(log_path)},
+    )
+    return res.stdout
+# === END ===
+
+def test_duplicates_parsed_once_per_batch(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path
+):
+    # One sentence per batch, with nothing to deduplicate
+    expected = _parse(run_cli, model_dir, tmp_path, "-b", "1")
+    assert (tmp_path / "parsed.txt").read_text("utf-8") == SENTENCES
+
+    res = _parse(run_cli, model_dir, tmp_path, "-b", "16")
+    assert res == expected
+    assert (tmp_path / "parsed.txt").read_text("utf-8") == "".join(
+        dict.fromkeys(SENTENCES.splitlines(keepends = True))
+    )
+# === END ===
+
+@pytest.mark.parametrize("chunk_size", [16, 8])
+def test_sorting_by_length_keeps_output(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path, chunk_size: int
+):
+    expected = _parse(run_cli, model_dir, tmp_path, "-b", "2")
+    res = _parse(
+        run_cli, model_dir, tmp_path, "-b", "2", "--sort-by-length",
+        "--max-in-flight", str(chunk_size),
+    )
+    assert res == expected
+
+    # The distinct sentences of each chunk, shortest first
+    lines = SENTENCES.splitlines(keepends = True)
+    assert (tmp_path / "parsed.txt").read_text("utf-8") == "".join(
+        "".join(sorted(dict.fromkeys(chunk), key = lambda s: s.count(" ")))
+        for chunk in (
+            lines[i:i + chunk_size] for i in range(0, len(lines), chunk_size)
+        )
+    )
+# === END ===
+
+@pytest.mark.parametrize("max_tokens", [12, 4, 1])
+def test_token_budget_of_batches(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path, max_tokens: int
+):
+    expected = _parse(run_cli, model_dir, tmp_path, "-b", "16")
+
+    batch_log_path = tmp_path / "batches.txt"
+    res = run_cli(
+        "parse", "-m", str(model_dir), "-b", "16",
+        "--max-tokens-per-batch", str(max_tokens),
+        input = SENTENCES,
+        env = {"FAKE_DEPCCG_BATCH_LOG": str(batch_log_path)},
+    )
+    assert res.stdout == expected
+
+    batches = [
+        [int(n) for n in line.split()]
+        for line in batch_log_path.read_text("utf-8").splitlines()
+    ]
+    # The distinct sentences, in batches within the budget
+    #   but for single sentences longer than it
+    assert sum(batches, []) == [
+        s.count(" ") + 1 for s in dict.fromkeys(SENTENCES.splitlines())
+    ]
+    for batch in batches:
+        assert len(batch) * max(batch) <= max_tokens or len(batch) == 1
+    # === END FOR batch ===
+    assert len(batches) > 1
+# === END ===
@@ -0,0 +1,68 @@
+"""
+Tests that the benchmark suite (see `benchmarks/suite.py`) runs offline.
+"""
+
+import typing
+import json
+import pathlib
+import subprocess
+import sys
+
+"""
+The benchmark suite.
+"""
+SUITE: pathlib.Path = (
+    pathlib.Path(__file__).parent.parent / "benchmarks" / "suite.py"
+)
+
+def _run_suite(
+    cli_env: typing.Dict[str, str], *args: str
+) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        (sys.executable, str(SUITE), "--repeat", "1", "--scale", "0.01") + args,
+        capture_output = True,
+        env = cli_env,
+        timeout = 600,
+    )
+# === END ===
+
+def test_suite_runs_every_case(cli_env: typing.Dict[str, str]):
+    res = _run_suite(cli_env, "--output", "-")
+    assert res.returncode == 0, res.stderr.decode("utf-8", "replace")
+
+    report = json.loads(res.stdout)
+    assert report["meta"]["scale"] == 0.01
+    assert report["results"]
+    for name, result in report["results"].items():
+        assert result["seconds"] > 0, name
+        assert result["items"] > 0, name
+    # === END FOR ===
+# === END ===
+
+def test_suite_compares_with_baseline(
+    cli_env: typing.Dict[str, str], tmp_path: pathlib.Path
+):
+    baseline_path = tmp_path / "baseline.json"
+    res = _run_suite(
+        cli_env, "--only", "category.parse", "--output", str(baseline_path)
+    )
+    assert res.returncode == 0, res.stderr.decode("utf-8", "replace")
+
+    res = _run_suite(
+        cli_env, "--only", "category.parse",
+        "--compare", str(baseline_path), "--threshold", "1000",
+    )
+    assert res.returncode == 0
+    assert b"REGRESSION" not in res.stdout
+
+    # A baseline far faster than anything
+    report = json.loads(baseline_path.read_text("utf-8"))
+    report["results"]["category.parse"]["seconds"] = 1e-9
+    baseline_path.write_text(json.dumps(report), "utf-8")
+
+    res = _run_suite(
+        cli_env, "--only", "category.parse", "--compare", str(baseline_path)
+    )
+    assert res.returncode == 1
+    assert b"REGRESSION" in res.stdout
+# === END ===
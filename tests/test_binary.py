@@ -0,0 +1,77 @@
+"""
+Tests of the binary output format (see `binary`).
+"""
+
+import io
+import pathlib
+
+import pytest
+
+from abc_depccg_parser import binary
+
+SENTENCES: str = "猫 が 寝る\n" + "".join(
+    f"s{i} " + " ".join("w" * (i % 4 + 1)) + "\n" for i in range(1, 10)
+)
+
+@pytest.mark.parametrize(
+    "options", [(), ("--nbest", "2"), ("-b", "3", "--sort-by-length")]
+)
+def test_binary_converts_to_same_ABCT(
+    run_cli, model_dir: pathlib.Path, options
+):
+    expected = run_cli(
+        "parse", "-m", str(model_dir), *options, input = SENTENCES
+    ).stdout
+    data = run_cli(
+        "parse", "-m", str(model_dir), "-f", "binary", *options,
+        input = SENTENCES,
+    ).stdout
+
+    assert run_cli("to-abct", input = data).stdout == expected
+    assert binary.to_ABCT(data).encode("utf-8") == expected
+    assert len(data) < len(expected)
+# === END ===
+
+def test_binary_of_cached_trees(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path
+):
+    options = (
+        "parse", "-m", str(model_dir), "-f", "binary",
+        "--cache-dir", str(tmp_path / "parses"),
+    )
+    data = run_cli(*options, input = SENTENCES).stdout
+
+    # Restored from the cache, with nothing parsed
+    log_path = tmp_path / "parsed.txt"
+    assert run_cli(
+        *options, input = SENTENCES, env = {"FAKE_DEPCCG_LOG": str(log_path)}
+    ).stdout == data
+    assert not log_path.exists()
+# === END ===
+
+def test_reader_streams_records(run_cli, model_dir: pathlib.Path):
+    data = run_cli(
+        "parse", "-m", str(model_dir), "-f", "binary", "--nbest", "2",
+        input = SENTENCES,
+    ).stdout
+
+    reader = binary.Reader(io.BytesIO(data))
+    records = list(reader)
+
+    assert [(r.ID, r.rank) for r in records] == [
+        (ID, rank) for ID in range(1, 11) for rank in range(2)
+    ]
+    assert records[0].words == ["猫", "が", "寝る"]
+    assert [reader.table.cats[i] for i in records[0].cat_ids] == [
+        "S[m]", "S[m]/S[m]", "S[m]", "S[m]/S[m]", "NP"
+    ]
+    assert records[0].arities.tolist() == [2, 0, 2, 0, 0]
+    assert records[1].prob == records[0].prob - 1
+
+    with pytest.raises(binary.FormatError):
+        binary.Reader(io.BytesIO(b"(TOP"))
+    # === END WITH ===
+    with pytest.raises(binary.FormatError, match = "truncated"):
+        list(binary.Reader(io.BytesIO(data[:-1])))
+    # === END WITH ===
+# === END ===
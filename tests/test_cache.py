@@ -0,0 +1,80 @@
+"""
+Tests of the persistent parse cache (see `cache`).
+"""
+
+import pathlib
+
+import pytest
+
+SENTENCES: str = "".join(f"s{i} a b\n" for i in range(1, 6))
+
+def _parse(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path, *options: str
+) -> bytes:
+    res = run_cli(
+        "parse", "-m", str(model_dir), "-b", "2",
+        "--cache-dir", str(tmp_path / "parses"), *options,
+        input = SENTENCES,
+        env = {"FAKE_DEPCCG_LOG": str(tmp_path / "parsed.txt")},
+    )
+    return res.stdout
+# === END ===
+
+def _pop_parsed(tmp_path: pathlib.Path) -> str:
+    log_path = tmp_path / "parsed.txt"
+    if not log_path.exists():
+        return ""
+    # === END IF ===
+
+    res = log_path.read_text("utf-8")
+    log_path.unlink()
+    return res
+# === END ===
+
+def test_cache_hits_under_same_identity(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path
+):
+    expected = _parse(run_cli, model_dir, tmp_path, "--no-cache")
+    assert _pop_parsed(tmp_path) == SENTENCES
+
+    assert _parse(run_cli, model_dir, tmp_path) == expected
+    assert _pop_parsed(tmp_path) == SENTENCES
+
+    # Every sentence is a hit.
+    assert _parse(run_cli, model_dir, tmp_path) == expected
+    assert _pop_parsed(tmp_path) == ""
+# === END ===
+
+@pytest.mark.parametrize(
+    "options",
+    [("--nbest", "2"), ("--unary-penalty", "0.5"), ("--max-length", "100")]
+)
+def test_cache_misses_under_changed_identity(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path, options
+):
+    _parse(run_cli, model_dir, tmp_path)
+    assert _pop_parsed(tmp_path) == SENTENCES
+
+    expected = _parse(run_cli, model_dir, tmp_path, "--no-cache", *options)
+    _pop_parsed(tmp_path)
+
+    # Every sentence is parsed again, with the options.
+    assert _parse(run_cli, model_dir, tmp_path, *options) == expected
+    assert _pop_parsed(tmp_path) == SENTENCES
+
+    assert _parse(run_cli, model_dir, tmp_path, *options) == expected
+    assert _pop_parsed(tmp_path) == ""
+# === END ===
+
+def test_cache_misses_after_model_changes(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path
+):
+    weights = model_dir / "weights.th"
+    weights.write_bytes(b"old")
+    expected = _parse(run_cli, model_dir, tmp_path)
+    assert _pop_parsed(tmp_path) == SENTENCES
+
+    weights.write_bytes(b"newer")
+    assert _parse(run_cli, model_dir, tmp_path) == expected
+    assert _pop_parsed(tmp_path) == SENTENCES
+# === END ===
@@ -0,0 +1,122 @@
+"""
+Property tests of the category parser.
+
+The hand-written parser (`parser.parse_cat` and `parser.parse_cat_view`)
+    must agree with the parsy reference implementation
+    (`parser.parse_cat_parsy`)
+    on random depccg categories, both valid and corrupted.
+"""
+
+import typing
+import random
+
+import parsy
+import pytest
+
+from abc_depccg_parser import parser
+from abc_depccg_parser import category
+
+SEED: int = 0
+N_CATS: int = 2000
+
+BASE_CATS: typing.Tuple[str, ...] = (
+    "S[m]", "S[a]", "S[p]", "S[imp]", "NP", "N", "PP[s]", "PP[o1]",
+    "PP[o2]", "CP[f]", "CP[t]", "FRAG", "INTJP", "LST", "CP-EXL",
+    "NUM", "S[sbj]", "S[adv]",
+)
+
+def random_cat(rng: random.Random, depth: int = 0) -> str:
+    """
+    Generate a random depccg category,
+        including long functor chains such as the results of <B4.
+    """
+    if depth > 2 or rng.random() < 0.2 + depth * 0.3:
+        return rng.choice(BASE_CATS)
+    # === END IF ===
+
+    res = random_cat(rng, depth + 1)
+    for _ in range(rng.randint(1, 5 - depth)):
+        arg = random_cat(rng, depth + 1)
+        if "/" in arg or "\\" in arg:
+            arg = f"({arg})"
+        # === END IF ===
+        res = res + rng.choice("/\\") + arg
+    # === END FOR ===
+
+    if depth and rng.random() < 0.5:
+        res = f"({res})"
+    # === END IF ===
+
+    return res
+# === END ===
+
+def corrupt(rng: random.Random, cat: str) -> str:
+    """
+    Insert, delete or replace a random character of a category.
+    """
+    i = rng.randrange(len(cat) + 1)
+    c = rng.choice("()/\\ X")
+    action = rng.randrange(3)
+    if action == 0:
+        return cat[:i] + c + cat[i:]
+    elif action == 1:
+        return cat[:i] + cat[i + 1:]
+    else:
+        return cat[:i] + c + cat[i + 1:]
+    # === END IF ===
+# === END ===
+
+def _parse_or_none(func, text: str, errors) -> typing.Optional[dict]:
+    try:
+        return func(text)
+    except errors:
+        return None
+    # === END TRY ===
+# === END ===
+
+@pytest.fixture(scope = "module")
+def cats() -> typing.List[str]:
+    rng = random.Random(SEED)
+    return [random_cat(rng) for _ in range(N_CATS)]
+# === END ===
+
+def test_parse_cat_agrees_with_parsy(cats: typing.List[str]):
+    for cat in cats:
+        assert parser.parse_cat(cat) == parser.parse_cat_parsy(cat), cat
+    # === END FOR cat ===
+# === END ===
+
+def test_parse_cat_view_agrees_with_parsy(cats: typing.List[str]):
+    for cat in cats:
+        assert parser.parse_cat_view(cat) == parser.parse_cat_parsy(cat), cat
+    # === END FOR cat ===
+# === END ===
+
+def test_translation_agrees_with_parsy(cats: typing.List[str]):
+    for cat in cats:
+        assert (
+            category.translate_TLG(category.parse(cat))
+            == parser.translate_cat_TLG(parser.parse_cat_parsy(cat))
+        ), cat
+    # === END FOR cat ===
+# === END ===
+
+def test_corrupted_cats_agree_with_parsy(cats: typing.List[str]):
+    rng = random.Random(SEED)
+    n_invalid = 0
+
+    for cat in cats:
+        broken = corrupt(rng, cat)
+        res_new = _parse_or_none(
+            parser.parse_cat, broken, category.CategoryParseError
+        )
+        res_ref = _parse_or_none(
+            parser.parse_cat_parsy, broken, parsy.ParseError
+        )
+        assert res_new == res_ref, broken
+        n_invalid += res_ref is None
+    # === END FOR cat ===
+
+    # Both outcomes must be exercised.
+    assert 0 < n_invalid < len(cats)
+# === END ===
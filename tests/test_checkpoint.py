@@ -0,0 +1,82 @@
+"""
+Tests of resuming parse runs from checkpoints (see `checkpoint`).
+"""
+
+import pathlib
+
+import pytest
+
+from abc_depccg_parser import reader
+
+SENTENCES: str = "".join(
+    f"s{i} " + " ".join("w" * (i % 4 + 1)) + "\n" for i in range(1, 14)
+)
+
+@pytest.mark.parametrize("options", [(), ("--nbest", "2", "-b", "3")])
+def test_resume_gives_same_output(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path, options
+):
+    expected = run_cli(
+        "parse", "-m", str(model_dir), *options, input = SENTENCES
+    ).stdout
+
+    output = tmp_path / "parsed.abct"
+    command = (
+        "parse", "-m", str(model_dir), *options,
+        "-o", str(output), "--index", str(output) + ".idx",
+    )
+    lines = SENTENCES.splitlines(keepends = True)
+
+    # A run up to the middle of the input,
+    #   followed by output not covered by the checkpoint
+    run_cli(*command, input = "".join(lines[:6]))
+    with open(output, "ab") as f:
+        f.write(b"(TOP (COMMENT {probability=-1.0}) (NP s7")
+    # === END WITH f ===
+
+    log_path = tmp_path / "parsed.txt"
+    run_cli(
+        *command, "--resume",
+        input = SENTENCES,
+        env = {"FAKE_DEPCCG_LOG": str(log_path)},
+    )
+
+    assert output.read_bytes() == expected
+    # Only the rest of the input is parsed.
+    assert log_path.read_text("utf-8") == "".join(lines[6:])
+
+    with reader.IndexedTreebank(output) as treebank:
+        assert "".join(
+            tree + "\n" for ID in treebank.iter_IDs() for tree in treebank[ID]
+        ).encode("utf-8") == expected
+    # === END WITH treebank ===
+# === END ===
+
+@pytest.mark.parametrize(
+    "input, options, message",
+    [
+        ("s0 x\n" + SENTENCES, (), b"input"),
+        (SENTENCES, ("--nbest", "2"), b"settings"),
+    ]
+)
+def test_resume_rejects_other_run(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path,
+    input: str, options, message: bytes
+):
+    output = tmp_path / "parsed.abct"
+    run_cli(
+        "parse", "-m", str(model_dir), "-o", str(output),
+        input = "".join(SENTENCES.splitlines(keepends = True)[:6]),
+    )
+    kept = output.read_bytes()
+
+    res = run_cli(
+        "parse", "-m", str(model_dir), "-o", str(output), "--resume", *options,
+        input = input,
+        check = False,
+    )
+
+    assert res.returncode != 0
+    assert b"cannot resume" in res.stderr and message in res.stderr
+    assert output.read_bytes() == kept
+# === END ===
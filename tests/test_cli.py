@@ -0,0 +1,74 @@
+"""
+Tests of the command line interface as a whole.
+"""
+
+import typing
+import json
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+"""
+Modules too heavy to be imported before a subcommand needs them.
+"""
+HEAVY_MODULES: typing.FrozenSet[str] = frozenset(
+    ("depccg", "allennlp", "torch", "janome", "parsy", "numpy")
+)
+
+"""
+Print the heavy modules imported by the help of a subcommand.
+"""
+_CHECK_IMPORTS: str = """
+import json, sys
+from abc_depccg_parser import cli
+cli.cmd_main(sys.argv[1:] + ["--help"], standalone_mode = False)
+print(json.dumps(sorted(
+    name for name in sys.modules if name.split(".")[0] in {heavy!r}
+)))
+"""
+
+@pytest.mark.parametrize(
+    "subcommand",
+    [(), ("parse", ), ("dic", ), ("serve", ), ("client", ), ("to-abct", ), ("index", )]
+)
+def test_help_imports_no_heavy_modules(
+    cli_env: typing.Dict[str, str], subcommand: typing.Tuple[str, ...]
+):
+    res = subprocess.run(
+        (
+            sys.executable, "-c",
+            _CHECK_IMPORTS.format(heavy = set(HEAVY_MODULES)),
+        ) + subcommand,
+        capture_output = True,
+        env = cli_env,
+        check = True,
+    )
+
+    # The fake of depccg is on the path, so that importing it would show.
+    assert json.loads(res.stdout.splitlines()[-1]) == []
+# === END ===
+
+def test_version_without_git(
+    cli_env: typing.Dict[str, str], tmp_path: pathlib.Path
+):
+    res = subprocess.run(
+        (
+            sys.executable, "-c",
+            "import abc_depccg_parser, sys; "
+            "print(abc_depccg_parser.__version__); "
+            "print('subprocess' in sys.modules)",
+        ),
+        capture_output = True,
+        # Not in a git repository
+        cwd = tmp_path,
+        env = cli_env,
+        check = True,
+    )
+
+    version, is_subprocess_imported = res.stdout.split()
+    assert version
+    # No git is run.
+    assert is_subprocess_imported == b"False"
+# === END ===
@@ -0,0 +1,85 @@
+"""
+Tests of the index of the ABCT output and its reader.
+"""
+
+import pathlib
+
+import pytest
+
+from abc_depccg_parser import index
+from abc_depccg_parser import reader
+
+SENTENCES: str = "".join(
+    f"s{i} " + " ".join("w" * (i % 3 + 1)) + "\n" for i in range(1, 8)
+)
+
+def test_reader_fetches_indexed_trees(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path
+):
+    output = tmp_path / "parsed.abct"
+    run_cli(
+        "parse", "-m", str(model_dir), "-b", "2", "--nbest", "2",
+        "-o", str(output), "--index", str(output) + ".idx",
+        input = SENTENCES,
+    )
+    lines = output.read_text(encoding = "utf-8").splitlines()
+
+    with reader.IndexedTreebank(output) as treebank:
+        assert list(treebank.iter_IDs()) == list(range(1, 8))
+        assert [
+            tree for ID in treebank.iter_IDs() for tree in treebank[ID]
+        ] == lines
+        assert treebank.get(3, 1) == lines[5]
+
+        with pytest.raises(KeyError):
+            treebank.get(3, 2)
+        # === END WITH ===
+    # === END WITH treebank ===
+# === END ===
+
+def test_reader_rejects_stale_index(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path
+):
+    output = tmp_path / "parsed.abct"
+    run_cli(
+        "parse", "-m", str(model_dir),
+        "-o", str(output), "--index", str(output) + ".idx",
+        input = SENTENCES,
+    )
+    # The same size, but the trees of sentence 2 are no longer where indexed
+    output.write_bytes(output.read_bytes().replace(b"(ID 2))", b"(ID 9))"))
+
+    with reader.IndexedTreebank(output) as treebank:
+        assert treebank[1] == [treebank.get(1)]
+
+        with pytest.raises(index.BrokenIndexError):
+            treebank.get(2)
+        # === END WITH ===
+        with pytest.raises(index.BrokenIndexError):
+            treebank[2]
+        # === END WITH ===
+    # === END WITH treebank ===
+# === END ===
+
+def test_index_closed_after_failure(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path
+):
+    output = tmp_path / "parsed.abct"
+    res = run_cli(
+        "parse", "-m", str(model_dir), "-b", "2",
+        "-o", str(output), "--index", str(output) + ".idx",
+        input = SENTENCES + "boom\n",
+        env = {"FAKE_DEPCCG_FAIL_ON": "boom"},
+        check = False,
+    )
+    assert res.returncode != 0
+
+    # The index covers the trees written before the failure.
+    lines = output.read_text(encoding = "utf-8").splitlines()
+    assert lines
+
+    with reader.IndexedTreebank(output) as treebank:
+        assert len(treebank) == len(lines)
+        assert [treebank.get(ID) for ID in treebank.iter_IDs()] == lines
+    # === END WITH treebank ===
+# === END ===
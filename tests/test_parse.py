@@ -0,0 +1,88 @@
+"""
+Tests of the parse command.
+"""
+
+import typing
+import io
+import pathlib
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from abc_depccg_parser import parser
+
+SENTENCES: str = "".join(
+    f"s{i} " + " ".join("w" * (i % 4 + 1)) + "\n" for i in range(1, 12)
+)
+
+@pytest.mark.parametrize("output_format", ["json", "auto"])
+def test_streamed_format_matches_whole_document(
+    run_cli, model_dir: pathlib.Path, output_format: str
+):
+    import depccg.printer
+
+    # Printed chunk by chunk
+    res = run_cli(
+        "parse", "-m", str(model_dir), "-b", "2", "-f", output_format,
+        input = SENTENCES,
+    )
+
+    # Printed at once by depccg
+    parsed_trees, doc_tagged = parser.parse_doc(
+        SENTENCES.splitlines(), model_path = model_dir
+    )
+    with io.StringIO() as f:
+        depccg.printer.print_(
+            parsed_trees, doc_tagged, lang = "ja", format = output_format,
+            file = f
+        )
+        expected = f.getvalue()
+    # === END WITH ===
+
+    assert res.stdout.decode("utf-8") == expected
+    assert b"kept in memory" not in res.stderr
+# === END ===
+
+def test_document_format_warns(run_cli, model_dir: pathlib.Path):
+    res = run_cli(
+        "parse", "-m", str(model_dir), "-b", "2", "-f", "xml",
+        input = SENTENCES,
+    )
+
+    assert b"kept in memory" in res.stderr
+    assert res.stdout.count(b"<ccg ") == len(SENTENCES.splitlines())
+# === END ===
+
+def test_streamed_format_prints_before_end_of_input(
+    cli_env: typing.Dict[str, str], model_dir: pathlib.Path
+):
+    proc = subprocess.Popen(
+        (
+            sys.executable, "-m", "abc_depccg_parser",
+            "parse", "-m", str(model_dir), "-b", "2", "-f", "json",
+        ),
+        stdin = subprocess.PIPE,
+        stdout = subprocess.PIPE,
+        stderr = subprocess.DEVNULL,
+        env = cli_env,
+    )
+    lines = []
+
+    try:
+        # The first chunk, with the input left open
+        proc.stdin.write(b"a b\nc d\n")
+        proc.stdin.flush()
+
+        reader = threading.Thread(
+            target = lambda: lines.append(proc.stdout.readline())
+        )
+        reader.start()
+        reader.join(timeout = 60)
+        assert lines and b'"id": 1' in lines[0]
+    finally:
+        proc.stdin.close()
+        proc.wait(timeout = 60)
+    # === END TRY ===
+# === END ===
@@ -0,0 +1,35 @@
+"""
+Tests of the pipelined parse command (see `pipeline`).
+"""
+
+import pathlib
+
+import pytest
+
+SENTENCES: str = "".join(
+    f"猫{i}が寝る。\n" if i % 3 else f"s{i} a b\n" for i in range(1, 12)
+)
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        (),
+        ("-f", "json"),
+        ("--sort-by-length", ),
+        ("--tokenize", ),
+        ("--tokenize", "--tokenize-workers", "2"),
+    ]
+)
+def test_pipeline_keeps_output(run_cli, model_dir: pathlib.Path, options):
+    expected = run_cli(
+        "parse", "-m", str(model_dir), "-b", "2", *options,
+        input = SENTENCES,
+    ).stdout
+    res = run_cli(
+        "parse", "-m", str(model_dir), "-b", "2", "--pipeline", *options,
+        input = SENTENCES,
+    )
+
+    assert res.stdout == expected
+    assert res.stdout.count(b"\n") == len(SENTENCES.splitlines())
+# === END ===
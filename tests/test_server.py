@@ -0,0 +1,105 @@
+"""
+Tests of the parse server (see `server`).
+"""
+
+import typing
+import pathlib
+import subprocess
+import sys
+import concurrent.futures
+
+import pytest
+
+from abc_depccg_parser import server
+
+SENTENCES: str = "a b\nc d e\n"
+
+@pytest.fixture
+def serve(
+    cli_env: typing.Dict[str, str], model_dir: pathlib.Path, tmp_path: pathlib.Path
+) -> typing.Iterator[typing.Callable[..., pathlib.Path]]:
+    """
+    Start a server with the given options,
+        returning the path of its socket.
+    """
+    procs = []
+
+    def start(*options: str) -> pathlib.Path:
+        socket_path = tmp_path / f"server{len(procs)}.sock"
+        proc = subprocess.Popen(
+            (
+                sys.executable, "-m", "abc_depccg_parser", "serve",
+                "-m", str(model_dir), "--socket", str(socket_path),
+            ) + options,
+            stderr = subprocess.PIPE,
+            env = cli_env,
+        )
+        procs.append(proc)
+
+        # Wait for the server to listen.
+        assert proc.stderr.readline().startswith(b"Serving on")
+        return socket_path
+    # === END ===
+
+    yield start
+
+    for proc in procs:
+        proc.terminate()
+        proc.wait(timeout = 60)
+    # === END FOR ===
+# === END ===
+
+def test_server_matches_parse(run_cli, serve, model_dir: pathlib.Path):
+    socket_path = serve()
+    res = run_cli(
+        "client", "--socket", str(socket_path), "-b", "1", input = SENTENCES
+    )
+
+    assert res.stdout == run_cli(
+        "parse", "-m", str(model_dir), input = SENTENCES
+    ).stdout
+# === END ===
+
+def test_server_takes_parser_options(run_cli, serve, model_dir: pathlib.Path):
+    socket_path = serve("--nbest", "2")
+    res = run_cli("client", "--socket", str(socket_path), input = SENTENCES)
+
+    assert res.stdout.count(b"(ID 1)") == 2
+    assert res.stdout == run_cli(
+        "parse", "-m", str(model_dir), "--nbest", "2", input = SENTENCES
+    ).stdout
+# === END ===
+
+def test_server_answers_concurrent_requests(
+    run_cli, serve, model_dir: pathlib.Path
+):
+    socket_path = serve()
+    sentences = [f"s{i} a b" for i in range(1, 9)]
+
+    def parse(i: int) -> str:
+        with server.Client(socket_path = socket_path) as client:
+            return client.parse(sentences[i:i + 2], start_ID = i + 1)
+        # === END WITH client ===
+    # === END ===
+
+    with concurrent.futures.ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(parse, range(0, 8, 2)))
+    # === END WITH pool ===
+
+    assert "".join(results).encode("utf-8") == run_cli(
+        "parse", "-m", str(model_dir), input = "\n".join(sentences) + "\n"
+    ).stdout
+# === END ===
+
+def test_server_rejects_bad_request(serve):
+    socket_path = serve()
+
+    with server.Client(socket_path = socket_path) as client:
+        with pytest.raises(RuntimeError, match = "400"):
+            client.parse(["a b"], output_format = "xml")
+        # === END WITH ===
+
+        # The server is still up.
+        assert client.parse(["a b"]).endswith("(ID 1))\n")
+    # === END WITH client ===
+# === END ===
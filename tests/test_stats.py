@@ -0,0 +1,31 @@
+"""
+Tests of the statistics of parsing (see `stats`).
+"""
+
+import json
+import pathlib
+
+import pytest
+
+SENTENCES: str = "".join(f"s{i} a b c\n" for i in range(1, 11))
+
+@pytest.mark.parametrize(
+    "options", [(), ("-j", "2"), ("--sentence-timeout", "60")]
+)
+def test_category_cache_counted_in_workers(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path, options
+):
+    stats_path = tmp_path / "stats.json"
+    run_cli(
+        "parse", "-m", str(model_dir), "-b", "2",
+        "--stats-file", str(stats_path), *options,
+        input = SENTENCES,
+    )
+    report = json.loads(stats_path.read_text("utf-8"))
+
+    # 7 nodes per sentence, of 3 distinct categories
+    #   (translated at most once per process)
+    assert report["category_cache"]["lookups"] == 70
+    assert report["category_cache"]["hits"] >= 70 - 3 * 2
+    assert report["amortized_parse_latency_ms"]["sentences"] == 10
+# === END ===
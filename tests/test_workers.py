@@ -0,0 +1,84 @@
+"""
+Tests of parsing with worker processes (see `workers`).
+"""
+
+import io
+import pathlib
+
+import pytest
+
+from abc_depccg_parser import parser
+
+SENTENCES: str = "".join(f"s{i} a b\n" for i in range(1, 9))
+
+def test_timeout_spares_slow_healthy_chunk(
+    run_cli, model_dir: pathlib.Path, tmp_path: pathlib.Path
+):
+    # Every sentence is within its time limit,
+    #   while the chunk takes well over twice the limit as a whole.
+    log_path = tmp_path / "parsed.txt"
+    res = run_cli(
+        "parse", "-m", str(model_dir), "-b", "8", "--sentence-timeout", "1",
+        input = SENTENCES,
+        env = {
+            "FAKE_DEPCCG_DELAY": "0.5",
+            "FAKE_DEPCCG_LOG": str(log_path),
+        },
+    )
+
+    assert b"timed out" not in res.stderr
+    # No sentence is parsed again.
+    assert log_path.read_text("utf-8") == SENTENCES
+    assert [
+        line.rsplit(b"(ID ", 1)[1] for line in res.stdout.splitlines()
+    ] == [f"{i}))".encode() for i in range(1, 9)]
+# === END ===
+
+def test_parse_doc_trees_of_workers(model_dir: pathlib.Path):
+    lines = SENTENCES.splitlines()
+    parsed_trees, doc_tagged = parser.parse_doc(
+        lines, model_path = model_dir, batchsize = 2, workers = 2
+    )
+    expected_trees, expected_tagged = parser.parse_doc(
+        lines, model_path = model_dir
+    )
+
+    assert [
+        [(tree.json(), prob) for tree, prob in parsed]
+        for parsed in parsed_trees
+    ] == [
+        [(tree.json(tokens = tokens), prob) for tree, prob in parsed]
+        for parsed, tokens in zip(expected_trees, expected_tagged)
+    ]
+
+    with io.StringIO() as f:
+        parser.dump_batch_parsed_others(
+            parsed_trees, doc_tagged, "json", "ja", stream = f
+        )
+        assert f.getvalue().count("\n") == len(lines)
+    # === END WITH ===
+
+    with pytest.raises(TypeError, match = "json or ABCT"):
+        parser.dump_batch_parsed_others(
+            parsed_trees, doc_tagged, "auto", "ja", stream = io.StringIO()
+        )
+    # === END WITH ===
+# === END ===
+
+def test_workers_keep_input_order(run_cli, model_dir: pathlib.Path):
+    # The first chunk is the last to be parsed.
+    sentences = "slow " + SENTENCES
+    expected = run_cli(
+        "parse", "-m", str(model_dir), "-b", "2", input = sentences
+    ).stdout
+    res = run_cli(
+        "parse", "-m", str(model_dir), "-b", "2", "-j", "2",
+        input = sentences,
+        env = {"FAKE_DEPCCG_SLOW_ON": "slow"},
+    )
+
+    assert res.stdout == expected
+    assert [
+        line.rsplit(b"(ID ", 1)[1] for line in res.stdout.splitlines()
+    ] == [f"{i}))".encode() for i in range(1, 9)]
+# === END ===